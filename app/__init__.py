@@ -1,5 +0,0 @@
-from pathlib import Path
-
-Path("app/__init__.py").touch()
-Path("app/data/__init__.py").touch()
-Path("app/services/__init__.py").touch()
\ No newline at end of file
@@ -5,10 +5,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent  # Root of project
 DATA_DIR = BASE_DIR / "DATA"
 DB_PATH = DATA_DIR / "intelligence_platform.db"
 
-# Ensure DATA folder exists
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-
-print(" Imports successful!")
-print(f" DATA folder: {DATA_DIR.resolve()}")
-print(f" Database will be created at: {DB_PATH.resolve()}")
\ No newline at end of file
+def ensure_data_dir():
+    """Ensure the DATA folder exists (call before writing to it, never at import time)."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR
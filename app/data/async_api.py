@@ -0,0 +1,203 @@
+"""
+Asyncio facade over the blocking data layer.
+
+AsyncDatabase runs the incidents, tickets, search and users functions on
+threads so coroutines never block the event loop:
+
+  * reads go to a pool of reader threads, each call on a read-only
+    connection inside one snapshot (app.data.db.read_snapshot); under WAL
+    concurrent reads run in parallel and never wait on a write (sqlite3
+    releases the GIL while a statement runs),
+  * writes go to the process-wide writer thread (app.data.db.get_writer),
+    so writes from this process, the dashboard included, are applied one
+    at a time and never contend with each other for the write lock
+    ("database is locked"); busy_timeout covers writers in other
+    processes.
+
+Write connections are borrowed from the process-wide pool for the
+database (app.data.db.get_pool), so helpers that open their own
+connection, such as app.data.users, reuse the one the job already holds.
+
+Every call takes an optional timeout. A cancelled or timed-out call that
+is still queued never runs; a read that has started is interrupted
+(sqlite3 Connection.interrupt). A write that has started is left to
+finish, so cancelling never leaves a half-applied change behind.
+
+Usage:
+    async with AsyncDatabase() as db:
+        page, next_id = await db.get_incidents_page(severity="High", timeout=2)
+        await db.update_incident_status(int(page["incident_id"].iloc[0]), "Resolved")
+"""
+import asyncio
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from app.data import incidents, search, tickets, users
+from app.data.db import DB_PATH, POOL_SIZE, get_read_pool, get_writer, read_snapshot
+
+# Reader threads by default; this stays within the read-only connection pool
+READERS = POOL_SIZE // 2
+
+
+class _Job:
+    """One call on a worker thread, with the connection it is running on (for interrupts)."""
+
+    def __init__(self, fn, args, kwargs, pass_conn):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.pass_conn = pass_conn
+        self._lock = threading.Lock()
+        self._conn = None
+        self._cancelled = False
+
+    def run(self, conn):
+        with self._lock:
+            if self._cancelled:
+                raise CancelledError()
+            self._conn = conn
+        try:
+            if self.pass_conn:
+                return self.fn(conn, *self.args, **self.kwargs)
+            return self.fn(*self.args, **self.kwargs)
+        finally:
+            with self._lock:
+                self._conn = None
+
+    def read(self, db_path):
+        with read_snapshot(db_path) as conn:
+            return self.run(conn)
+
+    def cancel(self, interrupt):
+        """Stop the job from starting; with interrupt, also abort the statement it is running."""
+        with self._lock:
+            self._cancelled = True
+            if interrupt and self._conn is not None:
+                self._conn.interrupt()
+
+
+def _reader(fn, pass_conn=True):
+    async def method(self, *args, timeout=None, **kwargs):
+        return await self._call(False, fn, args, kwargs, timeout, pass_conn)
+    method.__name__ = fn.__name__
+    method.__doc__ = f"Async {fn.__module__}.{fn.__name__} on a reader thread."
+    return method
+
+
+def _writer(fn, pass_conn=True):
+    async def method(self, *args, timeout=None, **kwargs):
+        return await self._call(True, fn, args, kwargs, timeout, pass_conn)
+    method.__name__ = fn.__name__
+    method.__doc__ = f"Async {fn.__module__}.{fn.__name__} on the writer thread."
+    return method
+
+
+class AsyncDatabase:
+    """
+    Async access to one database through reader threads and the process-wide writer thread.
+
+    Args:
+        db_path: Path to the database file
+        readers: Reader threads (and so concurrent reads)
+        timeout: Default seconds before a call is cancelled (None = wait forever)
+    """
+
+    def __init__(self, db_path=DB_PATH, readers=READERS, timeout=None):
+        self.db_path = db_path
+        self.read_pool = get_read_pool(db_path)
+        if readers > self.read_pool.max_size:
+            raise ValueError(f"readers ({readers}) exceed the read connection pool ({self.read_pool.max_size})")
+        self.writer = get_writer(db_path)
+        self.readers = readers
+        self.timeout = timeout
+        self._read_pool = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+
+    async def _call(self, write, fn, args, kwargs, timeout, pass_conn):
+        job = _Job(fn, args, kwargs, pass_conn)
+        if write:
+            future = self.writer.submit(job.run)
+        else:
+            future = self._read_pool.submit(job.read, self.db_path)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout if timeout is None else timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # wrap_future has already cancelled the job if it was still queued
+            job.cancel(interrupt=not write)
+            raise
+
+    async def read(self, fn, *args, timeout=None, **kwargs):
+        """Run fn(conn, *args, **kwargs) on a reader thread, in one read-only snapshot."""
+        return await self._call(False, fn, args, kwargs, timeout, True)
+
+    async def write(self, fn, *args, timeout=None, **kwargs):
+        """Run fn(conn, *args, **kwargs) on the writer thread; the transaction commits when fn returns."""
+        return await self._call(True, fn, args, kwargs, timeout, True)
+
+    # Incidents
+    get_incidents_page = _reader(incidents.get_incidents_page)
+    get_incident_time_range = _reader(incidents.get_incident_time_range)
+    get_incident_timeseries = _reader(incidents.get_incident_timeseries)
+    get_incident_counts_by_period = _reader(incidents.get_incident_counts_by_period)
+    get_incidents_by_type_count = _reader(incidents.get_incidents_by_type_count)
+    get_monthly_incident_counts = _reader(incidents.get_monthly_incident_counts)
+    get_high_severity_by_status = _reader(incidents.get_high_severity_by_status)
+    get_incident_types_with_many_cases = _reader(incidents.get_incident_types_with_many_cases)
+    insert_incident = _writer(incidents.insert_incident)
+    insert_incidents_bulk = _writer(incidents.insert_incidents_bulk)
+    update_incident_status = _writer(incidents.update_incident_status)
+    delete_incident = _writer(incidents.delete_incident)
+
+    # Tickets
+    get_tickets_page = _reader(tickets.get_tickets_page)
+    get_resolution_time_percentiles = _reader(tickets.get_resolution_time_percentiles)
+    get_backlog_aging = _reader(tickets.get_backlog_aging)
+    get_weekly_throughput = _reader(tickets.get_weekly_throughput)
+    insert_ticket = _writer(tickets.insert_ticket)
+    insert_tickets_bulk = _writer(tickets.insert_tickets_bulk)
+    upsert_tickets = _writer(tickets.upsert_tickets)
+    update_tickets_status = _writer(tickets.update_tickets_status)
+    delete_ticket = _writer(tickets.delete_ticket)
+
+    # Search
+    search_incidents = _reader(search.search_incidents)
+    search_tickets = _reader(search.search_tickets)
+
+    # Users (these open their own connection on DB_PATH: writes re-enter the one the writer holds,
+    # reads borrow a pooled read-write connection)
+    get_user_by_username = _reader(users.get_user_by_username, pass_conn=False)
+    insert_user = _writer(users.insert_user, pass_conn=False)
+    update_password_hash = _writer(users.update_password_hash, pass_conn=False)
+    update_user_role = _writer(users.update_user_role, pass_conn=False)
+
+    def close(self, wait=True):
+        """
+        Stop the reader threads; queued reads are dropped unless wait is True.
+
+        The writer is shared with the rest of the process and keeps running.
+        """
+        self._read_pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    async def aclose(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_async_database(db_path=DB_PATH):
+    """Return the process-wide AsyncDatabase for db_path, starting it on first use."""
+    key = str(db_path)
+    database = _databases.get(key)
+    if database is None:
+        with _databases_lock:
+            database = _databases.get(key)
+            if database is None:
+                database = _databases[key] = AsyncDatabase(db_path)
+    return database
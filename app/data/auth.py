@@ -1,40 +1,51 @@
-import bcrypt
 import re
+import time
+from app.data.bcrypt_cost import get_bcrypt_rounds
+from app.data.user_store import get_user_store
 
 USER_DATA_FILE = "users.txt"
 
-def hash_password(plain_text_password):
+def hash_password(plain_text_password, rounds=None):
+    """Hash a password at the given cost (default: the calibrated target, see app.data.bcrypt_cost)."""
+    import bcrypt
+
     password_bytes = plain_text_password.encode("utf-8")
-    salt = bcrypt.gensalt(rounds=10)
+    salt = bcrypt.gensalt(rounds=get_bcrypt_rounds() if rounds is None else rounds)
     hashed = (bcrypt.hashpw(password_bytes, salt)).decode("utf-8")
     return hashed
 
 def verify_password(plain_text_password, hashed_password):
+    import bcrypt
+
     return bcrypt.checkpw(plain_text_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 def register_user(username, password):
-    if user_exists(username):
+    store = get_user_store(USER_DATA_FILE)
+    if store.exists(username):
         return False
-    else:
-        with open(USER_DATA_FILE, "a") as udf:
-            hashed_password = hash_password(password)
-            udf.write(username + " " + hashed_password + "\n")
-            return True
+    # add_user re-checks under the file lock in case another instance got there first
+    return store.add_user(username, hash_password(password))
 
 def user_exists(username):
-    with open(USER_DATA_FILE, "r") as udf:
-        for line in udf:
-            stored_user, _ = line.strip().split(" ")
-            if stored_user == username:
-                return True
-    return False
+    return get_user_store(USER_DATA_FILE).exists(username)
 
 def login_user(username, password):
-    with open(USER_DATA_FILE, "r") as udf:
-        for line in udf:
-            stored_user, stored_hash = line.strip().split()
-            if stored_user == username and verify_password(password, stored_hash):
+    from app.services.login_throttle import THROTTLED_MESSAGE, LoginThrottled, login_attempt
+
+    decoy_seconds = 0
+    try:
+        with login_attempt(username) as throttle:
+            stored_hash = get_user_store(USER_DATA_FILE).get_hash(username)
+            if stored_hash is None:
+                if throttle:
+                    decoy_seconds = throttle.decoy_delay()
+            elif verify_password(password, stored_hash):
                 return True
+    except LoginThrottled:
+        print(THROTTLED_MESSAGE)
+        return False
+    # As slow as a real check, so timing does not reveal the miss; slept outside the in-flight slot
+    time.sleep(decoy_seconds)
     print("Invalid username or password.")
     return False
 
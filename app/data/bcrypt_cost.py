@@ -0,0 +1,212 @@
+"""
+bcrypt cost calibration.
+
+The bcrypt cost (log2 rounds) decides how long every login takes, and
+the right value depends on the machine. calibrate_bcrypt_rounds() times
+bcrypt.checkpw on this host and picks the highest cost whose p99 stays
+within the login latency budget (PLATFORM_LOGIN_P99_MS, default 250 ms),
+never going below MIN_ROUNDS.
+
+get_bcrypt_rounds() is the target cost used for new hashes. In order:
+PLATFORM_BCRYPT_ROUNDS if set, else this host's saved calibration in
+DATA/bcrypt_cost.json (for the current budget), else MIN_ROUNDS.
+Calibrating takes seconds, so it never happens inside a login or
+register request: calibrate_at_startup() runs it once in the background
+when the app starts (the Streamlit Home page calls it), or run this
+module from the command line. Stored hashes whose cost is below the
+target are rehashed on the next successful login (see needs_rehash and
+user_service.login_user); hashes above it are left alone, so hosts with
+different targets sharing one users table do not undo each other.
+
+Usage:
+    python -m app.data.bcrypt_cost                  # calibrate and save for this host
+    python -m app.data.bcrypt_cost --budget-ms 100 --dry-run
+"""
+import json
+import math
+import os
+import platform
+import threading
+import time
+
+from app.config import DATA_DIR, ensure_data_dir
+
+DEFAULT_ROUNDS = 10
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+LOGIN_P99_BUDGET_MS = float(os.environ.get("PLATFORM_LOGIN_P99_MS", 250))
+SAMPLES = 20
+CALIBRATION_FILE = DATA_DIR / "bcrypt_cost.json"
+
+_target = None
+_target_lock = threading.Lock()
+_calibration_started = False
+
+
+def hash_rounds(password_hash):
+    """Return the cost stored in a bcrypt hash ("$2b$12$..." -> 12), or None if it is not one."""
+    parts = (password_hash or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def measure_checkpw_ms(rounds, samples=SAMPLES):
+    """Time samples bcrypt.checkpw calls at the given cost, in milliseconds."""
+    import bcrypt
+
+    password = b"CalibrationPass123!"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def calibrate_bcrypt_rounds(p99_budget_ms=LOGIN_P99_BUDGET_MS, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS,
+                            samples=SAMPLES):
+    """
+    Pick the highest bcrypt cost whose checkpw p99 fits the budget on this host.
+
+    Costs are tried upwards from min_rounds. Each step doubles the work,
+    so a cost is not measured at all once the previous p99 shows it would
+    clearly miss the budget. If even min_rounds misses, min_rounds is
+    still returned: it is the security floor.
+
+    Returns:
+        dict: rounds, p99_ms (at that cost), budget_ms, measured ({cost: p99_ms}), host, calibrated_at
+    """
+    measured = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        previous = measured.get(rounds - 1)
+        if previous is not None and previous * 2 > p99_budget_ms * 1.25:
+            break
+        times = sorted(measure_checkpw_ms(rounds, samples))
+        p99 = times[max(math.ceil(0.99 * len(times)) - 1, 0)]
+        measured[rounds] = round(p99, 3)
+        if p99 > p99_budget_ms:
+            break
+        chosen = rounds
+    return {
+        "rounds": chosen,
+        "p99_ms": measured.get(chosen),
+        "budget_ms": p99_budget_ms,
+        "measured": measured,
+        "host": platform.node(),
+        "calibrated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def load_calibration(path=CALIBRATION_FILE):
+    """Return this host's saved calibration, or None."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get(platform.node())
+    except (OSError, ValueError):
+        return None
+
+
+def save_calibration(result, path=CALIBRATION_FILE):
+    """Store a calibration under this host's name, keeping other hosts' entries."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    saved[result["host"]] = result
+    if path == CALIBRATION_FILE:
+        ensure_data_dir()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(saved, f, indent=2)
+    os.replace(tmp, path)
+
+
+def get_bcrypt_rounds():
+    """Return the target bcrypt cost for new hashes (MIN_ROUNDS until this host is calibrated)."""
+    global _target
+    if _target is None:
+        with _target_lock:
+            if _target is None:
+                _target = _resolve_target()
+    return _target
+
+
+def _resolve_target():
+    override = os.environ.get("PLATFORM_BCRYPT_ROUNDS")
+    if override:
+        return int(override)
+    saved = _saved_calibration()
+    return saved["rounds"] if saved else MIN_ROUNDS
+
+
+def _saved_calibration():
+    # This host's saved calibration, if it was made for the current budget
+    saved = load_calibration()
+    return saved if saved and saved.get("budget_ms") == LOGIN_P99_BUDGET_MS else None
+
+
+def calibrate_at_startup(background=True):
+    """
+    Calibrate this host once if it has no saved calibration for the current budget.
+
+    Does nothing when PLATFORM_BCRYPT_ROUNDS is set, a calibration is
+    saved, or this process already started one. The result is saved and
+    becomes the target; until then get_bcrypt_rounds() returns MIN_ROUNDS.
+
+    Returns:
+        threading.Thread running the calibration, or None
+    """
+    global _calibration_started
+    with _target_lock:
+        if _calibration_started or os.environ.get("PLATFORM_BCRYPT_ROUNDS") or _saved_calibration():
+            return None
+        _calibration_started = True
+
+    def run():
+        result = calibrate_bcrypt_rounds()
+        try:
+            save_calibration(result)
+        except OSError:
+            pass  # read-only checkout: keep the result for this process only
+        set_bcrypt_rounds(result["rounds"])
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="bcrypt-calibration", daemon=True)
+    thread.start()
+    return thread
+
+
+def set_bcrypt_rounds(rounds):
+    """Override the target cost for this process (None re-resolves it on next use)."""
+    global _target
+    _target = rounds
+
+
+def needs_rehash(password_hash, rounds=None):
+    """True if a stored hash's cost is below the target (or below rounds), or unreadable."""
+    cost = hash_rounds(password_hash)
+    return cost is None or cost < (get_bcrypt_rounds() if rounds is None else rounds)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt cost against a login latency budget.")
+    parser.add_argument("--budget-ms", type=float, default=LOGIN_P99_BUDGET_MS, help="p99 checkpw budget")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="checkpw calls timed per cost")
+    parser.add_argument("--dry-run", action="store_true", help="Print the result without saving it")
+    args = parser.parse_args()
+
+    result = calibrate_bcrypt_rounds(args.budget_ms, samples=args.samples)
+    print(f"{'Cost':<6} {'p99 ms':>10}")
+    for rounds, p99 in result["measured"].items():
+        print(f"{rounds:<6} {p99:>10.1f}{'  <- target' if rounds == result['rounds'] else ''}")
+    if not args.dry_run:
+        save_calibration(result)
+        print(f"✅ bcrypt cost {result['rounds']} saved for {result['host']} (budget {args.budget_ms:.0f} ms p99)")
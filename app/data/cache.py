@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+CACHE_SIZE = 256
+
+
+def table_version(conn, table_name):
+    """
+    Return the write version of table_name, or None if it is not tracked.
+
+    Versions live in table_versions and are bumped by the triggers
+    schema.create_table_versions_table installs (and by
+    schema.bump_table_version after rebuilds), so writes from any process
+    or connection are seen.
+    """
+    try:
+        row = conn.execute(
+            "SELECT version FROM table_versions WHERE table_name = ?", (table_name,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else 0
+
+
+def database_file(conn):
+    """Return the file backing the connection's main database ("" for :memory: and temp databases)."""
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return path
+    return ""
+
+
+class QueryCache:
+    """
+    LRU cache of DataFrames keyed on (database, query, params).
+
+    The database is its file; in-memory databases have none, so they are
+    told apart by connection (the entry holds the connection, so its id
+    cannot be reused while the entry exists).
+
+    Each entry remembers the write versions of the tables it was built
+    from; a lookup re-reads those versions (a primary-key lookup each)
+    and treats the entry as stale if any has moved. Tables without a
+    version counter are never cached.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def read_sql(self, conn, query, params=(), tables=(), transform=None):
+        """
+        pd.read_sql_query with caching; returns a copy the caller may modify.
+
+        transform(conn, df) -> df, if given, is applied before the result
+        is cached (e.g. lookups.decode_columns), so hits skip it too.
+        """
+        import pandas as pd
+
+        def read():
+            df = pd.read_sql_query(query, conn, params=params)
+            return transform(conn, df) if transform else df
+
+        versions = tuple(table_version(conn, t) for t in tables)
+        if not tables or None in versions:
+            return read()
+
+        path = database_file(conn)
+        key = (path or id(conn), query, tuple(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2].copy()
+            self.misses += 1
+
+        df = read()
+        with self._lock:
+            self._entries[key] = (tuple(tables), versions, df, None if path else conn)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return df.copy()
+
+    def invalidate(self, table_name=None):
+        """Drop entries built from table_name (or everything)."""
+        with self._lock:
+            if table_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if table_name in e[0]]:
+                del self._entries[key]
+
+    def stats(self):
+        """Return hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -1,10 +1,424 @@
+import os
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
+from app.data.metrics import connection_factory
+
 BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = Path("DATA") / "intelligence_platform.db"
+# PLATFORM_DB_PATH points the app at another database (benchmarks, scratch copies)
+DB_PATH = Path(os.environ.get("PLATFORM_DB_PATH", Path("DATA") / "intelligence_platform.db"))
 DATA_DIR = BASE_DIR / "DATA"
 
+# Pragmas applied once to every connection the pool opens
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,       # negative = KiB, so ~16 MB page cache
+    "mmap_size": 268435456,     # 256 MB
+    "busy_timeout": 5000,       # milliseconds
+}
+
+# Pragmas for read-only analytics connections: journal_mode is the file's (set to WAL by
+# writers) and query_only makes any write attempt fail instead of taking the write lock
+READ_PRAGMAS = {
+    "query_only": 1,
+    "cache_size": -16000,
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+POOL_SIZE = 8
+POOL_TIMEOUT = 5.0
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free within the timeout."""
+
+
+def apply_pragmas(conn, pragmas=None):
+    """Apply tuning pragmas to a connection."""
+    for name, value in (pragmas or PRAGMAS).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def ensure_parent_dir(db_path):
+    """Create the directory holding a database file, so importing the app never has to."""
+    if str(db_path) != ":memory:" and not str(db_path).startswith("file:"):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+
 def connect_database(db_path=DB_PATH):
     """Connect to SQLite database."""
-    return sqlite3.connect(str(db_path))
\ No newline at end of file
+    ensure_parent_dir(db_path)
+    return sqlite3.connect(str(db_path), factory=connection_factory())
+
+
+def begin_immediate(conn):
+    """
+    Open a write transaction, taking the write lock up front.
+
+    Raises:
+        sqlite3.ProgrammingError: if conn already has a transaction open; committing it
+            here would also commit the caller's earlier statements
+    """
+    if conn.in_transaction:
+        raise sqlite3.ProgrammingError(
+            "A transaction is already open on this connection; commit or roll it back first"
+        )
+    conn.execute("BEGIN IMMEDIATE")
+
+
+def readonly_uri(db_path):
+    """file: URI opening db_path read-only (mode=ro)."""
+    return f"{Path(db_path).resolve().as_uri()}?mode=ro"
+
+
+def ensure_wal(db_path):
+    """
+    Create db_path if needed and switch it to WAL.
+
+    Read-only connections cannot change the journal mode, and only under
+    WAL do readers keep their snapshot without waiting on a writer.
+    """
+    ensure_parent_dir(db_path)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+    finally:
+        conn.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of tuned SQLite connections for one database file.
+
+    Connections are created lazily up to max_size and reused afterwards.
+    A thread that asks for a connection while it already holds one gets
+    the same connection back, so nested helpers share one transaction.
+
+    With readonly, connections are opened with a mode=ro URI and
+    READ_PRAGMAS (query_only), for analytics that must never write.
+
+    Args:
+        db_path: Path to the database file
+        max_size: Maximum number of open connections
+        timeout: Seconds to wait for a free connection before PoolTimeout
+        pragmas: Pragmas to apply to new connections (default: PRAGMAS, or READ_PRAGMAS if readonly)
+        readonly: Open read-only connections
+    """
+
+    def __init__(self, db_path=DB_PATH, max_size=POOL_SIZE, timeout=POOL_TIMEOUT, pragmas=None, readonly=False):
+        self.db_path = str(db_path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.readonly = readonly
+        self.pragmas = dict((READ_PRAGMAS if readonly else PRAGMAS) if pragmas is None else pragmas)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+    def _check_pid(self):
+        # Connections must not cross a fork, so a child process starts a fresh pool
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+                    self._local = threading.local()
+
+    def _new_connection(self):
+        if self.readonly:
+            conn = sqlite3.connect(readonly_uri(self.db_path), uri=True, timeout=self.timeout,
+                                   check_same_thread=False, factory=connection_factory())
+            return apply_pragmas(conn, self.pragmas)
+        ensure_parent_dir(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               factory=connection_factory())
+        return apply_pragmas(conn, self.pragmas)
+
+    def acquire(self):
+        """Take a connection out of the pool, opening a new one if allowed."""
+        self._check_pid()
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._hits += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = len(self._all) < self.max_size
+            if can_create:
+                self._misses += 1
+                # Reserve the slot before connecting so concurrent callers respect max_size
+                self._all.append(None)
+        if can_create:
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._lock:
+                    self._all.remove(None)
+                raise
+            with self._lock:
+                self._all[self._all.index(None)] = conn
+            return conn
+
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        finally:
+            waited = time.perf_counter() - start
+            with self._lock:
+                self._waits += 1
+                self._wait_time += waited
+                self._max_wait = max(self._max_wait, waited)
+        with self._lock:
+            self._hits += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, discarding any open transaction."""
+        if self._pid != os.getpid():
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a with-block.
+
+        Commits on a clean exit and rolls back if the block raises.
+        """
+        self._check_pid()
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            # Re-entrant use on the same thread: hand back the connection already held
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        self._local.depth = 0
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self.release(conn)
+
+    def stats(self):
+        """Return pool hit/miss and wait-time counters."""
+        with self._lock:
+            return {
+                "readonly": self.readonly,
+                "size": len(self._all),
+                "idle": self._idle.qsize(),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "waits": self._waits,
+                "wait_time_total": self._wait_time,
+                "wait_time_max": self._max_wait,
+            }
+
+    def close_all(self):
+        """Close every idle connection and forget the pool's contents."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._all = []
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH, readonly=False):
+    """Return the process-wide pool for db_path (read-write, or read-only), creating it on first use."""
+    key = (str(Path(db_path).resolve()), readonly)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                if readonly:
+                    ensure_wal(db_path)
+                pool = ConnectionPool(db_path, readonly=readonly)
+                _pools[key] = pool
+    return pool
+
+
+def get_read_pool(db_path=DB_PATH):
+    """Return the process-wide read-only pool for db_path."""
+    return get_pool(db_path, readonly=True)
+
+
+@contextmanager
+def get_connection(db_path=DB_PATH):
+    """
+    Borrow a pooled, tuned connection.
+
+    Usage:
+        with get_connection() as conn:
+            conn.execute(...)
+    """
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def pool_stats(db_path=DB_PATH):
+    """Return hit/miss and wait-time counters for the pool on db_path."""
+    return get_pool(db_path).stats()
+
+
+@contextmanager
+def read_snapshot(db_path=DB_PATH):
+    """
+    Borrow a read-only connection that sees one snapshot for the whole with-block.
+
+    Every query in the block reads the database as of its start, so a
+    dashboard render built from several queries is internally consistent.
+    Under WAL the snapshot never waits on, or blocks, the writer. Nested
+    use on the same thread shares the outer snapshot.
+
+    Usage:
+        with read_snapshot() as conn:
+            monthly = get_monthly_incident_counts(conn)
+            by_status = get_high_severity_by_status(conn)
+    """
+    with get_read_pool(db_path).connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        # A deferred BEGIN takes its snapshot at the first read, so read now
+        conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+
+class Writer:
+    """
+    The single thread that applies this process's writes to one database file.
+
+    Jobs run one at a time, each on a pooled connection (so helpers that
+    call get_connection share it) and in its own transaction: committed
+    when the job returns, rolled back if it raises. Writes never contend
+    with each other for the write lock, and readers on read_snapshot
+    connections never wait for them. The app's writes (dashboard forms,
+    registration, password rehashes, sessions) all go through it; batch
+    CLI tools such as user_onboarding and datasets run in their own
+    process and write on their own connection, one batch per transaction.
+
+    Args:
+        db_path: Path to the database file
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = str(db_path)
+        self.pool = get_pool(db_path)
+        self.pid = os.getpid()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._jobs = 0
+        self._failed = 0
+        self._busy_time = 0.0
+
+    def _run(self, fn, args, kwargs):
+        start = time.perf_counter()
+        self._local.active = True
+        try:
+            with self.pool.connection() as conn:
+                return fn(conn, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            self._local.active = False
+            with self._lock:
+                self._jobs += 1
+                self._busy_time += time.perf_counter() - start
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(conn, *args, **kwargs) on the writer thread; returns a concurrent.futures.Future."""
+        return self.executor.submit(self._run, fn, args, kwargs)
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn(conn, *args, **kwargs) on the writer thread and return its result (or raise its error)."""
+        if getattr(self._local, "active", False):
+            # Already on the writer thread (a write calling a write): run inline
+            with self.pool.connection() as conn:
+                return fn(conn, *args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self):
+        """Return job, failure and busy-time counters."""
+        with self._lock:
+            return {"jobs": self._jobs, "failed": self._failed, "busy_time_total": self._busy_time}
+
+    def close(self, wait=True):
+        """Stop the writer thread; queued jobs are dropped unless wait is True."""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path=DB_PATH):
+    """Return the process-wide Writer for db_path, starting it on first use."""
+    key = str(Path(db_path).resolve())
+    writer = _writers.get(key)
+    if writer is None or writer.pid != os.getpid():
+        with _writers_lock:
+            writer = _writers.get(key)
+            # The writer thread does not survive a fork, so a child starts its own
+            if writer is None or writer.pid != os.getpid():
+                writer = _writers[key] = Writer(db_path)
+    return writer
+
+
+def _execute(conn, query, params):
+    return conn.execute(query, params).rowcount
+
+
+def execute_write(query, params=(), db_path=DB_PATH):
+    """Run one write statement on the writer thread; returns the number of rows it changed."""
+    return get_writer(db_path).run(_execute, query, params)
@@ -1,18 +1,63 @@
-import pandas as pd
-from app.data.db import connect_database
-from app.data.schema import create_all_tables
+import csv
+import json
+import time
+from datetime import date, datetime, timezone
+from itertools import islice
+
+from app.data.db import begin_immediate
+from app.data.cache import QueryCache
+from app.data.lookups import decode_columns, encode_rows, encode_value, name_filter, select_sql
+
+# Analytics results, invalidated by the cyber_incidents write version (see schema.create_table_versions_table)
+incident_cache = QueryCache()
+
+
+def to_epoch(value):
+    """
+    Convert a timestamp to epoch seconds (UTC).
+
+    Accepts epoch numbers, datetime/date objects and ISO-8601 strings
+    such as "2024-04-12" or "2024-04-12 19:00:00.000000". Naive values
+    are taken as UTC, matching SQLite's strftime('%s', ...).
+
+    Returns:
+        int, or None if the value cannot be parsed
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _decode(conn, df):
+    # Severity, category and status codes -> pandas Categoricals (see app/data/lookups.py)
+    return decode_columns(conn, df, "cyber_incidents")
 
-conn = connect_database()
 
 def insert_incident(conn, timestamp, severity, category, status, description, reported_by=None):
     """
     Insert a new cyber incident into the database.
 
+    Severity, category and status are stored as lookup codes; new names
+    are added to their lookup tables.
+
     Args:
         conn: Database connection
-        date: Incident date (YYYY-MM-DD)
-        incident_type: Type of incident
+        timestamp: When the incident happened (YYYY-MM-DD HH:MM:SS)
         severity: Severity level
+        category: Type of incident
         status: Current status
         description: Incident description
         reported_by: Username of reporter (optional)
@@ -25,34 +70,262 @@ def insert_incident(conn, timestamp, severity, category, status, description, re
 
     # Parameterized SQL query to prevent SQL injection
     insert_sql = """
-            INSERT INTO cyber_incidents (timestamp, severity, category, status, description, reported_by)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO cyber_incidents (timestamp, severity_id, category_id, status_id, description, reported_by,
+                                         occurred_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
             """
 
-    cursor.execute(insert_sql, (timestamp, severity, category, status, description, reported_by))
+    row = (timestamp, severity, category, status, description, reported_by, to_epoch(timestamp))
+    cursor.execute(insert_sql, encode_rows(conn, "cyber_incidents", INCIDENT_COLUMNS + ("occurred_at",), [row])[0])
     conn.commit()
+    incident_cache.invalidate("cyber_incidents")
 
     incident_id = cursor.lastrowid
     return incident_id
 
 
+INCIDENT_COLUMNS = ("timestamp", "severity", "category", "status", "description", "reported_by")
+REQUIRED_INCIDENT_COLUMNS = ("timestamp", "severity", "category", "status")
+
+
+class IncidentValidationError(ValueError):
+    """Raised when a bulk-loaded incident row is malformed."""
+
+
+def iter_incidents_csv(path, **reader_kwargs):
+    """Stream incident dicts from a CSV file with a header row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f, **reader_kwargs)
+
+
+def iter_incidents_jsonl(path):
+    """Stream incident dicts from a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_rows(rows):
+    # DataFrames iterate column names, so walk their rows explicitly
+    if hasattr(rows, "itertuples"):
+        columns = [c for c in INCIDENT_COLUMNS if c in rows.columns]
+        for values in rows[columns].itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+    else:
+        yield from rows
+
+
+def _is_missing(value):
+    # None and "" from CSV mean "missing", as do pandas' NaN/NaT (the only values where
+    # v != v) and pd.NA from nullable dtypes, whose comparisons return NA and cannot be
+    # used as a bool (TypeError)
+    try:
+        return bool(value is None or value != value or value == "")
+    except TypeError:
+        return True
+
+
+def _normalise_incident(row):
+    if isinstance(row, dict):
+        values = tuple(row.get(c) for c in INCIDENT_COLUMNS)
+    else:
+        values = tuple(row)
+        if not 4 <= len(values) <= len(INCIDENT_COLUMNS):
+            raise IncidentValidationError(f"Expected 4-6 fields, got {len(values)}")
+        values += (None,) * (len(INCIDENT_COLUMNS) - len(values))
+
+    values = tuple(None if _is_missing(v) else v for v in values)
+    for name, value in zip(INCIDENT_COLUMNS, values):
+        if name in REQUIRED_INCIDENT_COLUMNS and value is None:
+            raise IncidentValidationError(f"Missing required field '{name}'")
+    values = tuple(str(v) if v is not None else None for v in values)
+    return values + (to_epoch(values[0]),)
+
+
+def insert_incidents_bulk(conn, rows, batch_size=5000, on_error="skip"):
+    """
+    Insert many incidents with executemany, one transaction per batch.
+
+    Rows are pulled from the iterable one batch at a time, so memory use
+    depends on batch_size rather than on the size of the input.
+
+    Args:
+        conn: Database connection
+        rows: Iterable of tuples (in insert_incident argument order), dicts,
+              a pandas DataFrame, or a stream from iter_incidents_csv/jsonl
+        batch_size: Rows per executemany/transaction
+        on_error: "skip" to drop invalid rows, "raise" to abort on the first one
+
+    Returns:
+        dict: inserted, skipped, id_ranges [(first_id, last_id), ...],
+              batches [{"rows": n, "seconds": t}, ...] and errors (first 100)
+
+    Raises:
+        sqlite3.ProgrammingError: if conn already has a transaction open
+    """
+    if on_error not in ("skip", "raise"):
+        raise ValueError("on_error must be 'skip' or 'raise'")
+
+    insert_sql = """
+            INSERT INTO cyber_incidents (timestamp, severity_id, category_id, status_id, description, reported_by,
+                                         occurred_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """
+    result = {"inserted": 0, "skipped": 0, "id_ranges": [], "batches": [], "errors": []}
+    source = _iter_rows(rows)
+    row_number = 0
+
+    while True:
+        raw = list(islice(source, batch_size))
+        if not raw:
+            break
+
+        batch = []
+        for row in raw:
+            row_number += 1
+            try:
+                batch.append(_normalise_incident(row))
+            except (IncidentValidationError, TypeError) as e:
+                if on_error == "raise":
+                    raise IncidentValidationError(f"Row {row_number}: {e}") from e
+                result["skipped"] += 1
+                if len(result["errors"]) < 100:
+                    result["errors"].append((row_number, str(e)))
+        if not batch:
+            continue
+
+        start = time.perf_counter()
+        # IMMEDIATE takes the write lock up front, so the new IDs are contiguous. Outside the
+        # try: if the caller has a transaction open, it must not be rolled back here
+        begin_immediate(conn)
+        try:
+            conn.executemany(insert_sql, encode_rows(conn, "cyber_incidents", INCIDENT_COLUMNS + ("occurred_at",), batch))
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        elapsed = time.perf_counter() - start
+
+        result["inserted"] += len(batch)
+        result["id_ranges"].append((last_id - len(batch) + 1, last_id))
+        result["batches"].append({"rows": len(batch), "seconds": elapsed})
+
+    if result["inserted"]:
+        incident_cache.invalidate("cyber_incidents")
+    return result
+
+
 def get_all_incidents(conn):
     """
     Retrieve all incidents from the database.
 
+    Loads the whole table; prefer get_incidents_page or iter_incidents
+    for anything user-facing.
+
     Returns:
-        pandas.DataFrame: All incidents
+        pandas.DataFrame: All incidents (severity, category and status as Categoricals)
     """
 
     # Use pandas to execute SQL and return a DataFrame
+    import pandas as pd
+
     df = pd.read_sql_query("SELECT * FROM cyber_incidents", conn)
-    return df
+    return _decode(conn, df)
+
+
+def _incident_filters(severity=None, status=None, category=None, start=None, end=None):
+    # Each filter accepts a single value or a list of values
+    clauses, params = [], []
+    for column, value in (("severity", severity), ("status", status), ("category", category)):
+        if value is None:
+            continue
+        clause, values = name_filter("cyber_incidents", column, value)
+        clauses.append(clause)
+        params.extend(values)
+    for op, bound in ((">=", start), ("<", end)):
+        if bound is None:
+            continue
+        epoch = to_epoch(bound)
+        if epoch is None:
+            raise ValueError(f"Unrecognised timestamp: {bound!r}")
+        clauses.append(f"occurred_at {op} ?")
+        params.append(epoch)
+    return clauses, params
+
+
+def get_incidents_page(conn, columns=None, after_id=None, page_size=100, **filters):
+    """
+    Retrieve one page of incidents using keyset pagination on incident_id.
+
+    Args:
+        conn: Database connection
+        columns: Columns to return (default: all); incident_id is always included
+        after_id: Return incidents with incident_id greater than this (None for the first page)
+        page_size: Maximum rows to return
+        **filters: severity, status, category (value or list), start (inclusive) / end (exclusive)
+                   time bounds as anything to_epoch accepts
+
+    Returns:
+        tuple: (pandas.DataFrame with severity, category and status as Categoricals,
+                next_after_id or None if this was the last page)
+    """
+    allowed = ("incident_id",) + INCIDENT_COLUMNS + ("occurred_at", "occurred_day", "occurred_month")
+    columns = list(columns or allowed)
+    unknown = set(columns) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown incident columns: {sorted(unknown)}")
+    if "incident_id" not in columns:
+        columns.insert(0, "incident_id")
+
+    clauses, params = _incident_filters(**filters)
+    if after_id is not None:
+        clauses.append("incident_id > ?")
+        params.append(after_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    query = f"""
+    SELECT {select_sql("cyber_incidents", columns)}
+    FROM cyber_incidents
+    {where}
+    ORDER BY incident_id
+    LIMIT ?
+    """
+    import pandas as pd
+
+    df = _decode(conn, pd.read_sql_query(query, conn, params=params + [page_size]))
+    next_after_id = int(df["incident_id"].iloc[-1]) if len(df) == page_size else None
+    return df, next_after_id
+
+
+def iter_incidents(conn, columns=None, page_size=5000, **filters):
+    """
+    Yield incidents as DataFrame chunks of at most page_size rows.
+
+    Memory use is bounded by page_size regardless of table size.
+    """
+    after_id = None
+    while True:
+        df, after_id = get_incidents_page(conn, columns, after_id, page_size, **filters)
+        if not df.empty:
+            yield df
+        if after_id is None:
+            break
 
 
 def update_incident_status(conn, incident_id, new_status):
     """
     Update the status of an incident.
 
+    Args:
+        conn: Database connection
+        incident_id: ID of the incident
+        new_status: New status name (stored as its lookup code)
+
+    Returns:
+        int: Number of rows updated (0 if there is no such incident)
     """
 
     cursor = conn.cursor()
@@ -60,12 +333,13 @@ def update_incident_status(conn, incident_id, new_status):
     # Parameterized UPDATE query
     update_sql = """
     UPDATE cyber_incidents
-    SET status = ?
+    SET status_id = ?
     WHERE incident_id = ?
     """
 
-    cursor.execute(update_sql, (new_status, incident_id))
+    cursor.execute(update_sql, (encode_value(conn, "cyber_incidents", "status", new_status), incident_id))
     conn.commit()
+    incident_cache.invalidate("cyber_incidents")
 
     print(f"✅ Incident {incident_id} status updated to '{new_status}'.")
     return cursor.rowcount  # Number of rows affected
@@ -75,7 +349,12 @@ def delete_incident(conn, incident_id):
     """
     Delete an incident from the database.
 
-    TODO: Implement DELETE operation.
+    Args:
+        conn: Database connection
+        incident_id: ID of the incident
+
+    Returns:
+        int: Number of rows deleted (0 if there is no such incident)
     """
 
     cursor = conn.cursor()
@@ -88,6 +367,7 @@ def delete_incident(conn, incident_id):
 
     cursor.execute(delete_sql, (incident_id,))
     conn.commit()
+    incident_cache.invalidate("cyber_incidents")
 
     print(f"✅ Incident {incident_id} deleted successfully.")
     return cursor.rowcount  # Number of rows affected (should be 1 if successful)
@@ -96,31 +376,236 @@ def delete_incident(conn, incident_id):
 def get_incidents_by_type_count(conn):
     """
     Count incidents by type.
-    Uses: SELECT, FROM, GROUP BY, ORDER BY
+    Uses: SELECT, FROM, GROUP BY, ORDER BY (over the month level of incident_rollups,
+    plus incidents without a time from the occurred_month index)
     """
     query = """
-    SELECT category, COUNT(*) as count
-    FROM cyber_incidents
-    GROUP BY category 
+    SELECT category_id as category, SUM(count) as count
+    FROM (
+        SELECT category_id, count FROM incident_rollups WHERE level = 'month'
+        UNION ALL
+        SELECT COALESCE(category_id, 0), 1 FROM cyber_incidents WHERE occurred_month IS NULL
+    )
+    GROUP BY category_id
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn)
+    df = incident_cache.read_sql(conn, query, tables=("cyber_incidents",), transform=_decode)
+    return df
+
+
+def get_monthly_incident_counts(conn):
+    """
+    Count incidents per month ("YYYY-MM", or "unknown" without a usable time) and category.
+    Reads the month level of the trigger-maintained incident_rollups, so the
+    cost depends on the number of months x categories, not incidents.
+    """
+    query = """
+    SELECT substr(bucket, 1, 4) || '-' || substr(bucket, 5, 2) as month, category_id as category,
+           SUM(count) as count
+    FROM incident_rollups
+    WHERE level = 'month'
+    GROUP BY bucket, category_id
+    UNION ALL
+    SELECT 'unknown', COALESCE(category_id, 0), COUNT(*)
+    FROM cyber_incidents
+    WHERE occurred_month IS NULL
+    GROUP BY 2
+    ORDER BY month
+    """
+    df = incident_cache.read_sql(conn, query, tables=("cyber_incidents",), transform=_decode)
+    return df
+
+
+def get_incident_time_range(conn):
+    """
+    Return the earliest and latest incident times as UTC datetimes.
+    MIN/MAX are answered from the occurred_at index.
+    """
+    row = conn.execute("SELECT MIN(occurred_at), MAX(occurred_at) FROM cyber_incidents").fetchone()
+    if row[0] is None:
+        return None, None
+    return tuple(datetime.fromtimestamp(v, timezone.utc).replace(tzinfo=None) for v in row)
+
+
+def get_incident_counts_by_period(conn, start=None, end=None, bucket="month", category=None):
+    """
+    Count incidents per time bucket and category within [start, end).
+
+    Filters on the indexed occurred_day / occurred_month columns, so the
+    cost is proportional to the incidents in the window. The window is
+    widened to whole buckets.
+
+    Args:
+        conn: Database connection
+        start, end: Window bounds (anything to_epoch accepts; None = open)
+        bucket: "day" or "month"
+        category: Optional category (value or list)
+
+    Returns:
+        pandas.DataFrame: period (date for day buckets, "YYYY-MM" for months), category, count
+    """
+    if bucket == "day":
+        column, to_bucket = "occurred_day", lambda epoch: epoch // 86400
+    elif bucket == "month":
+        column = "occurred_month"
+        to_bucket = lambda epoch: int(datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m"))
+    else:
+        raise ValueError("bucket must be 'day' or 'month'")
+
+    clauses, params = [f"{column} IS NOT NULL"], []
+    # Compare whole buckets: the end bound is exclusive, so its last included second is end - 1
+    for op, bound, shift in ((">=", start, 0), ("<=", end, -1)):
+        if bound is None:
+            continue
+        epoch = to_epoch(bound)
+        if epoch is None:
+            raise ValueError(f"Unrecognised timestamp: {bound!r}")
+        clauses.append(f"{column} {op} ?")
+        params.append(to_bucket(epoch + shift))
+    if category is not None:
+        clause, values = name_filter("cyber_incidents", "category", category)
+        clauses.append(clause)
+        params.extend(values)
+
+    query = f"""
+    SELECT {column} as period, category_id as category, COUNT(*) as count
+    FROM cyber_incidents
+    WHERE {' AND '.join(clauses)}
+    GROUP BY {column}, category_id
+    ORDER BY {column}
+    """
+    df = incident_cache.read_sql(conn, query, params=params, tables=("cyber_incidents",), transform=_decode)
+    if bucket == "day":
+        import pandas as pd
+
+        df["period"] = pd.to_datetime(df["period"] * 86400, unit="s").dt.date
+    else:
+        df["period"] = df["period"].astype(str).str[:4] + "-" + df["period"].astype(str).str[4:]
     return df
 
 
+# Time-series resolutions, coarsest first, with their nominal length in seconds
+RESOLUTIONS = {"month": 30 * 86400, "week": 7 * 86400, "day": 86400, "hour": 3600}
+TIMESERIES_GROUPS = ("category", "severity", "status")
+# "auto" picks the coarsest resolution that still gives at least this many buckets
+MIN_POINTS = 12
+# Weeks start on Monday; epoch day 0 (1970-01-01) was a Thursday
+_WEEK_OFFSET = 3
+
+
+def choose_resolution(start, end, min_points=MIN_POINTS):
+    """
+    Pick the coarsest resolution giving at least min_points buckets between start and end.
+
+    A year resolves to months, a month to days and a day to hours.
+
+    Returns:
+        str: "month", "week", "day" or "hour"
+    """
+    span = to_epoch(end) - to_epoch(start)
+    for resolution, seconds in RESOLUTIONS.items():
+        if span / seconds >= min_points:
+            return resolution
+    return "hour"
+
+
+def _month_bucket(epoch):
+    return int(datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m"))
+
+
+def get_incident_timeseries(conn, start=None, end=None, resolution="auto", by="category",
+                            category=None, severity=None, status=None):
+    """
+    Count incidents per time bucket within [start, end) from the incident_rollups table.
+
+    Hour, day and month buckets are read directly from their rollup level
+    and weeks are summed from day buckets, so every zoom level is a
+    primary-key range scan over the rollup and never reads
+    cyber_incidents. The window is widened to whole buckets.
+
+    Args:
+        conn: Database connection
+        start, end: Window bounds (anything to_epoch accepts; None = the first/last incident)
+        resolution: "hour", "day", "week", "month" or "auto" (see choose_resolution)
+        by: Break counts down by "category", "severity" or "status"; None for totals
+        category, severity, status: Optional filters (value or list)
+
+    Returns:
+        tuple: (pandas.DataFrame with period (bucket start, UTC), the by column and count, resolution used)
+    """
+    if by is not None and by not in TIMESERIES_GROUPS:
+        raise ValueError(f"by must be one of {TIMESERIES_GROUPS} or None")
+    if start is None or end is None:
+        first, last = get_incident_time_range(conn)
+        if first is None:
+            first = last = datetime.now(timezone.utc).replace(tzinfo=None)
+        start = first if start is None else start
+        # Exclusive end bound: one second past the last incident
+        end = to_epoch(last) + 1 if end is None else end
+    start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+    for bound, epoch in ((start, start_epoch), (end, end_epoch)):
+        if epoch is None:
+            raise ValueError(f"Unrecognised timestamp: {bound!r}")
+    if resolution == "auto":
+        resolution = choose_resolution(start_epoch, end_epoch)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be 'auto' or one of {tuple(RESOLUTIONS)}")
+
+    last_second = max(end_epoch - 1, start_epoch)
+    period = "bucket"
+    if resolution == "hour":
+        level, low, high = "hour", start_epoch // 3600, last_second // 3600
+    elif resolution == "day":
+        level, low, high = "day", start_epoch // 86400, last_second // 86400
+    elif resolution == "week":
+        # Whole Monday-to-Sunday weeks, summed from the day level
+        level, period = "day", f"(bucket + {_WEEK_OFFSET}) / 7"
+        low = (start_epoch // 86400 + _WEEK_OFFSET) // 7 * 7 - _WEEK_OFFSET
+        high = (last_second // 86400 + _WEEK_OFFSET) // 7 * 7 - _WEEK_OFFSET + 6
+    else:
+        level, low, high = "month", _month_bucket(start_epoch), _month_bucket(last_second)
+
+    clauses, params = ["level = ?", "bucket BETWEEN ? AND ?"], [level, low, high]
+    for column, value in (("category", category), ("severity", severity), ("status", status)):
+        if value is not None:
+            clause, values = name_filter("cyber_incidents", column, value)
+            clauses.append(clause)
+            params.extend(values)
+    group = f", {by}_id as {by}" if by else ""
+
+    query = f"""
+    SELECT {period} as period{group}, SUM(count) as count
+    FROM incident_rollups
+    WHERE {' AND '.join(clauses)}
+    GROUP BY 1{', 2' if by else ''}
+    ORDER BY 1
+    """
+    df = incident_cache.read_sql(conn, query, params=params, tables=("cyber_incidents",), transform=_decode)
+
+    import pandas as pd
+
+    if resolution == "month":
+        df["period"] = pd.to_datetime(df["period"].astype(str), format="%Y%m")
+    else:
+        seconds = {"hour": 3600, "day": 86400}.get(resolution)
+        epochs = df["period"] * seconds if seconds else (df["period"] * 7 - _WEEK_OFFSET) * 86400
+        df["period"] = pd.to_datetime(epochs, unit="s")
+    return df, resolution
+
+
 def get_high_severity_by_status(conn):
     """
     Count high severity incidents by status.
     Uses: SELECT, FROM, WHERE, GROUP BY, ORDER BY
     """
     query = """
-    SELECT status, COUNT(*) as count
+    SELECT status_id as status, COUNT(*) as count
     FROM cyber_incidents
-    WHERE severity = 'High'
-    GROUP BY status
+    WHERE severity_id = (SELECT id FROM incident_severities WHERE name = 'High')
+    GROUP BY status_id
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn)
+    df = incident_cache.read_sql(conn, query, tables=("cyber_incidents",), transform=_decode)
     return df
 
 
@@ -130,13 +615,13 @@ def get_incident_types_with_many_cases(conn, min_count=5):
     Uses: SELECT, FROM, GROUP BY, HAVING, ORDER BY
     """
     query = """
-    SELECT category, COUNT(*) as count
+    SELECT category_id as category, COUNT(*) as count
     FROM cyber_incidents
-    GROUP BY category
+    GROUP BY category_id
     HAVING COUNT(*) > ?
     ORDER BY count DESC
     """
-    df = pd.read_sql_query(query, conn, params=(min_count,))
+    df = incident_cache.read_sql(conn, query, params=(min_count,), tables=("cyber_incidents",), transform=_decode)
     return df
 
 # # Test: Run analytical queries
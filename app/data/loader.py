@@ -0,0 +1,213 @@
+import hashlib
+import os
+from pathlib import Path
+
+from app.data.lookups import decode_columns, encode_rows, lookup_table, select_sql, storage_column
+
+# Natural keys for the platform's tables; anything else is deduplicated by content hash
+NATURAL_KEYS = {
+    "cyber_incidents": ("incident_id",),
+    "it_tickets": ("ticket_id",),
+}
+HASH_COLUMN = "row_hash"
+CHUNK_SIZE = 50000
+
+
+def create_load_checkpoints_table(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS load_checkpoints (
+        source TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        file_size INTEGER NOT NULL,
+        file_mtime INTEGER NOT NULL,
+        rows_done INTEGER NOT NULL,
+        PRIMARY KEY (source, table_name)
+    )
+    """)
+    conn.commit()
+
+
+def _table_columns(conn, table_name):
+    return {row[1]: row for row in conn.execute(f"PRAGMA table_info({table_name})")}
+
+
+def _has_unique_index(conn, table_name, columns, table_info):
+    pk = [name for name, row in table_info.items() if row[5]]
+    if list(columns) == pk:
+        return True
+    for index in conn.execute(f"PRAGMA index_list({table_name})"):
+        if not index[2]:
+            continue
+        indexed = [row[2] for row in conn.execute(f"PRAGMA index_info({index[1]})")]
+        if indexed == list(columns):
+            return True
+    return False
+
+
+def _canonical(value):
+    # One text form per value: CSV text and the number SQLite stored for it hash the same
+    if value is None:
+        return ""
+    text = str(value)
+    try:
+        return str(int(text))
+    except ValueError:
+        pass
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    if number != number or number in (float("inf"), float("-inf")):
+        return text
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def row_hashes(frame):
+    """
+    Stable content hash per row.
+
+    Every value is hashed in a canonical form (missing as "", numbers by
+    value, so "100", 100 and 100.0 agree), so a row hashes the same
+    whichever chunk it was read in and whether it comes from a CSV or
+    from rows already in the table.
+    """
+    values = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+    return [
+        hashlib.blake2b("\x1f".join(map(_canonical, v)).encode("utf-8"), digest_size=16).hexdigest()
+        for v in values
+    ]
+
+
+def _ensure_hash_column(conn, table_name, columns, chunksize):
+    # Adds row_hash plus its UNIQUE index, backfilling existing rows one chunk at a time
+    if HASH_COLUMN in _table_columns(conn, table_name):
+        return
+    conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {HASH_COLUMN} TEXT")
+    import pandas as pd
+
+    # Hash the names, not the lookup codes, so stored rows match the CSV rows they came from
+    query = f"SELECT rowid AS _rowid, {select_sql(table_name, columns)} FROM {table_name}"
+    for chunk in pd.read_sql_query(query, conn, chunksize=chunksize):
+        chunk = decode_columns(conn, chunk, table_name)
+        hashes = row_hashes(chunk[list(columns)])
+        conn.executemany(
+            f"UPDATE {table_name} SET {HASH_COLUMN} = ? WHERE rowid = ?",
+            zip(hashes, chunk["_rowid"].tolist())
+        )
+    # Existing exact duplicates would block the UNIQUE index; keep the oldest copy
+    conn.execute(f"""
+    DELETE FROM {table_name} WHERE rowid NOT IN (
+        SELECT MIN(rowid) FROM {table_name} GROUP BY {HASH_COLUMN}
+    )
+    """)
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table_name}_{HASH_COLUMN} ON {table_name}({HASH_COLUMN})"
+    )
+    conn.commit()
+
+
+def load_csv_dedup(conn, csv_path, table_name, key_columns=None, chunksize=CHUNK_SIZE, resume=True):
+    """
+    Stream a CSV into a table, letting SQLite drop rows it already has.
+
+    Duplicates are detected with INSERT OR IGNORE against a UNIQUE index:
+    on the table's natural key when the CSV carries it, otherwise on a
+    row_hash column holding a content hash of the row. Dictionary-encoded
+    columns (severity, status, ...) are read by name and stored as their
+    lookup codes (app/data/lookups.py). Only one chunk of
+    the CSV is in memory at a time and the existing table is never read
+    in full (apart from a one-off hash backfill the first time a table is
+    deduplicated by content).
+
+    Progress is committed together with each chunk in load_checkpoints, so
+    an interrupted load resumes after the last committed chunk. The
+    checkpoint is keyed on the file's size and mtime and ignored if the
+    file has changed.
+
+    Args:
+        conn: Database connection
+        csv_path: Path to CSV file
+        table_name: Name of the target table
+        key_columns: Natural key columns (default: NATURAL_KEYS, else content hash)
+        chunksize: CSV rows per chunk/transaction
+        resume: Resume from a matching checkpoint
+
+    Returns:
+        dict: rows_read, rows_inserted, rows_skipped_resume, key (columns used)
+    """
+    import pandas as pd
+
+    csv_path = Path(csv_path)
+    table_info = _table_columns(conn, table_name)
+    header = pd.read_csv(csv_path, nrows=0).columns
+    columns = [c for c in header if (c in table_info or lookup_table(table_name, c)) and c != HASH_COLUMN]
+    if not columns:
+        raise ValueError(f"{csv_path.name} has no columns in common with {table_name}")
+
+    if key_columns is None:
+        key_columns = NATURAL_KEYS.get(table_name)
+    use_hash = not key_columns or not set(key_columns) <= set(columns)
+    if use_hash:
+        _ensure_hash_column(conn, table_name, columns, chunksize)
+        key_columns = (HASH_COLUMN,)
+    elif not _has_unique_index(conn, table_name, key_columns, table_info):
+        conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table_name}_{'_'.join(key_columns)} "
+            f"ON {table_name}({', '.join(key_columns)})"
+        )
+
+    create_load_checkpoints_table(conn)
+    stat = os.stat(csv_path)
+    source = str(csv_path.resolve())
+    fingerprint = (stat.st_size, int(stat.st_mtime))
+    rows_done = 0
+    if resume:
+        row = conn.execute(
+            "SELECT file_size, file_mtime, rows_done FROM load_checkpoints WHERE source = ? AND table_name = ?",
+            (source, table_name)
+        ).fetchone()
+        if row and (row[0], row[1]) == fingerprint:
+            rows_done = row[2]
+
+    insert_columns = [storage_column(table_name, c) for c in columns] + ([HASH_COLUMN] if use_hash else [])
+    insert_sql = (
+        f"INSERT OR IGNORE INTO {table_name} ({', '.join(insert_columns)}) "
+        f"VALUES ({', '.join('?' * len(insert_columns))})"
+    )
+    checkpoint_sql = """
+    INSERT INTO load_checkpoints (source, table_name, file_size, file_mtime, rows_done)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(source, table_name) DO UPDATE SET
+        file_size = excluded.file_size, file_mtime = excluded.file_mtime, rows_done = excluded.rows_done
+    """
+
+    stats = {"rows_read": 0, "rows_inserted": 0, "rows_skipped_resume": rows_done, "key": tuple(key_columns)}
+    # Read every column as text, so a value does not change form with the dtype
+    # pandas would infer for its chunk; column affinity converts it on insert
+    reader = pd.read_csv(
+        csv_path,
+        usecols=columns,
+        dtype=str,
+        chunksize=chunksize,
+        skiprows=range(1, rows_done + 1) if rows_done else None,
+    )
+    for chunk in reader:
+        chunk = chunk[columns]
+        records = chunk.astype(object).where(chunk.notna(), None).values.tolist()
+        if use_hash:
+            records = [r + [h] for r, h in zip(records, row_hashes(chunk))]
+        records = encode_rows(conn, table_name, columns, records)
+
+        before = conn.total_changes
+        conn.executemany(insert_sql, records)
+        rows_done += len(records)
+        inserted = conn.total_changes - before
+        conn.execute(checkpoint_sql, (source, table_name, *fingerprint, rows_done))
+        conn.commit()
+
+        stats["rows_read"] += len(records)
+        stats["rows_inserted"] += inserted
+
+    conn.execute("DELETE FROM load_checkpoints WHERE source = ? AND table_name = ?", (source, table_name))
+    conn.commit()
+    return stats
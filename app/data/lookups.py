@@ -0,0 +1,149 @@
+"""
+Dictionary-encoded columns.
+
+Severity, category, status and priority repeat a handful of names in
+every incident and ticket row, so tables store a small integer code
+(<column>_id) into a lookup table instead (schema.LOOKUP_COLUMNS):
+
+  * writes pass names; encode_rows / encode_value turn them into codes,
+    adding names the lookup table has not seen yet in the same
+    transaction,
+  * reads select the codes (select_sql) and filter by name with a
+    subquery on the lookup table (name_filter), so grouping and filtering
+    compare integers and stay index lookups,
+  * decode_columns turns code columns into pandas Categoricals whose
+    categories are the lookup names, with one vectorised indexer per
+    column and no per-row Python work.
+"""
+import threading
+
+from app.data.schema import LOOKUP_COLUMNS
+
+# Names per "IN (...)" lookup, below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+# Decoders kept (one per distinct lookup table content)
+MAX_DECODERS = 64
+
+_decoders = {}
+_decoders_lock = threading.Lock()
+
+
+def lookup_table(table, column):
+    """Lookup table holding column's names, or None if the column is stored as is."""
+    return LOOKUP_COLUMNS.get(table, {}).get(column)
+
+
+def storage_column(table, column):
+    """Column that holds column's values in table: <column>_id for encoded columns."""
+    return f"{column}_id" if lookup_table(table, column) else column
+
+
+def select_sql(table, columns, prefix=""):
+    """SELECT list for columns, reading encoded columns as their codes under the column's name."""
+    return ", ".join(
+        f"{prefix}{column}_id AS {column}" if lookup_table(table, column) else f"{prefix}{column}"
+        for column in columns
+    )
+
+
+def name_filter(table, column, values, prefix=""):
+    """
+    WHERE clause matching column against one name or a list of names.
+
+    Returns:
+        tuple: (clause, params)
+    """
+    values = [values] if isinstance(values, str) else list(values)
+    marks = ", ".join("?" * len(values))
+    lookup = lookup_table(table, column)
+    if lookup is None:
+        return f"{prefix}{column} IN ({marks})", values
+    return f"{prefix}{column}_id IN (SELECT id FROM {lookup} WHERE name IN ({marks}))", values
+
+
+def get_codes(conn, lookup, names):
+    """
+    Return {name: id} for names, adding the ones lookup does not have yet.
+
+    Runs in the caller's transaction, so names added for rows that are
+    rolled back are rolled back with them.
+    """
+    names = sorted({name for name in names if name is not None})
+    if not names:
+        return {}
+    conn.executemany(f"INSERT OR IGNORE INTO {lookup} (name) VALUES (?)", [(name,) for name in names])
+    codes = {}
+    for start in range(0, len(names), LOOKUP_CHUNK):
+        chunk = names[start:start + LOOKUP_CHUNK]
+        codes.update(conn.execute(
+            f"SELECT name, id FROM {lookup} WHERE name IN ({', '.join('?' * len(chunk))})", chunk
+        ))
+    return codes
+
+
+def encode_value(conn, table, column, name):
+    """Code for one name of an encoded column (None stays None)."""
+    return get_codes(conn, lookup_table(table, column), [name]).get(name)
+
+
+def encode_rows(conn, table, columns, rows):
+    """
+    Replace names with codes in rows (tuples or lists in columns order).
+
+    One lookup round trip per encoded column per call, whatever the
+    number of rows.
+
+    Returns:
+        list of tuples
+    """
+    encoded = [(i, lookup_table(table, column)) for i, column in enumerate(columns)
+               if lookup_table(table, column)]
+    rows = [list(row) for row in rows]
+    for i, lookup in encoded:
+        codes = get_codes(conn, lookup, (row[i] for row in rows))
+        for row in rows:
+            row[i] = codes.get(row[i])
+    return [tuple(row) for row in rows]
+
+
+def _decoder(conn, lookup):
+    # (ids Index, CategoricalDtype) for the lookup's current content. Keyed on the rows
+    # themselves, so a changed or recreated table never reuses a stale decoder.
+    rows = tuple(conn.execute(f"SELECT id, name FROM {lookup} ORDER BY id"))
+    key = (lookup, rows)
+    decoder = _decoders.get(key)
+    if decoder is None:
+        import pandas as pd
+
+        decoder = (pd.Index([row[0] for row in rows], dtype="int64"),
+                   pd.CategoricalDtype([row[1] for row in rows]))
+        with _decoders_lock:
+            if len(_decoders) >= MAX_DECODERS:
+                _decoders.clear()
+            _decoders[key] = decoder
+    return decoder
+
+
+def decode_columns(conn, df, table):
+    """
+    Turn the lookup codes in df into pandas Categoricals, in place.
+
+    A column named after an encoded column (selected with select_sql) or
+    after its code column (<column>_id, as from SELECT *) is decoded; the
+    latter is renamed to the column name. Categories are the lookup's
+    names in code order; codes without a name (0, NULL) become NaN.
+
+    Returns:
+        pandas.DataFrame: df
+    """
+    import pandas as pd
+
+    for column, lookup in LOOKUP_COLUMNS.get(table, {}).items():
+        source = column if column in df.columns else f"{column}_id"
+        if source not in df.columns:
+            continue
+        ids, dtype = _decoder(conn, lookup)
+        df[source] = pd.Categorical.from_codes(ids.get_indexer(df[source]), dtype=dtype)
+        if source != column:
+            df.rename(columns={source: column}, inplace=True)
+    return df
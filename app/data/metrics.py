@@ -0,0 +1,334 @@
+"""
+SQL tracing and per-query metrics.
+
+When enabled (PLATFORM_SQL_METRICS=1 or enable_metrics()), connections
+opened through app.data.db use TracedConnection: execute/executemany and
+the fetch calls are timed, and each statement is recorded against its
+fingerprint (the SQL with literals replaced by ?) in an in-process
+registry: call count, total and p50/p99 latency, rows returned or
+changed, and how many statements SQLite ran for it (triggers included,
+via set_trace_callback). Statements slower than the threshold go to the
+slow-query log.
+
+When disabled, connections are plain sqlite3.Connection objects, so the
+hot path pays nothing; connections opened while enabled stop recording
+after disable_metrics() at the cost of one attribute check per call.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+SAMPLE_SIZE = 1024          # latencies kept per fingerprint for the percentiles
+SLOW_LOG_SIZE = 200
+SLOW_QUERY_MS = float(os.environ.get("PLATFORM_SLOW_QUERY_MS", 100))
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """Normalise a statement so calls that differ only in literals aggregate together."""
+    sql = _COMMENTS.sub(" ", sql)
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _LISTS.sub("(?+)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class QueryMetrics:
+    """
+    Thread-safe registry of per-fingerprint statement statistics.
+
+    Args:
+        slow_query_ms: Statements at or above this many milliseconds are logged as slow
+        enabled: Whether new connections are traced
+    """
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, enabled=False):
+        self.slow_query_ms = slow_query_ms
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._entries = {}
+            self.slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+
+    def _entry(self, fp):
+        entry = self._entries.get(fp)
+        if entry is None:
+            entry = self._entries[fp] = {
+                "count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "rows": 0, "statements": 0,
+                "untimed": 0, "samples": deque(maxlen=SAMPLE_SIZE),
+            }
+        return entry
+
+    def observe(self, sql, seconds, rows, statements=1):
+        """Record one timed execution of sql."""
+        fp = fingerprint(sql)
+        with self._lock:
+            entry = self._entry(fp)
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["rows"] += max(rows, 0)
+            entry["statements"] += statements
+            entry["samples"].append(seconds)
+        if seconds * 1000 >= self.slow_query_ms:
+            self._log_slow(sql, fp, seconds, rows)
+
+    def observe_untimed(self, sql):
+        """Record a statement seen only by the trace callback (BEGIN/COMMIT, executescript)."""
+        with self._lock:
+            self._entry(fingerprint(sql))["untimed"] += 1
+
+    def _log_slow(self, sql, fp, seconds, rows):
+        import logging
+
+        record = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "ms": round(seconds * 1000, 3), "rows": rows,
+                  "fingerprint": fp, "sql": sql[:2000]}
+        with self._lock:
+            self.slow_queries.append(record)
+        logging.getLogger("app.sql.slow").warning("slow query (%.1f ms, %d rows): %s", record["ms"], rows, fp)
+
+    def snapshot(self):
+        """
+        Return the current statistics, most total time first.
+
+        Returns:
+            list: dicts with query_id, fingerprint, count, total_ms, mean_ms, p50_ms, p99_ms, max_ms,
+                  rows, statements and untimed
+        """
+        with self._lock:
+            items = [(fp, dict(e, samples=sorted(e["samples"]))) for fp, e in self._entries.items()]
+        result = []
+        for fp, e in items:
+            samples = e["samples"]
+
+            def pct(q):
+                return samples[min(len(samples) - 1, int(q * len(samples)))] * 1000 if samples else 0.0
+
+            result.append({
+                "query_id": hashlib.blake2b(fp.encode("utf-8"), digest_size=6).hexdigest(),
+                "fingerprint": fp,
+                "count": e["count"],
+                "total_ms": e["total_seconds"] * 1000,
+                "mean_ms": e["total_seconds"] * 1000 / e["count"] if e["count"] else 0.0,
+                "p50_ms": pct(0.50),
+                "p99_ms": pct(0.99),
+                "max_ms": e["max_seconds"] * 1000,
+                "rows": e["rows"],
+                "statements": e["statements"],
+                "untimed": e["untimed"],
+            })
+        return sorted(result, key=lambda r: r["total_ms"], reverse=True)
+
+    def to_json(self):
+        return json.dumps({"queries": self.snapshot(), "slow_queries": list(self.slow_queries)}, indent=2)
+
+    def to_prometheus(self):
+        """Render the registry in the Prometheus text exposition format."""
+        def label(value):
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")[:300]
+
+        lines = [
+            "# HELP sqlite_query_duration_seconds Statement latency by query fingerprint.",
+            "# TYPE sqlite_query_duration_seconds summary",
+        ]
+        rows = ["# HELP sqlite_query_rows_total Rows returned or changed.", "# TYPE sqlite_query_rows_total counter"]
+        untimed = ["# HELP sqlite_query_untimed_total Statements seen only by the trace callback.",
+                   "# TYPE sqlite_query_untimed_total counter"]
+        for q in self.snapshot():
+            labels = f'query_id="{q["query_id"]}",query="{label(q["fingerprint"])}"'
+            if q["count"]:
+                for quantile, key in (("0.5", "p50_ms"), ("0.99", "p99_ms")):
+                    lines.append(f'sqlite_query_duration_seconds{{{labels},quantile="{quantile}"}} {q[key] / 1000:.9f}')
+                lines.append(f"sqlite_query_duration_seconds_sum{{{labels}}} {q['total_ms'] / 1000:.9f}")
+                lines.append(f"sqlite_query_duration_seconds_count{{{labels}}} {q['count']}")
+                rows.append(f"sqlite_query_rows_total{{{labels}}} {q['rows']}")
+            if q["untimed"]:
+                untimed.append(f"sqlite_query_untimed_total{{{labels}}} {q['untimed']}")
+        lines.append(f"# HELP sqlite_slow_queries_logged Slow queries currently in the log (>= {self.slow_query_ms} ms).")
+        lines.append("# TYPE sqlite_slow_queries_logged gauge")
+        lines.append(f"sqlite_slow_queries_logged {len(self.slow_queries)}")
+        return "\n".join(lines + rows + untimed) + "\n"
+
+
+registry = QueryMetrics(enabled=os.environ.get("PLATFORM_SQL_METRICS", "") not in ("", "0"))
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times execute and fetch calls and reports each statement to the registry."""
+
+    _pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, seconds, rows, events = pending
+            registry.observe(sql, seconds, rows, events)
+
+    def _run(self, method, sql, arg):
+        self._finish()
+        conn = self.connection
+        conn._trace_events = 0
+        conn._timing += 1
+        start = time.perf_counter()
+        try:
+            method(self, sql, arg)
+        finally:
+            elapsed = time.perf_counter() - start
+            conn._timing -= 1
+        events = max(conn._trace_events, 1)
+        if self.description is None:
+            # Not a query: nothing to fetch, so the statement is complete
+            registry.observe(sql, elapsed, self.rowcount, events)
+        else:
+            self._pending = [sql, elapsed, 0, events]
+        return self
+
+    def execute(self, sql, parameters=()):
+        if not registry.enabled:
+            return super().execute(sql, parameters)
+        return self._run(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not registry.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self._run(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+
+    def _fetch(self, method, *args):
+        pending = self._pending
+        if pending is None:
+            return method(self, *args)
+        start = time.perf_counter()
+        result = method(self, *args)
+        pending[1] += time.perf_counter() - start
+        return result
+
+    def fetchone(self):
+        row = self._fetch(sqlite3.Cursor.fetchone)
+        if self._pending is not None:
+            if row is None:
+                self._finish()
+            else:
+                self._pending[2] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        rows = self._fetch(sqlite3.Cursor.fetchmany, size)
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+            if len(rows) < size:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(sqlite3.Cursor.fetchall)
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+            self._finish()
+        return rows
+
+    def __next__(self):
+        if self._pending is None:
+            return super().__next__()
+        try:
+            row = self._fetch(sqlite3.Cursor.__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        self._pending[2] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Lookups often read one row and drop the cursor; record them here
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection whose statements are recorded in the metrics registry."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timing = 0
+        self._trace_events = 0
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        # Inside a timed call this counts the statements SQLite ran (trigger bodies
+        # included); anything else (BEGIN/COMMIT, executescript) is recorded untimed
+        if self._timing:
+            self._trace_events += 1
+        elif registry.enabled:
+            registry.observe_untimed(statement)
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute does not go through cursor(), so route it explicitly
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory():
+    """The sqlite3.connect factory for new connections: traced only while metrics are enabled."""
+    return TracedConnection if registry.enabled else sqlite3.Connection
+
+
+def enable_metrics(slow_query_ms=None):
+    """Trace connections opened from now on; optionally change the slow-query threshold."""
+    registry.enabled = True
+    if slow_query_ms is not None:
+        registry.slow_query_ms = slow_query_ms
+
+
+def disable_metrics():
+    """Stop recording. Already-open traced connections fall back to a pass-through."""
+    registry.enabled = False
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def export_prometheus(path=None):
+    """Return the metrics as Prometheus text; also write them atomically to path if given."""
+    text = registry.to_prometheus()
+    if path:
+        _write_atomic(path, text)
+    return text
+
+
+def export_json(path=None):
+    """Return the metrics and slow-query log as JSON; also write them to path if given."""
+    text = registry.to_json()
+    if path:
+        _write_atomic(path, text)
+    return text
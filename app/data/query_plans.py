@@ -0,0 +1,117 @@
+"""
+Query-plan regression check.
+
+Runs every query in QUERY_REGISTRY against a database with the full
+schema, captures the SQL each one issues, and runs EXPLAIN QUERY PLAN on
+it. Any plan step that scans a table without an index fails the check,
+unless that table is listed as an allowed scan for the entry. Lookup
+tables (schema.LOOKUP_TABLES) are small dictionaries read whole when
+decoding, so scanning them is always allowed.
+
+Usage:
+    python -m app.data.query_plans            # exits 1 on any full scan
+"""
+import re
+import sqlite3
+import sys
+
+from app.data import incidents, search, tickets
+from app.data.schema import LOOKUP_TABLES, create_all_tables
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+# name -> (callable(conn) or SQL string, tables a full scan is acceptable on)
+QUERY_REGISTRY = {
+    "incidents.get_incidents_by_type_count": (incidents.get_incidents_by_type_count, ()),
+    "incidents.get_monthly_incident_counts": (incidents.get_monthly_incident_counts, ()),
+    "incidents.get_high_severity_by_status": (incidents.get_high_severity_by_status, ()),
+    "incidents.get_incident_types_with_many_cases": (incidents.get_incident_types_with_many_cases, ()),
+    "incidents.get_all_incidents": (incidents.get_all_incidents, ("cyber_incidents",)),
+    "incidents.get_incidents_page[next]": (lambda conn: incidents.get_incidents_page(conn, after_id=0), ()),
+    "incidents.get_incidents_page[severity]": (
+        lambda conn: incidents.get_incidents_page(conn, severity=["High", "Critical"]), ()),
+    "incidents.get_incidents_page[status]": (lambda conn: incidents.get_incidents_page(conn, status="Open"), ()),
+    "incidents.get_incidents_page[category]": (
+        lambda conn: incidents.get_incidents_page(conn, category="Phishing", after_id=10), ()),
+    "incidents.get_incidents_page[time]": (
+        lambda conn: incidents.get_incidents_page(conn, start="2024-01-01", end="2024-02-01"), ()),
+    "incidents.get_incident_time_range": (incidents.get_incident_time_range, ()),
+    "incidents.get_incident_counts_by_period[day]": (
+        lambda conn: incidents.get_incident_counts_by_period(conn, "2024-01-01", "2024-02-01", bucket="day"), ()),
+    "incidents.get_incident_counts_by_period[month]": (
+        lambda conn: incidents.get_incident_counts_by_period(conn, "2024-01-01", "2025-01-01"), ()),
+    "incidents.get_incident_timeseries[auto]": (
+        lambda conn: incidents.get_incident_timeseries(conn, "2024-01-01", "2025-01-01"), ()),
+    "incidents.get_incident_timeseries[week]": (
+        lambda conn: incidents.get_incident_timeseries(conn, "2024-01-01", "2024-04-01", "week", by="severity",
+                                                       status="Open"), ()),
+    "incidents.get_incident_timeseries[hour]": (
+        lambda conn: incidents.get_incident_timeseries(conn, "2024-01-05", "2024-01-06", "hour", by=None), ()),
+    "tickets.get_tickets_page[next]": (lambda conn: tickets.get_tickets_page(conn, after_id=0), ()),
+    "tickets.get_tickets_page[status]": (lambda conn: tickets.get_tickets_page(conn, status=["Open", "In Progress"]), ()),
+    "tickets.get_tickets_page[assignee]": (
+        lambda conn: tickets.get_tickets_page(conn, assigned_to="IT_Support_A", after_id=10), ()),
+    "tickets.get_resolution_time_percentiles": (tickets.get_resolution_time_percentiles, ("it_tickets",)),
+    "tickets.get_backlog_aging": (tickets.get_backlog_aging, ()),
+    "tickets.get_weekly_throughput": (tickets.get_weekly_throughput, ("it_tickets", "events", "weekly")),
+    "search.search_incidents": (lambda conn: search.search_incidents(conn, "phishing email"), ()),
+    "search.search_tickets": (lambda conn: search.search_tickets(conn, "printer"), ()),
+    "users.get_user_by_username": ("SELECT * FROM users WHERE username = 'alice'", ()),
+    "sessions.validate": ("SELECT username, role, expires_at FROM sessions WHERE token_id = 'x' AND revoked = 0", ()),
+    "sessions.revoke_user": ("UPDATE sessions SET revoked = 1 WHERE username = 'alice' AND revoked = 0", ()),
+    "table_versions.lookup": ("SELECT version FROM table_versions WHERE table_name = 'cyber_incidents'", ()),
+}
+
+
+def capture_statements(conn, query):
+    """Run a registry entry and return the SQL statements it executed."""
+    if isinstance(query, str):
+        return [query]
+    statements = []
+    incidents.incident_cache.invalidate()
+    tickets.ticket_cache.invalidate()
+    conn.set_trace_callback(statements.append)
+    try:
+        query(conn)
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE"))]
+
+
+def explain(conn, statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+
+
+def check_query_plans(conn=None, registry=None):
+    """
+    Check every registered query for unindexed full table scans.
+
+    Args:
+        conn: Database to check against (default: a fresh in-memory database with the full schema)
+        registry: Mapping like QUERY_REGISTRY (default: QUERY_REGISTRY)
+
+    Returns:
+        list: (name, statement, plan detail) for every offending plan step
+    """
+    if conn is None:
+        conn = sqlite3.connect(":memory:")
+        create_all_tables(conn)
+    failures = []
+    for name, (query, allowed_scans) in (registry or QUERY_REGISTRY).items():
+        for statement in capture_statements(conn, query):
+            for detail in explain(conn, statement):
+                match = FULL_SCAN.match(detail)
+                if match and match.group(1) not in allowed_scans and match.group(1) not in LOOKUP_TABLES:
+                    failures.append((name, statement.strip(), detail))
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_query_plans()
+    if failures:
+        print(f"❌ {len(failures)} query plan(s) fall back to a full table scan:")
+        for name, statement, detail in failures:
+            print(f"\n  {name}: {detail}\n    {' '.join(statement.split())}")
+        sys.exit(1)
+    print(f"✅ All {len(QUERY_REGISTRY)} registered queries use an index.")
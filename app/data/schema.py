@@ -1,8 +1,13 @@
+import os
 import sqlite3
 # from app.config import DATA_DIR, DB_PATH
 from pathlib import Path
+
+from app.data.metrics import connection_factory
+
 BASE_DIR = Path(__file__).resolve().parent.parent
-DB_PATH = Path("DATA") / "intelligence_platform.db"
+# PLATFORM_DB_PATH points the app at another database (benchmarks, scratch copies)
+DB_PATH = Path(os.environ.get("PLATFORM_DB_PATH", Path("DATA") / "intelligence_platform.db"))
 DATA_DIR = BASE_DIR / "DATA"
 
 def ensure_data_dir():
@@ -16,7 +21,7 @@ def connect_database(db_path=DB_PATH):
     Creates the database file if it doesn't exist.
     """
     ensure_data_dir()
-    return sqlite3.connect(str(db_path))
+    return sqlite3.connect(str(db_path), factory=connection_factory())
 
 
 def create_users_table(conn):
@@ -34,6 +39,49 @@ def create_users_table(conn):
     print("✅ Users table created successfully!")
 
 
+# Dictionary-encoded columns: table -> {column: lookup table}. The table stores the
+# lookup id in <column>_id; app/data/lookups.py encodes names on write and decodes reads.
+LOOKUP_COLUMNS = {
+    "cyber_incidents": {"severity": "incident_severities", "category": "incident_categories",
+                        "status": "incident_statuses"},
+    "it_tickets": {"priority": "ticket_priorities", "status": "ticket_statuses", "category": "ticket_categories"},
+}
+LOOKUP_TABLES = tuple(sorted({lookup for columns in LOOKUP_COLUMNS.values() for lookup in columns.values()}))
+# Names each lookup starts with, so their codes follow the natural order (Low < Medium < High ...)
+LOOKUP_SEEDS = {
+    "incident_severities": ("Low", "Medium", "High", "Critical"),
+    "incident_statuses": ("Open", "Investigating", "In Progress", "Resolved", "Closed"),
+    "ticket_priorities": ("Low", "Medium", "High", "Critical"),
+    "ticket_statuses": ("Open", "In Progress", "Waiting for User", "Resolved", "Closed"),
+}
+
+
+def create_lookup_tables(conn):
+    """
+    Create the lookup tables of LOOKUP_COLUMNS (id -> name), seeded with LOOKUP_SEEDS.
+
+    Names are only ever added, so ids are never reused and a code always
+    means the same name.
+    """
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(LOOKUP_TABLES))})",
+        LOOKUP_TABLES
+    ).fetchone()[0] == len(LOOKUP_TABLES)
+    for lookup in LOOKUP_TABLES:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {lookup} (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """)
+        cursor.executemany(f"INSERT OR IGNORE INTO {lookup} (name) VALUES (?)",
+                           [(name,) for name in LOOKUP_SEEDS.get(lookup, ())])
+    conn.commit()
+    if not exists:
+        print("✅ Lookup tables created successfully!")
+
+
 def create_cyber_incidents_table(conn):
     cursor = conn.cursor()
     try:
@@ -42,9 +90,9 @@ def create_cyber_incidents_table(conn):
         CREATE TABLE IF NOT EXISTS cyber_incidents (
             incident_id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
-            severity TEXT NOT NULL,
-            category TEXT NOT NULL,
-            status TEXT NOT NULL,
+            severity_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            status_id INTEGER NOT NULL,
             description TEXT,
             reported_by TEXT
         )
@@ -56,6 +104,108 @@ def create_cyber_incidents_table(conn):
         raise
 
 
+def migrate_incident_timestamps(conn):
+    """
+    Give cyber_incidents integer time columns.
+
+    occurred_at holds epoch seconds (UTC), parsed once from the text
+    timestamp; occurred_day (days since epoch) and occurred_month (YYYYMM)
+    are generated from it and indexed, so time-bucket queries become
+    index range scans instead of per-row strftime calls. Triggers fill
+    occurred_at for writers that only set the text timestamp.
+    """
+    cursor = conn.cursor()
+    columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(cyber_incidents)")}
+    if "occurred_at" not in columns:
+        cursor.execute("ALTER TABLE cyber_incidents ADD COLUMN occurred_at INTEGER")
+        cursor.execute("UPDATE cyber_incidents SET occurred_at = CAST(strftime('%s', timestamp) AS INTEGER)")
+        cursor.execute("""
+        ALTER TABLE cyber_incidents ADD COLUMN occurred_day INTEGER
+        GENERATED ALWAYS AS (occurred_at / 86400) VIRTUAL
+        """)
+        cursor.execute("""
+        ALTER TABLE cyber_incidents ADD COLUMN occurred_month INTEGER
+        GENERATED ALWAYS AS (CAST(strftime('%Y%m', occurred_at, 'unixepoch') AS INTEGER)) VIRTUAL
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_cyber_incidents_timestamp")
+        print("✅ Cyber incidents timestamps migrated to epoch seconds!")
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_cyber_incidents_occurred_at_insert
+    AFTER INSERT ON cyber_incidents
+    WHEN NEW.occurred_at IS NULL
+    BEGIN
+        UPDATE cyber_incidents SET occurred_at = CAST(strftime('%s', NEW.timestamp) AS INTEGER)
+        WHERE incident_id = NEW.incident_id;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_cyber_incidents_occurred_at_update
+    AFTER UPDATE OF timestamp ON cyber_incidents
+    WHEN NEW.occurred_at IS OLD.occurred_at
+    BEGIN
+        UPDATE cyber_incidents SET occurred_at = CAST(strftime('%s', NEW.timestamp) AS INTEGER)
+        WHERE incident_id = NEW.incident_id;
+    END
+    """)
+    conn.commit()
+
+
+# Tables derived from cyber_incidents' text columns before LOOKUP_COLUMNS; rebuilt on the codes
+_TEXT_ROLLUPS = ("incident_monthly_counts", "incident_rollups")
+
+
+def migrate_lookup_columns(conn):
+    """
+    Move text severity/category/status/priority columns to lookup codes.
+
+    Databases created before LOOKUP_COLUMNS repeat the names in every
+    row. Each such column gets a <column>_id filled from its lookup table
+    (new names are added), then the text column is dropped, together with
+    the indexes and rollup tables built on it; create_indexes and the
+    rollup create_* functions rebuild those on the codes. ALTER TABLE
+    cannot add NOT NULL columns, so migrated code columns are nullable.
+    The freed pages stay in the file until VACUUM
+    (python -m app.data.schema --vacuum).
+    """
+    cursor = conn.cursor()
+    create_lookup_tables(conn)
+    for table, lookups in LOOKUP_COLUMNS.items():
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_xinfo({table})")}
+        text_columns = [c for c in lookups if c in existing]
+        if not text_columns:
+            continue
+
+        # Anything that references the text columns has to go before they can be dropped
+        if table == "cyber_incidents":
+            for rollup in _TEXT_ROLLUPS:
+                for (trigger,) in cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?", (f"trg_{rollup}_%",)
+                ).fetchall():
+                    cursor.execute(f"DROP TRIGGER {trigger}")
+                cursor.execute(f"DROP TABLE IF EXISTS {rollup}")
+        for (index,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        ).fetchall():
+            indexed = {row[2] for row in cursor.execute(f"PRAGMA index_info({index})")}
+            if indexed & set(text_columns):
+                cursor.execute(f"DROP INDEX {index}")
+
+        for column in text_columns:
+            cursor.execute(f"""
+            INSERT OR IGNORE INTO {lookups[column]} (name)
+            SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY 1
+            """)
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column}_id INTEGER")
+        assignments = ", ".join(
+            f"{c}_id = (SELECT id FROM {lookups[c]} WHERE name = {table}.{c})" for c in text_columns
+        )
+        cursor.execute(f"UPDATE {table} SET {assignments}")
+        for column in text_columns:
+            cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        conn.commit()
+        print(f"✅ {table} {', '.join(text_columns)} moved to lookup codes!")
+
+
 def create_datasets_metadata_table(conn):
     cursor = conn.cursor()
     cursor.execute("""
@@ -67,22 +217,42 @@ def create_datasets_metadata_table(conn):
         last_updated TEXT,
         record_count INTEGER,
         file_size_mb REAL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        file_path TEXT
     )
     """)
     conn.commit()
+    migrate_datasets_metadata_paths(conn)
     print("✅ Datasets metadata table created successfully!")
 
 
+def migrate_datasets_metadata_paths(conn):
+    """
+    Give datasets_metadata the file_path column the dataset scanner matches rows on.
+
+    Catalog rows written by app.data.datasets are keyed on the file's
+    resolved path (unique when set); hand-entered rows leave it NULL.
+    Idempotent and silent, so the scanner can call it before every write.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(datasets_metadata)")]
+    if "file_path" not in columns:
+        conn.execute("ALTER TABLE datasets_metadata ADD COLUMN file_path TEXT")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_datasets_metadata_file_path "
+        "ON datasets_metadata(file_path) WHERE file_path IS NOT NULL"
+    )
+    conn.commit()
+
+
 def create_it_tickets_table(conn):
     cursor = conn.cursor()
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS it_tickets (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         ticket_id TEXT UNIQUE NOT NULL,
-        priority TEXT,
-        status TEXT,
-        category TEXT,
+        priority_id INTEGER,
+        status_id INTEGER,
+        category_id INTEGER,
         subject TEXT NOT NULL,
         description TEXT,
         created_date TEXT,
@@ -95,21 +265,313 @@ def create_it_tickets_table(conn):
     print("✅ IT tickets table created successfully!")
 
 
+def create_sessions_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sessions (
+        token_id TEXT PRIMARY KEY,
+        username TEXT NOT NULL,
+        role TEXT,
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        revoked INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions(username)")
+    conn.commit()
+    print("✅ Sessions table created successfully!")
+
+
+# FTS5 indexes: (fts table, content table, rowid column, indexed columns)
+SEARCH_TABLES = [
+    ("incidents_fts", "cyber_incidents", "incident_id", ("description",)),
+    ("tickets_fts", "it_tickets", "id", ("subject", "description")),
+]
+
+
+def create_search_tables(conn):
+    """
+    Create external-content FTS5 indexes over incident descriptions and
+    ticket subjects/descriptions, with triggers that keep them in sync.
+
+    An index is rebuilt from its content table when first created.
+    """
+    cursor = conn.cursor()
+    for fts, table, rowid, columns in SEARCH_TABLES:
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+        ).fetchone()
+        cols = ", ".join(columns)
+        new_values = ", ".join(f"NEW.{c}" for c in columns)
+        old_values = ", ".join(f"OLD.{c}" for c in columns)
+        cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols}, content='{table}', content_rowid='{rowid}', tokenize='porter unicode61'
+        )
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.{rowid}, {new_values});
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.{rowid}, {old_values});
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.{rowid}, {old_values});
+            INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.{rowid}, {new_values});
+        END
+        """)
+        if not exists:
+            cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+            print(f"✅ Search index {fts} created successfully!")
+    conn.commit()
+
+
+# (index name, table, columns) matched to the queries in incidents.py and the dashboard.
+# app/data/query_plans.py checks that those queries actually use them.
+INDEXES = [
+    ("idx_cyber_incidents_severity_status", "cyber_incidents", "severity_id, status_id"),
+    ("idx_cyber_incidents_status", "cyber_incidents", "status_id"),
+    ("idx_cyber_incidents_category", "cyber_incidents", "category_id"),
+    ("idx_cyber_incidents_occurred_at", "cyber_incidents", "occurred_at"),
+    ("idx_cyber_incidents_month_category", "cyber_incidents", "occurred_month, category_id"),
+    ("idx_cyber_incidents_day_category", "cyber_incidents", "occurred_day, category_id"),
+    ("idx_it_tickets_status_priority", "it_tickets", "status_id, priority_id"),
+    ("idx_it_tickets_priority", "it_tickets", "priority_id"),
+    ("idx_it_tickets_created_date", "it_tickets", "created_date"),
+    ("idx_it_tickets_resolved_date", "it_tickets", "resolved_date"),
+    ("idx_it_tickets_assigned_to", "it_tickets", "assigned_to"),
+    ("idx_datasets_metadata_name", "datasets_metadata", "dataset_name"),
+]
+
+
+def create_indexes(conn):
+    """Create the secondary indexes listed in INDEXES."""
+    cursor = conn.cursor()
+    for name, table, columns in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+    conn.commit()
+
+
+def create_table_versions_table(conn, tables=("cyber_incidents", "it_tickets")):
+    """
+    Create table_versions and the triggers that bump a table's version
+    on every insert, update and delete. Query caches compare these
+    versions to decide whether a cached result is still current.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS table_versions (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """)
+    for table in tables:
+        cursor.execute("INSERT OR IGNORE INTO table_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+            AFTER {event} ON {table}
+            BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+            END
+            """)
+    conn.commit()
+
+
+def bump_table_version(conn, table_name):
+    """
+    Move table_name's write version without writing the table itself, e.g.
+    after a rebuild of something derived from it, so cached reads are redone.
+    Does nothing before create_table_versions_table has run. Does not commit.
+    """
+    try:
+        conn.execute("UPDATE table_versions SET version = version + 1 WHERE table_name = ?", (table_name,))
+    except sqlite3.OperationalError:
+        pass
+
+
+def drop_incident_monthly_counts(conn):
+    """
+    Drop the incident_monthly_counts rollup from databases that still have it.
+
+    Monthly counts per category are read from the month level of
+    incident_rollups, so a second trigger-maintained rollup only doubled
+    the work of every incident write.
+    """
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incident_monthly_counts'"
+    ).fetchone()
+    if not exists:
+        return
+    for (trigger,) in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_incident_monthly_counts_%'"
+    ).fetchall():
+        cursor.execute(f"DROP TRIGGER {trigger}")
+    cursor.execute("DROP TABLE incident_monthly_counts")
+    conn.commit()
+    print("✅ incident_monthly_counts dropped (read from incident_rollups instead)!")
+
+
+# Levels kept in incident_rollups, with the cyber_incidents expression giving each bucket
+ROLLUP_LEVELS = (
+    ("hour", "occurred_at / 3600"),
+    ("day", "occurred_day"),
+    ("month", "occurred_month"),
+)
+
+
+def _rollup_rows(row):
+    # One SELECT per level for the given NEW/OLD row, skipping incidents without a time
+    return "\nUNION ALL\n".join(
+        f"SELECT '{level}', {row}.{expr}, "
+        f"COALESCE({row}.category_id, 0), COALESCE({row}.severity_id, 0), "
+        f"COALESCE({row}.status_id, 0) WHERE {row}.occurred_at IS NOT NULL"
+        for level, expr in ROLLUP_LEVELS
+    )
+
+
+def rebuild_incident_rollups(conn):
+    """Recompute incident_rollups from cyber_incidents (for backfills)."""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM incident_rollups")
+    for level, expr in ROLLUP_LEVELS:
+        cursor.execute(f"""
+        INSERT INTO incident_rollups (level, bucket, category_id, severity_id, status_id, count)
+        SELECT '{level}', {expr}, COALESCE(category_id, 0), COALESCE(severity_id, 0),
+               COALESCE(status_id, 0), COUNT(*)
+        FROM cyber_incidents
+        WHERE occurred_at IS NOT NULL
+        GROUP BY 2, 3, 4, 5
+        """)
+    bump_table_version(conn, "cyber_incidents")
+    conn.commit()
+
+
+def create_incident_rollups_table(conn):
+    """
+    Create the multi-level incident time-series rollup and its triggers.
+
+    incident_rollups holds incident counts per (level, bucket, category,
+    severity, status lookup codes; 0 if missing) for hour (occurred_at / 3600), day (occurred_day) and
+    month (occurred_month, YYYYMM) buckets. Triggers apply every insert,
+    delete and relevant update to all three levels, so time-series reads
+    at any zoom are primary-key range scans that never touch
+    cyber_incidents. Incidents without a time are left out (per-category
+    totals add them from the occurred_month index). Needs
+    migrate_incident_timestamps; backfilled the first time it is created.
+
+    Day and month are maintained rather than summed from hours at read
+    time: a year at month resolution would otherwise add up 8,760 hour
+    buckets per category/severity/status combination on every read,
+    against twelve. Three keyed upserts per write are the price.
+    """
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'incident_rollups'"
+    ).fetchone()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS incident_rollups (
+        level TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        severity_id INTEGER NOT NULL,
+        status_id INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (level, bucket, category_id, severity_id, status_id)
+    ) WITHOUT ROWID
+    """)
+
+    increment = f"""
+        INSERT INTO incident_rollups (level, bucket, category_id, severity_id, status_id, count)
+        SELECT *, 1 FROM ({_rollup_rows("NEW")}) WHERE true
+        ON CONFLICT(level, bucket, category_id, severity_id, status_id) DO UPDATE SET count = count + 1;
+    """
+    # One keyed statement per level, so each is a primary-key lookup
+    decrement = ""
+    for level, expr in ROLLUP_LEVELS:
+        match_old = f"""
+        level = '{level}' AND bucket = OLD.{expr} AND category_id = COALESCE(OLD.category_id, 0)
+        AND severity_id = COALESCE(OLD.severity_id, 0) AND status_id = COALESCE(OLD.status_id, 0)
+        """
+        decrement += f"""
+        UPDATE incident_rollups SET count = count - 1 WHERE {match_old};
+        DELETE FROM incident_rollups WHERE {match_old} AND count <= 0;
+        """
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_incident_rollups_insert
+    AFTER INSERT ON cyber_incidents
+    WHEN NEW.occurred_at IS NOT NULL
+    BEGIN {increment} END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_incident_rollups_delete
+    AFTER DELETE ON cyber_incidents
+    WHEN OLD.occurred_at IS NOT NULL
+    BEGIN {decrement} END
+    """)
+    # Also covers the occurred_at backfill that follows inserts which only set the text timestamp
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_incident_rollups_update
+    AFTER UPDATE OF occurred_at, category_id, severity_id, status_id ON cyber_incidents
+    BEGIN {decrement} {increment} END
+    """)
+    conn.commit()
+    if not exists:
+        rebuild_incident_rollups(conn)
+        print("✅ Incident rollups table created successfully!")
+
+
 def create_all_tables(conn):
     """Create all tables."""
     try:
         create_users_table(conn)
+        create_lookup_tables(conn)
         create_cyber_incidents_table(conn)
-        create_datasets_metadata_table(conn)
+        migrate_incident_timestamps(conn)
         create_it_tickets_table(conn)
+        migrate_lookup_columns(conn)
+        drop_incident_monthly_counts(conn)
+        create_incident_rollups_table(conn)
+        create_datasets_metadata_table(conn)
+        create_sessions_table(conn)
+        create_search_tables(conn)
+        create_table_versions_table(conn)
+        create_indexes(conn)
     except Exception as e:
         print("Table creation failed:", e)
         raise
 
 
 if __name__ == "__main__":
-    print("🔍 Initializing database...")
+    import sys
+
     conn = connect_database()
-    create_all_tables(conn)
-    conn.close()
-    print(f"✅ Database initialized at: {DB_PATH.resolve()}")
+    if "--rebuild-rollups" in sys.argv:
+        print("🔍 Rebuilding incident rollups...")
+        drop_incident_monthly_counts(conn)
+        create_incident_rollups_table(conn)
+        rebuild_incident_rollups(conn)
+        conn.close()
+        print("✅ Incident rollups rebuilt.")
+    elif "--vacuum" in sys.argv:
+        # Returns the pages freed by migrations (e.g. migrate_lookup_columns) to the file system
+        create_all_tables(conn)
+        print("🔍 Vacuuming database...")
+        before = DB_PATH.stat().st_size
+        conn.execute("VACUUM")
+        conn.close()
+        print(f"✅ Database vacuumed: {before / 1e6:.1f} MB -> {DB_PATH.stat().st_size / 1e6:.1f} MB")
+    else:
+        print("🔍 Initializing database...")
+        create_all_tables(conn)
+        conn.close()
+        print(f"✅ Database initialized at: {DB_PATH.resolve()}")
@@ -0,0 +1,74 @@
+import re
+
+from app.data.lookups import decode_columns, select_sql
+
+SNIPPET_TOKENS = 12
+
+
+def to_match_query(text):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted term (so punctuation and FTS operators in
+    user input cannot cause syntax errors) and the terms are ANDed. A
+    trailing * on a word keeps prefix matching, e.g. "phish*".
+    """
+    terms = []
+    for word in re.findall(r"[^\s]+", text or ""):
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _search(conn, fts, table, rowid, columns, snippet_column, query, limit, offset, raw):
+    import pandas as pd
+
+    match = query if raw else to_match_query(query)
+    if not match:
+        return pd.DataFrame(columns=list(columns) + ["snippet", "score"]), False
+
+    sql = f"""
+    SELECT {select_sql(table, columns, prefix="t.")},
+           snippet({fts}, {snippet_column}, '**', '**', '…', {SNIPPET_TOKENS}) AS snippet,
+           bm25({fts}) AS score
+    FROM {fts}
+    JOIN {table} t ON t.{rowid} = {fts}.rowid
+    WHERE {fts} MATCH ?
+    ORDER BY score
+    LIMIT ? OFFSET ?
+    """
+    # Fetch one extra row to tell the caller whether another page exists
+    df = decode_columns(conn, pd.read_sql_query(sql, conn, params=(match, limit + 1, offset)), table)
+    has_more = len(df) > limit
+    return df.iloc[:limit], has_more
+
+
+def search_incidents(conn, query, limit=20, offset=0, raw=False):
+    """
+    Full-text search over incident descriptions, best matches first.
+
+    Args:
+        conn: Database connection
+        query: Search text (words are ANDed; "word*" for prefixes)
+        limit: Results per page
+        offset: Results to skip (page * limit)
+        raw: Pass query to FTS5 unchanged (allows OR, NEAR, column filters)
+
+    Returns:
+        tuple: (pandas.DataFrame with a highlighted snippet and BM25 score, has_more: bool)
+    """
+    columns = ("incident_id", "timestamp", "severity", "category", "status", "reported_by")
+    return _search(conn, "incidents_fts", "cyber_incidents", "incident_id", columns, 0, query, limit, offset, raw)
+
+
+def search_tickets(conn, query, limit=20, offset=0, raw=False):
+    """
+    Full-text search over ticket subjects and descriptions, best matches first.
+
+    Same arguments and return value as search_incidents; the snippet is
+    taken from whichever column matched best.
+    """
+    columns = ("ticket_id", "priority", "status", "category", "subject", "assigned_to", "created_date")
+    return _search(conn, "tickets_fts", "it_tickets", "id", columns, -1, query, limit, offset, raw)
@@ -0,0 +1,382 @@
+import time
+from itertools import islice
+
+from app.data.cache import QueryCache
+from app.data.db import begin_immediate
+from app.data.lookups import (decode_columns, encode_rows, encode_value, name_filter, select_sql,
+                              storage_column)
+
+# SLA results, invalidated by the it_tickets write version (see schema.create_table_versions_table)
+ticket_cache = QueryCache()
+
+TICKET_COLUMNS = ("ticket_id", "priority", "status", "category", "subject", "description",
+                  "created_date", "resolved_date", "assigned_to")
+REQUIRED_TICKET_COLUMNS = ("ticket_id", "subject")
+RESOLVED_STATUSES = ("Resolved", "Closed")
+DEFAULT_STATUS = "Open"
+
+# Upper bounds (days) of the backlog aging buckets; anything older falls in the last bucket
+AGING_BUCKETS = (1, 3, 7, 14, 30, 90)
+# Default backlog-aging reference time is rounded down to this many seconds, so repeated
+# reads share one cache entry instead of adding a new one every second
+AGING_RESOLUTION = 3600
+
+# Priority, status and category are stored as lookup codes (see app/data/lookups.py)
+_STORED_COLUMNS = ", ".join(storage_column("it_tickets", c) for c in TICKET_COLUMNS)
+_INSERT_SQL = f"INSERT INTO it_tickets ({_STORED_COLUMNS}) VALUES ({', '.join('?' * len(TICKET_COLUMNS))})"
+
+
+def _decode(conn, df):
+    return decode_columns(conn, df, "it_tickets")
+
+
+class TicketValidationError(ValueError):
+    """Raised when a bulk-loaded ticket row is malformed."""
+
+
+def insert_ticket(conn, ticket_id, subject, priority=None, status=DEFAULT_STATUS, category=None,
+                  description=None, created_date=None, resolved_date=None, assigned_to=None):
+    """
+    Insert a new IT ticket.
+
+    Returns:
+        int: Row id of the inserted ticket
+    """
+    cursor = conn.cursor()
+    row = (ticket_id, priority, status, category, subject, description, created_date, resolved_date, assigned_to)
+    cursor.execute(_INSERT_SQL, encode_rows(conn, "it_tickets", TICKET_COLUMNS, [row])[0])
+    conn.commit()
+    ticket_cache.invalidate("it_tickets")
+    return cursor.lastrowid
+
+
+def _is_missing(value):
+    # None and "" from CSV mean "missing", as do pandas' NaN/NaT (the only values where
+    # v != v) and pd.NA from nullable dtypes, whose comparisons return NA and cannot be
+    # used as a bool (TypeError)
+    try:
+        return bool(value is None or value != value or value == "")
+    except TypeError:
+        return True
+
+
+def _normalise_ticket(row):
+    if isinstance(row, dict):
+        values = tuple(row.get(c) for c in TICKET_COLUMNS)
+    else:
+        values = tuple(row)
+        if len(values) != len(TICKET_COLUMNS):
+            raise TicketValidationError(f"Expected {len(TICKET_COLUMNS)} fields, got {len(values)}")
+
+    values = tuple(None if _is_missing(v) else v for v in values)
+    for name, value in zip(TICKET_COLUMNS, values):
+        if name in REQUIRED_TICKET_COLUMNS and value is None:
+            raise TicketValidationError(f"Missing required field '{name}'")
+    return tuple(str(v) if v is not None else None for v in values)
+
+
+def _iter_rows(rows):
+    if hasattr(rows, "itertuples"):
+        columns = [c for c in TICKET_COLUMNS if c in rows.columns]
+        for values in rows[columns].itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+    else:
+        yield from rows
+
+
+def _write_batches(conn, sql, rows, batch_size, on_error, bind=None):
+    # bind(conn, encoded_rows), if given, turns each encoded row into the statement's parameters
+    if on_error not in ("skip", "raise"):
+        raise ValueError("on_error must be 'skip' or 'raise'")
+    result = {"written": 0, "skipped": 0, "batches": [], "errors": []}
+    source = _iter_rows(rows)
+    row_number = 0
+
+    while True:
+        raw = list(islice(source, batch_size))
+        if not raw:
+            break
+        batch = []
+        for row in raw:
+            row_number += 1
+            try:
+                batch.append(_normalise_ticket(row))
+            except (TicketValidationError, TypeError) as e:
+                if on_error == "raise":
+                    raise TicketValidationError(f"Row {row_number}: {e}") from e
+                result["skipped"] += 1
+                if len(result["errors"]) < 100:
+                    result["errors"].append((row_number, str(e)))
+        if not batch:
+            continue
+
+        start = time.perf_counter()
+        # Outside the try: if the caller has a transaction open, it must not be rolled back here
+        begin_immediate(conn)
+        try:
+            records = encode_rows(conn, "it_tickets", TICKET_COLUMNS, batch)
+            conn.executemany(sql, bind(conn, records) if bind else records)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        result["written"] += len(batch)
+        result["batches"].append({"rows": len(batch), "seconds": time.perf_counter() - start})
+
+    if result["written"]:
+        ticket_cache.invalidate("it_tickets")
+    return result
+
+
+def insert_tickets_bulk(conn, rows, batch_size=5000, on_error="skip"):
+    """
+    Insert many tickets with executemany, one transaction per batch.
+
+    Args:
+        conn: Database connection
+        rows: Iterable of tuples (TICKET_COLUMNS order), dicts or a pandas DataFrame
+        batch_size: Rows per executemany/transaction
+        on_error: "skip" to drop invalid rows, "raise" to abort on the first one
+
+    Returns:
+        dict: written, skipped, batches [{"rows": n, "seconds": t}, ...] and errors (first 100)
+
+    Raises:
+        sqlite3.ProgrammingError: if conn already has a transaction open
+    """
+    return _write_batches(conn, _INSERT_SQL, rows, batch_size, on_error)
+
+
+def upsert_tickets(conn, rows, batch_size=5000, on_error="skip"):
+    """
+    Insert tickets, or update them in place when ticket_id already exists.
+
+    Same arguments and return value as insert_tickets_bulk. New tickets
+    without a status get DEFAULT_STATUS, as in insert_ticket. On conflict
+    every column except ticket_id is replaced; missing (None) values keep
+    the stored value.
+    """
+    status = TICKET_COLUMNS.index("status")
+    marks = ["?"] * len(TICKET_COLUMNS)
+    marks[status] = "COALESCE(?, ?)"
+    # status_id is bound separately for the update: excluded.status_id already holds the default
+    stored = [storage_column("it_tickets", c) for c in TICKET_COLUMNS if c not in ("ticket_id", "status")]
+    updates = ", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in stored)
+    sql = f"""
+    INSERT INTO it_tickets ({_STORED_COLUMNS}) VALUES ({', '.join(marks)})
+    ON CONFLICT(ticket_id) DO UPDATE SET {updates}, status_id = COALESCE(?, status_id)
+    """
+
+    def bind(conn, records):
+        default = encode_value(conn, "it_tickets", "status", DEFAULT_STATUS)
+        return [r[:status + 1] + (default,) + r[status + 1:] + (r[status],) for r in records]
+
+    return _write_batches(conn, sql, rows, batch_size, on_error, bind)
+
+
+def update_tickets_status(conn, ticket_ids, new_status, resolved_date=None):
+    """
+    Set the status of many tickets in one transaction.
+
+    When new_status is a resolved status and no resolved_date is given,
+    the current time is recorded for tickets that have none.
+
+    Returns:
+        int: Number of tickets updated
+    """
+    if new_status in RESOLVED_STATUSES and resolved_date is None:
+        resolved_date = time.strftime("%Y-%m-%d %H:%M:%S")
+    cursor = conn.cursor()
+    status_id = encode_value(conn, "it_tickets", "status", new_status)
+    cursor.executemany(
+        "UPDATE it_tickets SET status_id = ?, resolved_date = COALESCE(resolved_date, ?) WHERE ticket_id = ?",
+        [(status_id, resolved_date, ticket_id) for ticket_id in ticket_ids]
+    )
+    conn.commit()
+    ticket_cache.invalidate("it_tickets")
+    return cursor.rowcount
+
+
+def delete_ticket(conn, ticket_id):
+    """Delete a ticket. Returns the number of rows deleted."""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM it_tickets WHERE ticket_id = ?", (ticket_id,))
+    conn.commit()
+    ticket_cache.invalidate("it_tickets")
+    return cursor.rowcount
+
+
+def _ticket_filters(status=None, priority=None, category=None, assigned_to=None, start=None, end=None):
+    clauses, params = [], []
+    for column, value in (("status", status), ("priority", priority), ("category", category),
+                          ("assigned_to", assigned_to)):
+        if value is None:
+            continue
+        clause, values = name_filter("it_tickets", column, value)
+        clauses.append(clause)
+        params.extend(values)
+    if start is not None:
+        clauses.append("created_date >= ?")
+        params.append(str(start))
+    if end is not None:
+        clauses.append("created_date < ?")
+        params.append(str(end))
+    return clauses, params
+
+
+def get_tickets_page(conn, columns=None, after_id=None, page_size=100, **filters):
+    """
+    Retrieve one page of tickets using keyset pagination on id.
+
+    Args:
+        conn: Database connection
+        columns: Columns to return (default: all); id is always included
+        after_id: Return tickets with id greater than this (None for the first page)
+        page_size: Maximum rows to return
+        **filters: status, priority, category, assigned_to (value or list), start/end created_date bounds
+
+    Returns:
+        tuple: (pandas.DataFrame with priority, status and category as Categoricals,
+                next_after_id or None if this was the last page)
+    """
+    allowed = ("id",) + TICKET_COLUMNS
+    columns = list(columns or allowed)
+    unknown = set(columns) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown ticket columns: {sorted(unknown)}")
+    if "id" not in columns:
+        columns.insert(0, "id")
+
+    clauses, params = _ticket_filters(**filters)
+    if after_id is not None:
+        clauses.append("id > ?")
+        params.append(after_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    query = f"""
+    SELECT {select_sql("it_tickets", columns)}
+    FROM it_tickets
+    {where}
+    ORDER BY id
+    LIMIT ?
+    """
+    import pandas as pd
+
+    df = _decode(conn, pd.read_sql_query(query, conn, params=params + [page_size]))
+    next_after_id = int(df["id"].iloc[-1]) if len(df) == page_size else None
+    return df, next_after_id
+
+
+def iter_tickets(conn, columns=None, page_size=5000, **filters):
+    """Yield tickets as DataFrame chunks of at most page_size rows."""
+    after_id = None
+    while True:
+        df, after_id = get_tickets_page(conn, columns, after_id, page_size, **filters)
+        if not df.empty:
+            yield df
+        if after_id is None:
+            break
+
+
+def get_resolution_time_percentiles(conn, by="priority", percentiles=(0.5, 0.9, 0.95)):
+    """
+    Resolution-time percentiles (hours) per priority or assignee.
+
+    SQLite computes the resolution hours; the percentiles are a single
+    vectorised pandas groupby over two columns.
+
+    Args:
+        conn: Database connection
+        by: "priority" or "assigned_to"
+        percentiles: Quantiles to report
+
+    Returns:
+        pandas.DataFrame: one row per group with resolved count, mean_hours and p50/p90/... columns
+    """
+    if by not in ("priority", "assigned_to"):
+        raise ValueError("by must be 'priority' or 'assigned_to'")
+    query = f"""
+    SELECT {select_sql("it_tickets", [by])}, (julianday(resolved_date) - julianday(created_date)) * 24.0 AS hours
+    FROM it_tickets
+    WHERE resolved_date IS NOT NULL AND created_date IS NOT NULL
+    """
+    df = ticket_cache.read_sql(conn, query, tables=("it_tickets",), transform=_decode)
+    hours = df["hours"].astype(float)
+    grouped = hours[hours.notna()].groupby(df[by], dropna=False, observed=True)
+    result = grouped.quantile(list(percentiles)).unstack().reindex(columns=list(percentiles))
+    result.columns = [f"p{int(round(q * 100))}_hours" for q in percentiles]
+    result.insert(0, "mean_hours", grouped.mean())
+    result.insert(0, "resolved", grouped.size())
+    return result.reset_index()
+
+
+def aging_bucket_labels():
+    """Backlog aging bucket labels, youngest first."""
+    bounds = zip((0,) + AGING_BUCKETS, AGING_BUCKETS)
+    return [f"{lower}-{upper}d" for lower, upper in bounds] + [f"{AGING_BUCKETS[-1]}d+"]
+
+
+def aging_reference_time():
+    """Current local time rounded down to AGING_RESOLUTION, as YYYY-MM-DD HH:MM:SS."""
+    now = int(time.time())
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now - now % AGING_RESOLUTION))
+
+
+def get_backlog_aging(conn, as_of=None):
+    """
+    Count unresolved tickets per priority and age bucket.
+
+    Args:
+        conn: Database connection
+        as_of: Reference time (default: aging_reference_time(), i.e. now to the hour)
+
+    Returns:
+        pandas.DataFrame: priority, age_bucket, count
+    """
+    as_of = str(as_of) if as_of is not None else aging_reference_time()
+    labels = aging_bucket_labels()
+    cases = "\n".join(f"WHEN age_days < {upper} THEN '{label}'" for upper, label in zip(AGING_BUCKETS, labels))
+    query = f"""
+    SELECT priority_id AS priority,
+           CASE {cases} ELSE '{labels[-1]}' END AS age_bucket,
+           COUNT(*) AS count
+    FROM (
+        SELECT priority_id, julianday(?) - julianday(created_date) AS age_days
+        FROM it_tickets
+        WHERE resolved_date IS NULL
+    )
+    GROUP BY priority_id, age_bucket
+    ORDER BY priority_id, MIN(age_days)
+    """
+    return ticket_cache.read_sql(conn, query, params=(as_of,), tables=("it_tickets",), transform=_decode)
+
+
+def get_weekly_throughput(conn):
+    """
+    Tickets opened and resolved per week, with the running backlog.
+
+    The running backlog is a window SUM over the weekly net change.
+
+    Returns:
+        pandas.DataFrame: week (YYYY-WW), opened, resolved, backlog
+    """
+    query = """
+    WITH events AS (
+        SELECT strftime('%Y-%W', created_date) AS week, 1 AS opened, 0 AS resolved
+        FROM it_tickets WHERE created_date IS NOT NULL
+        UNION ALL
+        SELECT strftime('%Y-%W', resolved_date), 0, 1
+        FROM it_tickets WHERE resolved_date IS NOT NULL
+    ),
+    weekly AS (
+        SELECT week, SUM(opened) AS opened, SUM(resolved) AS resolved
+        FROM events
+        WHERE week IS NOT NULL
+        GROUP BY week
+    )
+    SELECT week, opened, resolved,
+           SUM(opened - resolved) OVER (ORDER BY week ROWS UNBOUNDED PRECEDING) AS backlog
+    FROM weekly
+    ORDER BY week
+    """
+    return ticket_cache.read_sql(conn, query, tables=("it_tickets",))
@@ -0,0 +1,162 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Compact once stale/duplicate lines outnumber live users by this factor
+COMPACT_RATIO = 1.0
+COMPACT_MIN_STALE = 1000
+
+
+@contextmanager
+def file_lock(lock_path, exclusive=True):
+    """
+    Hold an OS-level lock on a sidecar lock file.
+
+    The lock lives on a separate file so that compaction can atomically
+    replace the data file without invalidating other processes' locks.
+    """
+    with open(lock_path, "a+") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        else:
+            # msvcrt only offers exclusive byte-range locks
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class UserStore:
+    """
+    Hash-indexed view of a "username hash" flat file.
+
+    The whole file is parsed once; afterwards only bytes appended since
+    the last read are parsed, detected by watching the file's size and
+    mtime. A shrinking file or a new inode (another process compacted it)
+    triggers a full rebuild. When a username appears more than once the
+    last line wins.
+
+    Args:
+        path: Path to the users file
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.lock_path = self.path + ".lock"
+        self._index = {}
+        self._offset = 0
+        self._stat_key = None
+        self._lines = 0
+        self._mutex = threading.RLock()
+
+    def _parse(self, chunk):
+        for line in chunk.splitlines():
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            self._index[parts[0]] = parts[1]
+            self._lines += 1
+
+    def refresh(self):
+        """Bring the index up to date with the file on disk."""
+        with self._mutex:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._index, self._offset, self._lines, self._stat_key = {}, 0, 0, None
+                return
+            stat_key = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if stat_key == self._stat_key:
+                return
+            if self._stat_key is None or st.st_ino != self._stat_key[0] or st.st_size < self._offset:
+                self._index, self._offset, self._lines = {}, 0, 0
+
+            with open(self.path, "rb") as fh:
+                fh.seek(self._offset)
+                data = fh.read()
+            # Leave a trailing partial line for the next refresh
+            end = data.rfind(b"\n") + 1
+            self._parse(data[:end].decode("utf-8"))
+            self._offset += end
+            self._stat_key = (st.st_ino, self._offset, st.st_mtime_ns) if end < len(data) else stat_key
+
+    def get_hash(self, username):
+        """Return the stored hash for username, or None."""
+        self.refresh()
+        return self._index.get(username)
+
+    def exists(self, username):
+        """Return True if username is in the store."""
+        return self.get_hash(username) is not None
+
+    def add_user(self, username, password_hash):
+        """
+        Append a user under an exclusive file lock.
+
+        Returns:
+            bool: False if the username was already taken
+        """
+        with self._mutex, file_lock(self.lock_path):
+            # Re-read under the lock so writes from other processes are seen
+            self.refresh()
+            if username in self._index:
+                return False
+            with open(self.path, "ab") as fh:
+                fh.write(f"{username} {password_hash}\n".encode("utf-8"))
+                fh.flush()
+                os.fsync(fh.fileno())
+            self.refresh()
+            if self.stale_lines() >= max(COMPACT_MIN_STALE, COMPACT_RATIO * len(self._index)):
+                self._compact_locked()
+            return True
+
+    def stale_lines(self):
+        """Number of duplicate or superseded lines in the file."""
+        return self._lines - len(self._index)
+
+    def compact(self):
+        """Rewrite the file with one line per user, dropping stale lines."""
+        with self._mutex, file_lock(self.lock_path):
+            self.refresh()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            for username, password_hash in self._index.items():
+                fh.write(f"{username} {password_hash}\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+        self._stat_key = None
+        self.refresh()
+
+    def __len__(self):
+        self.refresh()
+        return len(self._index)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_user_store(path):
+    """Return the shared UserStore for path."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = UserStore(path)
+        return _stores[key]
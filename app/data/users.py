@@ -1,24 +1,40 @@
-from app.data.db import connect_database
+from app.data.db import execute_write, get_connection
+
+# Writes go through the single writer thread (see app.data.db.Writer)
 
 def get_user_by_username(username):
     """Retrieve user by username."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT * FROM users WHERE username = ?",
-        (username,)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        user = cursor.fetchone()
     return user
 
 def insert_user(username, password_hash, role='user'):
     """Insert new user."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute(
+    execute_write(
         "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
         (username, password_hash, role)
     )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+
+def update_password_hash(username, password_hash, expected_hash=None):
+    """Replace a user's password hash; with expected_hash, only if it is still the stored one."""
+    if expected_hash is None:
+        return execute_write(
+            "UPDATE users SET password_hash = ? WHERE username = ?",
+            (password_hash, username)
+        )
+    return execute_write(
+        "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+        (password_hash, username, expected_hash)
+    )
+
+def update_user_role(username, role):
+    """Change a user's role."""
+    return execute_write(
+        "UPDATE users SET role = ? WHERE username = ?",
+        (role, username)
+    )
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Caching for the Streamlit pages.
+
+prepare_database() creates the schema once per server process (a
+Streamlit resource), instead of on every rerun. Each block of reads
+goes through dashboard_snapshot(): a read-only connection holding one
+snapshot, so every chart in the block shows the same moment and a long
+aggregate never holds up a write. The snapshot borrows a pooled
+connection, so wrap only the reads in it, not forms or writes. Form
+writes go through database_writer(), the process-wide single writer
+thread.
+
+@versioned(*tables) memoizes a read with st.cache_data, keyed by its
+arguments and the current write versions of the tables it reads (see
+schema.create_table_versions_table). A rerun on unchanged data costs one
+primary-key lookup per table. Any write, whether from a form, the CLI or
+another session, moves only the versions of the tables it touched, so
+only the reads that depend on those tables are recomputed.
+"""
+from contextlib import contextmanager
+from functools import wraps
+
+import streamlit as st
+
+from app.data.cache import table_version
+from app.data.db import DB_PATH, get_writer, read_snapshot
+from app.data.schema import create_all_tables
+
+CACHE_ENTRIES = 512
+
+
+@st.cache_resource(show_spinner=False)
+def prepare_database(db_path=str(DB_PATH)):
+    """Create every table, rollup and index (on the writer thread), once per server process; returns db_path."""
+    get_writer(db_path).run(create_all_tables)
+    return db_path
+
+
+@contextmanager
+def dashboard_snapshot(db_path=str(DB_PATH)):
+    """
+    Read-only connection for one block of reads, seeing one snapshot throughout.
+
+    Usage:
+        with dashboard_snapshot() as conn:
+            ...the charts of one section (no forms or writes)...
+    """
+    with read_snapshot(prepare_database(db_path)) as conn:
+        yield conn
+
+
+def database_writer(db_path=str(DB_PATH)):
+    """Return the process-wide Writer; forms call database_writer().run(fn, ...)."""
+    return get_writer(prepare_database(db_path))
+
+
+def data_version(conn, tables):
+    """Write versions of tables; None for any table without a version counter."""
+    return tuple(table_version(conn, t) for t in tables)
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_ENTRIES)
+def _memoized(_fn, _conn, name, versions, args, kwargs):
+    # _fn and _conn are not hashed (leading underscore); name and versions make the key
+    return _fn(_conn, *args, **dict(kwargs))
+
+
+def versioned(*tables):
+    """
+    Decorator for fn(conn, ...) reads: memoize the result until one of tables is written.
+
+    Arguments must be hashable by Streamlit. If a table has no version
+    counter the read is never cached.
+    """
+    def decorate(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(conn, *args, **kwargs):
+            versions = data_version(conn, tables)
+            if None in versions:
+                return fn(conn, *args, **kwargs)
+            return _memoized(fn, conn, name, versions, args, tuple(sorted(kwargs.items())))
+
+        wrapper.tables = tables
+        return wrapper
+    return decorate
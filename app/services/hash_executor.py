@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from app.data.bcrypt_cost import get_bcrypt_rounds
+
+# Submissions allowed in flight per worker before callers are turned away
+QUEUE_FACTOR = 4
+# Passwords per job in hash_many
+HASH_CHUNK = 16
+
+
+class HashQueueFull(RuntimeError):
+    """Raised when the hashing executor's queue is saturated."""
+
+
+def _checkpw(plain_text_password, hashed_password):
+    # Runs in a worker process; kept top-level so it can be pickled
+    import bcrypt
+
+    return bcrypt.checkpw(plain_text_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def _hashpw(plain_text_password, rounds):
+    import bcrypt
+
+    return bcrypt.hashpw(plain_text_password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _hashpw_many(plain_text_passwords, rounds):
+    import bcrypt
+
+    return [
+        bcrypt.hashpw(p.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8") for p in plain_text_passwords
+    ]
+
+
+class HashExecutor:
+    """
+    Process pool for bcrypt work with a bounded submission queue.
+
+    bcrypt releases the GIL, but a Streamlit script thread still blocks
+    while it waits; running the hashes in separate processes spreads a
+    burst of logins over every core. Once max_pending jobs are queued or
+    running, further submissions raise HashQueueFull immediately rather
+    than piling up.
+
+    Args:
+        max_workers: Worker processes (default: CPU count)
+        max_pending: Jobs allowed in flight (default: QUEUE_FACTOR per worker)
+    """
+
+    def __init__(self, max_workers=None, max_pending=None):
+        # multiprocessing is only imported once an executor is actually built
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * QUEUE_FACTOR
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) on the pool, or raise HashQueueFull."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashQueueFull(
+                f"Password hashing queue is full ({self.max_pending} jobs pending); try again shortly."
+            )
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.submitted += 1
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def verify(self, plain_text_password, hashed_password):
+        """Return a Future resolving to whether the password matches."""
+        return self.submit(_checkpw, plain_text_password, hashed_password)
+
+    def hash(self, plain_text_password, rounds=None):
+        """Return a Future resolving to a new bcrypt hash (default cost: the calibrated target)."""
+        return self.submit(_hashpw, plain_text_password, get_bcrypt_rounds() if rounds is None else rounds)
+
+    def _windowed(self, fn, jobs):
+        # Yield fn(*job) per job, in order, with at most half of max_pending jobs in flight
+        # so logins submitted meanwhile still find room in the queue
+        from collections import deque
+
+        window = max(self.max_pending // 2, 1)
+        in_flight = deque()
+        for job in jobs:
+            if len(in_flight) >= window:
+                yield in_flight.popleft().result()
+            while True:
+                try:
+                    in_flight.append(self.submit(fn, *job))
+                    break
+                except HashQueueFull:
+                    # Other callers filled the queue: wait for one of ours, or briefly
+                    if in_flight:
+                        yield in_flight.popleft().result()
+                    else:
+                        time.sleep(0.05)
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    def verify_many(self, pairs):
+        """
+        Verify (password, hash) pairs across all workers.
+
+        At most half of max_pending checks are in flight; if other callers
+        fill the queue, the batch waits for its own checks and retries
+        instead of raising HashQueueFull.
+
+        Returns:
+            list: One bool per pair, in input order
+        """
+        return list(self._windowed(_checkpw, pairs))
+
+    def hash_many(self, plain_text_passwords, rounds=None, chunk_size=HASH_CHUNK):
+        """
+        Hash many passwords across all workers.
+
+        Passwords are sent in chunks of chunk_size to cut pickling round
+        trips. At most half of max_pending chunks are in flight, so
+        logins submitted meanwhile still find room in the queue.
+
+        Returns:
+            list: One hash per password, in input order
+        """
+        passwords = list(plain_text_passwords)
+        rounds = get_bcrypt_rounds() if rounds is None else rounds
+        chunks = ((passwords[start:start + chunk_size], rounds) for start in range(0, len(passwords), chunk_size))
+        results = []
+        for hashes in self._windowed(_hashpw_many, chunks):
+            results.extend(hashes)
+        return results
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """Return the process-wide HashExecutor, starting it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = HashExecutor()
+    return _executor
+
+
+def chain_future(future, fn):
+    """Return a new Future resolving to fn(future.result())."""
+    chained = Future()
+
+    def _done(f):
+        try:
+            chained.set_result(fn(f.result()))
+        except BaseException as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(_done)
+    return chained
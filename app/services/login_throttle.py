@@ -0,0 +1,225 @@
+"""
+Admission control in front of password verification.
+
+Every login costs a full bcrypt check, so a credential-stuffing burst
+can take every core. LoginThrottle sheds attempts before any hashing:
+
+  * a token bucket per username (USER_BURST attempts, refilled at
+    USER_RATE per second) stops guessing against one account,
+  * a global token bucket caps verifications per second at about
+    GLOBAL_CPU_SHARE of the machine, leaving the rest for the dashboard,
+  * at most max_in_flight verifications run at once; more are shed,
+    not queued, so latency stays bounded.
+
+Unknown usernames skip bcrypt, but still take the same tokens and then
+wait for about as long as a real check (a sleep after the in-flight slot
+is released, so no CPU and no slot), so response time does not reveal
+whether an account exists.
+
+Shed attempts raise LoginThrottled and are counted in stats(). Set
+PLATFORM_LOGIN_THROTTLE=0 to disable throttling (benchmarks).
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+USER_RATE = 1 / 12           # per-username refill: 5 attempts a minute...
+USER_BURST = 5               # ...after an initial burst of 5
+GLOBAL_CPU_SHARE = 0.5       # fraction of the cores logins may keep busy
+MAX_TRACKED_USERS = 10000    # per-username buckets kept (least recently used evicted)
+VERIFY_EWMA = 0.2            # weight of the newest timing in the verify-time estimate
+SEED_VERIFY_SECONDS = 0.06   # one bcrypt check at SEED_VERIFY_ROUNDS when this host has no calibration...
+SEED_VERIFY_ROUNDS = 10      # ...doubling with each cost step above it
+
+THROTTLED_MESSAGE = "Too many login attempts. Please try again shortly."
+
+
+class LoginThrottled(RuntimeError):
+    """Raised when a login attempt is shed by admission control."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Login attempt shed ({reason}); retry in {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket holding up to burst tokens, refilled at rate per second (not thread-safe)."""
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic() if now is None else now
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available (0 if one is)."""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+def estimate_verify_seconds():
+    """
+    Expected time of one bcrypt check at the target cost, without running bcrypt.
+
+    Uses the p99 this host's saved calibration measured at that cost, else
+    SEED_VERIFY_SECONDS scaled to the cost. LoginThrottle.observe_verify
+    refines it from real logins.
+    """
+    from app.data.bcrypt_cost import get_bcrypt_rounds, load_calibration
+
+    rounds = get_bcrypt_rounds()
+    measured = (load_calibration() or {}).get("measured") or {}
+    p99_ms = measured.get(str(rounds))
+    if p99_ms:
+        return p99_ms / 1000
+    return SEED_VERIFY_SECONDS * 2 ** (rounds - SEED_VERIFY_ROUNDS)
+
+
+class LoginThrottle:
+    """
+    Per-user and global token buckets plus an in-flight cap for login attempts.
+
+    Args:
+        user_rate, user_burst: Per-username refill rate (per second) and burst
+        global_rate: Verifications per second for everyone (default: GLOBAL_CPU_SHARE
+                     of the cores at the estimated bcrypt time)
+        global_burst: Global burst (default: one second of global_rate, at least two per slot)
+        max_in_flight: Verifications running at once (default: CPU count)
+        verify_seconds: Initial estimate of one bcrypt check (default: estimate_verify_seconds())
+    """
+
+    def __init__(self, user_rate=USER_RATE, user_burst=USER_BURST, global_rate=None, global_burst=None,
+                 max_in_flight=None, verify_seconds=None, max_tracked_users=MAX_TRACKED_USERS):
+        cpus = os.cpu_count() or 1
+        self.verify_seconds = verify_seconds or estimate_verify_seconds()
+        self.max_in_flight = max_in_flight or cpus
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_tracked_users = max_tracked_users
+        global_rate = global_rate or max(GLOBAL_CPU_SHARE * cpus / self.verify_seconds, 1.0)
+        self._global = TokenBucket(global_rate, global_burst or max(global_rate, 2 * self.max_in_flight))
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._counters = dict.fromkeys(
+            ("attempts", "admitted", "shed_user", "shed_global", "shed_in_flight", "unknown_users"), 0
+        )
+
+    def _admit(self, username):
+        # Take one token from both buckets, or from neither
+        now = time.monotonic()
+        with self._lock:
+            self._counters["attempts"] += 1
+            bucket = self._users.get(username)
+            if bucket is None:
+                bucket = self._users[username] = TokenBucket(self.user_rate, self.user_burst, now)
+                if len(self._users) > self.max_tracked_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(username)
+            bucket.refill(now)
+            self._global.refill(now)
+            if bucket.tokens < 1:
+                self._counters["shed_user"] += 1
+                raise LoginThrottled("user", bucket.wait_time())
+            if self._global.tokens < 1:
+                self._counters["shed_global"] += 1
+                raise LoginThrottled("global", self._global.wait_time())
+            bucket.tokens -= 1
+            self._global.tokens -= 1
+
+    def admit(self, username):
+        """Take a login token for username, or raise LoginThrottled (no in-flight slot is held)."""
+        self._admit(username)
+        with self._lock:
+            self._counters["admitted"] += 1
+
+    @contextmanager
+    def attempt(self, username):
+        """
+        Admit one login attempt for the duration of a with-block.
+
+        Raises:
+            LoginThrottled: if a bucket is empty or max_in_flight checks are already running
+        """
+        self._admit(username)
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["shed_in_flight"] += 1
+            raise LoginThrottled("in_flight", self.verify_seconds)
+        with self._lock:
+            self._counters["admitted"] += 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def observe_verify(self, seconds):
+        """Feed the time of a real bcrypt check into the estimate used by decoy_delay()."""
+        with self._lock:
+            self.verify_seconds += VERIFY_EWMA * (seconds - self.verify_seconds)
+
+    def decoy_delay(self):
+        """Seconds an unknown-user attempt should take: about one bcrypt check."""
+        with self._lock:
+            self._counters["unknown_users"] += 1
+            return self.verify_seconds * random.uniform(0.9, 1.1)
+
+    def stats(self):
+        """
+        Return attempt and shed counters.
+
+        Returns:
+            dict: attempts, admitted, shed_user, shed_global, shed_in_flight, shed_total,
+                  unknown_users, cpu_seconds_shed (estimated bcrypt time avoided), verify_ms,
+                  global_rate and tracked_users
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            shed = stats["shed_user"] + stats["shed_global"] + stats["shed_in_flight"]
+            stats.update(
+                shed_total=shed,
+                cpu_seconds_shed=shed * self.verify_seconds,
+                verify_ms=self.verify_seconds * 1000,
+                global_rate=self._global.rate,
+                tracked_users=len(self._users),
+            )
+        return stats
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def throttling_enabled():
+    return os.environ.get("PLATFORM_LOGIN_THROTTLE", "1") not in ("", "0")
+
+
+def get_login_throttle():
+    """Return the process-wide LoginThrottle, or None if throttling is disabled."""
+    global _throttle
+    if not throttling_enabled():
+        return None
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = LoginThrottle()
+    return _throttle
+
+
+@contextmanager
+def login_attempt(username):
+    """attempt() on the process-wide throttle; yields the throttle (None when disabled)."""
+    throttle = get_login_throttle()
+    if throttle is None:
+        yield None
+        return
+    with throttle.attempt(username):
+        yield throttle
@@ -0,0 +1,224 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.data.db import DB_PATH, execute_write, get_connection, get_writer
+from app.data.schema import create_sessions_table
+
+SESSION_TTL = 8 * 60 * 60        # seconds a token stays valid
+CACHE_SIZE = 10000               # validated tokens kept in memory
+CACHE_RECHECK = 30               # seconds before a cached token is re-read from the table
+SECRET_ENV = "PLATFORM_SESSION_SECRET"
+SECRET_FILE = Path(DB_PATH).parent / ".session_secret"
+
+
+class SessionStore:
+    """
+    Signed, expiring session tokens backed by the sessions table.
+
+    A token looks like "<token_id>.<expires_at>.<signature>". The HMAC
+    signature and expiry are checked first, so forged or stale tokens
+    never reach the database. Valid tokens are kept in an LRU; a cached
+    entry is trusted for CACHE_RECHECK seconds before the table is
+    consulted again, which bounds how long a revocation made by another
+    process can go unnoticed.
+
+    Args:
+        secret: HMAC key (default: $PLATFORM_SESSION_SECRET or a key file next to the database)
+        ttl: Token lifetime in seconds
+        cache_size: Maximum tokens held in the LRU
+    """
+
+    def __init__(self, secret=None, ttl=SESSION_TTL, cache_size=CACHE_SIZE):
+        self._secret = secret
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self._cache = OrderedDict()   # token_id -> (username, role, expires_at, checked_at)
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def secret(self):
+        if self._secret is None:
+            self._secret = _load_secret()
+        return self._secret
+
+    def _ensure_table(self):
+        if not self._table_ready:
+            get_writer().run(create_sessions_table)
+            self._table_ready = True
+
+    def _sign(self, token_id, expires_at):
+        msg = f"{token_id}.{expires_at}".encode("utf-8")
+        digest = hmac.new(self.secret, msg, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+    def create_session(self, username, role=None):
+        """
+        Mint a token for an authenticated user.
+
+        Returns:
+            str: Signed session token
+        """
+        token_id = secrets.token_urlsafe(16)
+        now = int(time.time())
+        expires_at = now + self.ttl
+        self._ensure_table()
+        execute_write(
+            "INSERT INTO sessions (token_id, username, role, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (token_id, username, role, now, expires_at)
+        )
+        self._remember(token_id, (username, role, expires_at, time.monotonic()))
+        return f"{token_id}.{expires_at}.{self._sign(token_id, expires_at)}"
+
+    def _parse(self, token):
+        try:
+            # Real tokens are ASCII; compare_digest raises TypeError on non-ASCII str
+            token.encode("ascii")
+            token_id, expires_at, signature = token.split(".")
+            expires_at = int(expires_at)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(token_id, expires_at)):
+            return None
+        if expires_at <= time.time():
+            return None
+        return token_id
+
+    def _remember(self, token_id, entry):
+        with self._lock:
+            self._cache[token_id] = entry
+            self._cache.move_to_end(token_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def validate(self, token):
+        """
+        Check a token.
+
+        Returns:
+            tuple: (username, role) if the token is valid, otherwise None
+        """
+        token_id = self._parse(token)
+        if token_id is None:
+            return None
+
+        with self._lock:
+            entry = self._cache.get(token_id)
+            if entry is not None and time.monotonic() - entry[3] < CACHE_RECHECK:
+                self._cache.move_to_end(token_id)
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+
+        self._ensure_table()
+        with get_connection() as conn:
+            row = conn.execute(
+                "SELECT username, role, expires_at FROM sessions WHERE token_id = ? AND revoked = 0",
+                (token_id,)
+            ).fetchone()
+        if row is None or row[2] <= time.time():
+            with self._lock:
+                self._cache.pop(token_id, None)
+            return None
+        self._remember(token_id, (row[0], row[1], row[2], time.monotonic()))
+        return row[0], row[1]
+
+    def revoke(self, token):
+        """Revoke a single token. Returns True if a session was revoked."""
+        token_id = self._parse(token)
+        if token_id is None:
+            return False
+        with self._lock:
+            self._cache.pop(token_id, None)
+        self._ensure_table()
+        return execute_write("UPDATE sessions SET revoked = 1 WHERE token_id = ?", (token_id,)) > 0
+
+    def revoke_user(self, username):
+        """
+        Revoke every session belonging to username.
+
+        Returns:
+            int: Number of sessions revoked
+        """
+        with self._lock:
+            for token_id in [t for t, e in self._cache.items() if e[0] == username]:
+                del self._cache[token_id]
+        self._ensure_table()
+        return execute_write(
+            "UPDATE sessions SET revoked = 1 WHERE username = ? AND revoked = 0",
+            (username,)
+        )
+
+    def purge_expired(self):
+        """Delete expired and revoked sessions from the table."""
+        self._ensure_table()
+        return execute_write(
+            "DELETE FROM sessions WHERE expires_at <= ? OR revoked = 1",
+            (int(time.time()),)
+        )
+
+    def stats(self):
+        """Return cache hit/miss counters."""
+        with self._lock:
+            return {"cached": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def _load_secret():
+    env = os.environ.get(SECRET_ENV)
+    if env:
+        return env.encode("utf-8")
+    if SECRET_FILE.exists():
+        return SECRET_FILE.read_bytes()
+    secret = secrets.token_bytes(32)
+    SECRET_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # O_EXCL so two processes starting together agree on one key
+    try:
+        fd = os.open(SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return SECRET_FILE.read_bytes()
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(secret)
+    return secret
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide SessionStore."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore()
+    return _store
+
+
+def create_session(username, role=None):
+    """Mint a session token for username."""
+    return get_session_store().create_session(username, role)
+
+
+def validate_session(token):
+    """Return (username, role) for a valid token, otherwise None."""
+    return get_session_store().validate(token)
+
+
+def revoke_session(token):
+    """Revoke one session token."""
+    return get_session_store().revoke(token)
+
+
+def revoke_user_sessions(username):
+    """Revoke all of a user's sessions."""
+    return get_session_store().revoke_user(username)
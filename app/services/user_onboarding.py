@@ -0,0 +1,240 @@
+"""
+Bulk user onboarding.
+
+Streams users from a file or any iterable and writes them in batches:
+
+  * each record is validated (validate_username / validate_password, or
+    the bcrypt format for pre-hashed passwords),
+  * usernames already in the table are dropped before any hashing,
+  * plaintext passwords are hashed in parallel on the hashing process
+    pool (HashExecutor.hash_many),
+  * each batch is written with one executemany and committed together
+    with a checkpoint, so an interrupted file import resumes after the
+    last committed batch.
+
+File formats, by suffix:
+    .csv / .tsv      header row with username and password or password_hash (role optional)
+    .jsonl / .ndjson one object per line with the same keys
+    anything else    legacy users.txt lines: username,password_hash[,role]
+
+Usage:
+    python -m app.services.user_onboarding directory_export.csv --role analyst
+"""
+import csv
+import json
+import os
+import re
+import time
+from itertools import islice
+from pathlib import Path
+
+from app.data.auth import validate_password, validate_username
+from app.data.loader import create_load_checkpoints_table
+from app.services.hash_executor import get_hash_executor
+
+BATCH_SIZE = 2000
+MAX_ERRORS = 100
+# load_checkpoints.table_name used for user imports
+CHECKPOINT_TABLE = "users"
+BCRYPT_HASH = re.compile(r"^\$2[aby]?\$\d{2}\$[./A-Za-z0-9]{53}$")
+# Usernames per "already exists" lookup, below SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+
+def iter_user_file(path):
+    """
+    Stream user records from a CSV/TSV, JSONL or legacy users.txt file.
+
+    Yields:
+        dict per record (None for a JSONL line that is not valid JSON)
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with open(path, newline="", encoding="utf-8") as f:
+        if suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+        elif suffix in (".csv", ".tsv"):
+            yield from csv.DictReader(f, delimiter="\t" if suffix == ".tsv" else ",")
+        else:
+            for row in csv.reader(f):
+                if row:
+                    yield dict(zip(("username", "password_hash", "role"), (v.strip() for v in row)))
+
+
+def _normalise_user(record, default_role):
+    # Returns (username, password, password_hash, role); exactly one of password/password_hash is set
+    if not isinstance(record, dict):
+        raise ValueError("Record is not a valid JSON object")
+    username = (record.get("username") or "").strip()
+    ok, msg = validate_username(username)
+    if not ok:
+        raise ValueError(msg)
+    role = (record.get("role") or "").strip() or default_role
+
+    password_hash = (record.get("password_hash") or "").strip()
+    if password_hash:
+        if not BCRYPT_HASH.match(password_hash):
+            raise ValueError("password_hash is not a bcrypt hash")
+        return username, None, password_hash, role
+    password = record.get("password") or ""
+    ok, msg = validate_password(password)
+    if not ok:
+        raise ValueError(msg)
+    return username, password, None, role
+
+
+def _existing_usernames(conn, usernames):
+    existing = set()
+    for start in range(0, len(usernames), LOOKUP_CHUNK):
+        chunk = usernames[start:start + LOOKUP_CHUNK]
+        existing.update(row[0] for row in conn.execute(
+            f"SELECT username FROM users WHERE username IN ({', '.join('?' * len(chunk))})", chunk
+        ))
+    return existing
+
+
+def onboard_users(conn, records, default_role="user", batch_size=BATCH_SIZE, rounds=None,
+                  progress=None, skip=0, checkpoint=None):
+    """
+    Validate, hash and insert users from an iterable of records.
+
+    Args:
+        conn: Database connection
+        records: Iterable of dicts with username, password or password_hash, and optional role
+        default_role: Role for records without one
+        batch_size: Records per batch/transaction
+        rounds: bcrypt cost for plaintext passwords (default: the calibrated target)
+        progress: Optional callable, given the running result dict after each batch
+        skip: Records at the start of records that are already done (resume point)
+        checkpoint: Optional (source, file_size, file_mtime) recorded in load_checkpoints with each batch
+
+    Returns:
+        dict: processed, inserted, existing (already present or repeated), invalid, hashed,
+              resumed_from, seconds and errors [(record number, message), ...] (first 100)
+    """
+    start = time.perf_counter()
+    result = {"processed": skip, "inserted": 0, "existing": 0, "invalid": 0, "hashed": 0,
+              "resumed_from": skip, "seconds": 0.0, "errors": []}
+    records = iter(records)
+    if skip:
+        next(islice(records, skip - 1, skip), None)
+    if checkpoint:
+        create_load_checkpoints_table(conn)
+    checkpoint_sql = """
+    INSERT INTO load_checkpoints (source, table_name, file_size, file_mtime, rows_done)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(source, table_name) DO UPDATE SET
+        file_size = excluded.file_size, file_mtime = excluded.file_mtime, rows_done = excluded.rows_done
+    """
+
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+
+        users = {}
+        for number, record in enumerate(batch, start=result["processed"] + 1):
+            try:
+                user = _normalise_user(record, default_role)
+            except ValueError as e:
+                result["invalid"] += 1
+                if len(result["errors"]) < MAX_ERRORS:
+                    result["errors"].append((number, str(e)))
+                continue
+            if user[0] in users:
+                result["existing"] += 1
+            else:
+                users[user[0]] = user
+
+        # Drop known usernames before spending bcrypt time on them
+        existing = _existing_usernames(conn, list(users))
+        new = [user for name, user in users.items() if name not in existing]
+        plaintext = [user[1] for user in new if user[2] is None]
+        hashes = iter(get_hash_executor().hash_many(plaintext, rounds) if plaintext else ())
+        rows = [(name, password_hash or next(hashes), role) for name, _, password_hash, role in new]
+
+        cursor = conn.cursor()
+        cursor.executemany("INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)", rows)
+        inserted = max(cursor.rowcount, 0)
+        result["processed"] += len(batch)
+        if checkpoint:
+            source, file_size, file_mtime = checkpoint
+            cursor.execute(checkpoint_sql, (source, CHECKPOINT_TABLE, file_size, file_mtime, result["processed"]))
+        conn.commit()
+
+        result["inserted"] += inserted
+        result["existing"] += len(existing) + len(rows) - inserted
+        result["hashed"] += len(plaintext)
+        result["seconds"] = time.perf_counter() - start
+        if progress:
+            progress(result)
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def onboard_users_from_file(conn, path, default_role="user", batch_size=BATCH_SIZE, rounds=None,
+                            progress=None, resume=True):
+    """
+    Stream a user file into the users table, resuming an interrupted import.
+
+    The checkpoint is keyed on the file's path, size and mtime (as in
+    app.data.loader) and ignored if the file has changed.
+
+    Returns:
+        dict: see onboard_users
+    """
+    path = Path(path)
+    stat = os.stat(path)
+    source = str(path.resolve())
+    fingerprint = (stat.st_size, int(stat.st_mtime))
+    skip = 0
+    if resume:
+        create_load_checkpoints_table(conn)
+        row = conn.execute(
+            "SELECT file_size, file_mtime, rows_done FROM load_checkpoints WHERE source = ? AND table_name = ?",
+            (source, CHECKPOINT_TABLE)
+        ).fetchone()
+        if row and (row[0], row[1]) == fingerprint:
+            skip = row[2]
+
+    return onboard_users(
+        conn, iter_user_file(path), default_role=default_role, batch_size=batch_size, rounds=rounds,
+        progress=progress, skip=skip, checkpoint=(source, *fingerprint)
+    )
+
+
+def print_progress(result):
+    """Progress callback printing one line per batch."""
+    done = result["processed"] - result["resumed_from"]
+    rate = done / result["seconds"] if result["seconds"] else 0.0
+    print(f"   {result['processed']:>9} processed | {result['inserted']} inserted, {result['existing']} existing, "
+          f"{result['invalid']} invalid | {rate:,.0f} users/s", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.data.db import get_connection
+
+    parser = argparse.ArgumentParser(description="Bulk-import users from a CSV, JSONL or users.txt file.")
+    parser.add_argument("path")
+    parser.add_argument("--role", default="user", help="Role for records without one")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost for plaintext passwords")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore any checkpoint and read the whole file")
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        result = onboard_users_from_file(conn, args.path, default_role=args.role, batch_size=args.batch_size,
+                                         rounds=args.rounds, progress=print_progress, resume=not args.no_resume)
+    for number, message in result["errors"]:
+        print(f"⚠️  Record {number}: {message}")
+    print(f"✅ Onboarded {result['inserted']} users from {Path(args.path).name} in {result['seconds']:.1f}s "
+          f"({result['existing']} existing, {result['invalid']} invalid, {result['hashed']} hashed)")
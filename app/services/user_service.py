@@ -1,12 +1,21 @@
-import bcrypt
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
-from app.data.db import connect_database
-from app.data.users import get_user_by_username, insert_user
+from app.data.db import get_connection, get_writer
+from app.data.users import get_user_by_username, insert_user, update_password_hash, update_user_role
 from app.data.schema import create_users_table
-import pandas as pd
-import sqlite3
+from app.data.loader import load_csv_dedup
 from app.config import DATA_DIR, DB_PATH
-from app.data.auth import *
+from app.data.auth import hash_password, validate_password
+from app.data.bcrypt_cost import needs_rehash
+from app.services.hash_executor import get_hash_executor, chain_future, HashQueueFull
+from app.services.login_throttle import THROTTLED_MESSAGE, LoginThrottled, get_login_throttle, login_attempt
+from app.services.session_service import revoke_user_sessions
+from app.services.user_onboarding import onboard_users, onboard_users_from_file
+
+# Same answer for an unknown user and a wrong password, so logins do not reveal which usernames exist
+INVALID_LOGIN_MESSAGE = "Invalid username or password."
 
 
 def register_user(username, password, role="user"):
@@ -23,16 +32,15 @@ def register_user(username, password, role="user"):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    with get_connection() as conn:
+        cursor = conn.cursor()
 
-    # Check if user already exists
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    if cursor.fetchone():
-        conn.close()
-        return False, f"Username '{username}' already exists."
+        # Check if user already exists
+        cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+        if cursor.fetchone():
+            return False, f"Username '{username}' already exists."
 
-    # Hash the password
+    # Hash the password (outside the connection so bcrypt doesn't hold a pool slot)
     success, msg = validate_password(password)
     if success:
         password_hash = hash_password(password)
@@ -44,13 +52,8 @@ def register_user(username, password, role="user"):
     # hashed = bcrypt.hashpw(password_bytes, salt)
     # password_hash = hashed.decode('utf-8')
 
-    # Insert new user
-    cursor.execute(
-        "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-        (username, password_hash, role)
-    )
-    conn.commit()
-    conn.close()
+    # Insert new user (on the writer thread)
+    insert_user(username, password_hash, role)
 
     return True, f"User '{username}' registered successfully!"
 
@@ -68,82 +71,264 @@ def login_user(username, password):
     Returns:
         tuple: (success: bool, message: str)
     """
-    conn = connect_database()
-    cursor = conn.cursor()
+    decoy_seconds = 0
+    try:
+        # Shed the attempt before any bcrypt work if this user or the platform is over its limit
+        with login_attempt(username) as throttle:
+            with get_connection() as conn:
+                cursor = conn.cursor()
+
+                # Find user
+                cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+                user = cursor.fetchone()
+
+            if not user:
+                # Take as long as a real check, so timing does not reveal the miss; the sleep
+                # happens below, after the in-flight slot is released
+                if throttle:
+                    decoy_seconds = throttle.decoy_delay()
+            else:
+                # Verify password (user[2] is password_hash column)
+                stored_hash = user[2]
+                password_bytes = password.encode('utf-8')
+                hash_bytes = stored_hash.encode('utf-8')
+
+                import bcrypt
+
+                start = time.perf_counter()
+                matched = bcrypt.checkpw(password_bytes, hash_bytes)
+                if throttle:
+                    throttle.observe_verify(time.perf_counter() - start)
+                if matched:
+                    if needs_rehash(stored_hash):
+                        # Bring the hash to the current target cost while the plain password is at hand
+                        update_password_hash(username, hash_password(password), expected_hash=stored_hash)
+                    return True, f"Welcome, {username}!"
+    except LoginThrottled:
+        return False, THROTTLED_MESSAGE
+    time.sleep(decoy_seconds)
+    return False, INVALID_LOGIN_MESSAGE
+
+
+def _login_result(username):
+    def _result(matched):
+        if matched:
+            return True, f"Welcome, {username}!"
+        return False, INVALID_LOGIN_MESSAGE
+    return _result
+
+
+def login_user_async(username, password):
+    """
+    Authenticate a user with bcrypt running on the hashing process pool.
 
-    # Find user
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
+    The user lookup happens on the calling thread; only the password
+    check is offloaded.
+
+    Args:
+        username: User's login name
+        password: Plain text password to verify
 
+    Returns:
+        concurrent.futures.Future: resolves to (success: bool, message: str)
+
+    Raises:
+        HashQueueFull: if the hashing queue is saturated
+    """
+    done = Future()
+    throttle = get_login_throttle()
+    if throttle is not None:
+        try:
+            throttle.admit(username)
+        except LoginThrottled:
+            done.set_result((False, THROTTLED_MESSAGE))
+            return done
+
+    user = get_user_by_username(username)
     if not user:
-        return False, "Username not found."
+        if throttle is None:
+            done.set_result((False, INVALID_LOGIN_MESSAGE))
+        else:
+            # Resolve after about one bcrypt check, so timing does not reveal the miss
+            threading.Timer(throttle.decoy_delay(), done.set_result, args=[(False, INVALID_LOGIN_MESSAGE)]).start()
+        return done
 
-    # Verify password (user[2] is password_hash column)
     stored_hash = user[2]
-    password_bytes = password.encode('utf-8')
-    hash_bytes = stored_hash.encode('utf-8')
+    executor = get_hash_executor()
+    future = executor.verify(password, stored_hash)
+    if needs_rehash(stored_hash):
+        future.add_done_callback(lambda f: _rehash_async(executor, username, password, stored_hash, f))
+    return chain_future(future, _login_result(username))
 
-    if bcrypt.checkpw(password_bytes, hash_bytes):
-        return True, f"Welcome, {username}!"
-    else:
-        return False, "Invalid password."
+
+def _rehash_async(executor, username, password, stored_hash, verified):
+    # Runs when the verify finishes; the rehash is queued on the pool, not waited for
+    if verified.cancelled() or verified.exception() is not None or not verified.result():
+        return
+    try:
+        rehashed = executor.hash(password)
+    except HashQueueFull:
+        return  # retried on a later login
+
+    def _store(f):
+        if f.exception() is None:
+            update_password_hash(username, f.result(), expected_hash=stored_hash)
+
+    rehashed.add_done_callback(_store)
+
+
+def login_users_batch(credentials):
+    """
+    Authenticate many (username, password) pairs across all cores.
+
+    Args:
+        credentials: Iterable of (username, password) tuples
+
+    Returns:
+        list: (success: bool, message: str) per pair, in input order
+    """
+    credentials = list(credentials)
+    results = [None] * len(credentials)
+    pairs, positions = [], []
+
+    throttle = get_login_throttle()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for i, (username, password) in enumerate(credentials):
+            if throttle is not None:
+                try:
+                    throttle.admit(username)
+                except LoginThrottled:
+                    results[i] = (False, THROTTLED_MESSAGE)
+                    continue
+            cursor.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
+            row = cursor.fetchone()
+            if row is None:
+                results[i] = (False, INVALID_LOGIN_MESSAGE)
+            else:
+                pairs.append((password, row[0]))
+                positions.append(i)
+
+    stale = []
+    for i, (pair, matched) in enumerate(zip(pairs, verify_passwords_batch(pairs))):
+        results[positions[i]] = _login_result(credentials[positions[i]][0])(matched)
+        if matched and needs_rehash(pair[1]):
+            stale.append((credentials[positions[i]][0], pair[0], pair[1]))
+
+    if stale:
+        # Upgrade hashes below the target cost, in one parallel pass
+        rehashed = get_hash_executor().hash_many([password for _, password, _ in stale])
+        get_writer().run(
+            _store_rehashed,
+            [(new_hash, username, old_hash) for (username, _, old_hash), new_hash in zip(stale, rehashed)]
+        )
+    return results
+
+
+def _store_rehashed(conn, rows):
+    # Runs on the writer thread; a row only applies if the hash was not changed meanwhile
+    conn.executemany("UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?", rows)
+
+
+def verify_passwords_batch(pairs):
+    """
+    Check (plain_text_password, hashed_password) pairs on the hashing pool.
+
+    Returns:
+        list: One bool per pair, in input order
+    """
+    return get_hash_executor().verify_many(pairs)
+
+
+def change_password(username, new_password):
+    """
+    Set a new password and revoke the user's existing sessions.
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    success, msg = validate_password(new_password)
+    if not success:
+        return success, msg
+    if not update_password_hash(username, hash_password(new_password)):
+        return False, "Username not found."
+    revoke_user_sessions(username)
+    return True, "Password updated."
+
+
+def change_role(username, role):
+    """
+    Change a user's role and revoke the user's existing sessions.
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    if not update_user_role(username, role):
+        return False, "Username not found."
+    revoke_user_sessions(username)
+    return True, f"Role for '{username}' set to '{role}'."
 
 
 def migrate_users_from_file(conn, filepath=DATA_DIR / "users.txt"):
     """
     Migrate users from users.txt to the database.
 
-    This is a COMPLETE IMPLEMENTATION as an example.
+    Lines are username,password_hash[,role]; they are validated and
+    written in batches by the onboarding pipeline (see
+    app.services.user_onboarding), skipping users that already exist.
 
     Args:
         conn: Database connection
         filepath: Path to users.txt file
+
+    Returns:
+        int: Number of users migrated
     """
+    filepath = Path(filepath)
     if not filepath.exists():
         print(f"⚠️  File not found: {filepath}")
         print("   No users to migrate.")
-        return
+        return 0
 
-    cursor = conn.cursor()
-    migrated_count = 0
+    result = onboard_users_from_file(conn, filepath)
+    for number, message in result["errors"]:
+        print(f"Error migrating user on line {number}: {message}")
 
-    with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    print(f"✅ Migrated {result['inserted']} users from {filepath.name}")
+    return result["inserted"]
 
-            # Parse line: username,password_hash
-            parts = line.split(',')
-            if len(parts) >= 2:
-                username = parts[0]
-                password_hash = parts[1]
 
-                # Insert user (ignore if already exists)
-                try:
-                    cursor.execute(
-                        "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                        (username, password_hash, 'user')
-                    )
-                    if cursor.rowcount > 0:
-                        migrated_count += 1
-                except sqlite3.Error as e:
-                    print(f"Error migrating user {username}: {e}")
+def register_users_bulk(credentials, role="user", progress=None):
+    """
+    Register many users at once, hashing their passwords in parallel.
 
-    conn.commit()
-    print(f"✅ Migrated {migrated_count} users from {filepath.name}")
+    Args:
+        credentials: Iterable of (username, password) tuples
+        role: Role for every new user
+        progress: Optional callable given the running totals after each batch
 
+    Returns:
+        dict: inserted, existing, invalid and errors (see user_onboarding.onboard_users)
+    """
+    records = ({"username": username, "password": password} for username, password in credentials)
+    with get_connection() as conn:
+        return onboard_users(conn, records, default_role=role, progress=progress)
 
-def load_csv_to_table(conn, csv_path, table_name):
+
+def load_csv_to_table(conn, csv_path, table_name, key_columns=None, chunksize=50000):
     """
-    Load a CSV file into a database table using pandas.
+    Load a CSV file into a database table, skipping rows already present.
 
+    The CSV is streamed in chunks and deduplicated inside SQLite (see
+    app.data.loader.load_csv_dedup), so neither the file nor the table
+    has to fit in memory. An interrupted load resumes where it stopped.
 
     Args:
         conn: Database connection
         csv_path: Path to CSV file
         table_name: Name of the target table
+        key_columns: Natural key columns (default: table's known key or a content hash)
+        chunksize: CSV rows per chunk
 
     Returns:
         int: Number of rows loaded
@@ -153,19 +338,9 @@ def load_csv_to_table(conn, csv_path, table_name):
         print(f"⚠️  File not found: {csv_path}")
         return
 
-    # Read CSV into DataFrame
-    df = pd.read_csv(csv_path)
-
-    # Read existing rows
-    existing = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-
-    # Merge and keep only new rows
-    new_rows = df.merge(existing, how="left", indicator=True)
-    new_rows = new_rows[new_rows["_merge"] == "left_only"].drop(columns=["_merge"])
+    stats = load_csv_dedup(conn, csv_path, table_name, key_columns=key_columns, chunksize=chunksize)
 
-    # Bulk insert all new rows
-    if not new_rows.empty:
-        new_rows.to_sql(table_name, conn, if_exists="append", index=False)
+    if stats["rows_inserted"]:
         print("Data loaded successfully")
     else:
         print("No new data to load")
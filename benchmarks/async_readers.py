@@ -0,0 +1,135 @@
+"""
+Concurrency check for app.data.async_api.
+
+Builds a scratch database, then for each reader count runs --clients
+coroutines issuing uncached reads through AsyncDatabase while one more
+coroutine keeps writing (status updates and small bulk inserts). Reports
+read throughput per reader count and counts "database is locked" errors,
+which must be zero.
+
+Usage:
+    python -m benchmarks.async_readers                  # exits 1 on any lock error
+    python -m benchmarks.async_readers --scale 200000 --readers 1 2 4 --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Uncached, index-assisted aggregate: enough work per call for threads to matter
+READ_QUERY = """
+SELECT category_id, COUNT(*), SUM(length(description))
+FROM cyber_incidents
+WHERE occurred_at BETWEEN ? AND ?
+GROUP BY category_id
+"""
+WINDOW = 30 * 86400
+
+
+def _read(conn, start):
+    return conn.execute(READ_QUERY, (start, start + WINDOW)).fetchall()
+
+
+async def run_load(db, seconds, clients, first, last, max_id):
+    """
+    Hammer db with clients readers and one writer for seconds.
+
+    Returns:
+        dict: reads, writes, reads_per_sec, locked (lock errors) and errors (other failures)
+    """
+    counts = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    def failed(e):
+        counts["locked" if "locked" in str(e) else "errors"] += 1
+
+    async def reader(i):
+        step = max((last - first - WINDOW) // 97, 1)
+        start = first + i * step
+        while time.perf_counter() < deadline:
+            try:
+                await db.read(_read, start)
+                counts["reads"] += 1
+            except sqlite3.Error as e:
+                failed(e)
+            start = first + (start - first + step) % max(last - first - WINDOW, 1)
+
+    async def writer():
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            try:
+                if n % 10:
+                    await db.update_incident_status(1 + n * 7919 % max_id, "Resolved")
+                else:
+                    await db.insert_incidents_bulk(
+                        [("2024-06-01 12:00:00", "Low", "Phishing", "Open", "async bench", "bench")] * 100)
+                counts["writes"] += 1
+            except sqlite3.Error as e:
+                failed(e)
+
+    started = time.perf_counter()
+    await asyncio.gather(writer(), *(reader(i) for i in range(clients)))
+    counts["reads_per_sec"] = counts["reads"] / (time.perf_counter() - started)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100000, help="Incident rows")
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4], help="Reader thread counts to try")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent reading coroutines")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="platform-async-")
+    db_path = Path(workdir) / "bench.db"
+    # Must be set before app modules are imported: it fixes the default DB_PATH
+    os.environ["PLATFORM_DB_PATH"] = str(db_path)
+
+    from app.data.async_api import AsyncDatabase
+    from app.data.db import apply_pragmas
+    from app.data.schema import create_all_tables
+    from benchmarks.synthetic import populate
+
+    conn = apply_pragmas(sqlite3.connect(str(db_path)))
+    create_all_tables(conn)
+    print(f"Populating {args.scale} incidents in {db_path} ...")
+    populate(conn, incidents=args.scale)
+    first, last = conn.execute("SELECT MIN(occurred_at), MAX(occurred_at) FROM cyber_incidents").fetchone()
+    max_id = conn.execute("SELECT MAX(incident_id) FROM cyber_incidents").fetchone()[0]
+    conn.close()
+
+    print(f"\n{'Readers':>7} {'reads/s':>10} {'writes':>8} {'locked':>7} {'errors':>7}")
+    print("-" * 44)
+    problems = 0
+    for readers in args.readers:
+        db = AsyncDatabase(db_path, readers=readers)
+        try:
+            with open(os.devnull, "w") as devnull:
+                # The write helpers print a line per call
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    r = asyncio.run(run_load(db, args.seconds, args.clients, first, last, max_id))
+                finally:
+                    sys.stdout = stdout
+        finally:
+            db.close()
+        problems += r["locked"] + r["errors"]
+        print(f"{readers:>7} {r['reads_per_sec']:>10.1f} {r['writes']:>8} {r['locked']:>7} {r['errors']:>7}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    if problems:
+        print(f"\n❌ {problems} failed call(s) under concurrent load.")
+        return 1
+    print("\n✅ No lock errors under concurrent reads and writes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
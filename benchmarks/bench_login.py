@@ -0,0 +1,66 @@
+"""
+Login throughput benchmark for the bcrypt hashing executor.
+
+Verifies the same batch of passwords with 1, 2, 4 ... CPU-count worker
+processes and prints logins per second for each pool size.
+
+Usage:
+    python -m benchmarks.bench_login --logins 200 --rounds 10
+"""
+import argparse
+import os
+import time
+
+import bcrypt
+
+from app.services.hash_executor import HashExecutor
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run(logins=200, rounds=10, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    password = "BenchPass123!"
+    # One hash is enough: every checkpw costs the same at a given cost factor
+    stored_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+    pairs = [(password, stored_hash)] * logins
+
+    results = []
+    for workers in worker_counts(max_workers):
+        executor = HashExecutor(max_workers=workers)
+        try:
+            executor.verify_many(pairs[:workers])  # start the worker processes
+            start = time.perf_counter()
+            ok = executor.verify_many(pairs)
+            elapsed = time.perf_counter() - start
+        finally:
+            executor.shutdown()
+        assert all(ok)
+        results.append({"workers": workers, "seconds": elapsed, "logins_per_sec": logins / elapsed})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    results = run(args.logins, args.rounds, args.max_workers)
+    base = results[0]["logins_per_sec"]
+    print(f"{'Workers':<10} {'Logins/sec':<15} {'Speedup':<10}")
+    print("-" * 35)
+    for r in results:
+        print(f"{r['workers']:<10} {r['logins_per_sec']:<15.1f} {r['logins_per_sec'] / base:<10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Import-time budget check.
+
+Imports each module in BUDGETS in a fresh interpreter under
+`python -X importtime`, from an empty scratch directory, and checks that:
+
+  * the module's cumulative import time (best of --repeat runs) is
+    within its budget,
+  * none of the HEAVY dependencies are imported as a side effect,
+  * importing prints nothing and creates no files.
+
+Usage:
+    python -m benchmarks.import_time              # exits 1 on any violation
+    python -m benchmarks.import_time --repeat 10 --out imports.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time budget per module, in milliseconds
+BUDGETS = {
+    "app.config": 40,
+    "app.data.db": 60,
+    "app.data.schema": 40,
+    "app.data.users": 60,
+    "app.data.cache": 40,
+    "app.data.lookups": 40,
+    "app.data.bcrypt_cost": 40,
+    "app.data.incidents": 80,
+    "app.data.tickets": 60,
+    "app.data.search": 60,
+    "app.data.datasets": 60,
+    "app.data.loader": 60,
+    "app.data.async_api": 120,
+    "app.services.hash_executor": 60,
+    "app.services.login_throttle": 40,
+    "app.services.session_service": 80,
+    "app.services.user_service": 120,
+    "main": 150,
+}
+
+# Must only be imported by the functions that need them
+HEAVY = ("pandas", "numpy", "bcrypt", "multiprocessing", "streamlit")
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative microseconds} from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def measure(module, repeat):
+    """
+    Import module repeat times in fresh interpreters.
+
+    Returns:
+        dict: best_ms, heavy (heavy modules seen), stdout and created (files left behind)
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    best, heavy, stdout, created = None, set(), "", []
+    with tempfile.TemporaryDirectory(prefix="import-time-") as scratch:
+        # First run compiles bytecode and warms the page cache; it is not timed
+        for run in range(repeat + 1):
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                cwd=scratch, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+            times = parse_importtime(proc.stderr)
+            heavy.update(h for h in HEAVY if h in times)
+            stdout = stdout or proc.stdout
+            if run and module in times:
+                best = times[module] if best is None else min(best, times[module])
+        created = sorted(os.listdir(scratch))
+    return {"best_ms": (best or 0) / 1000, "heavy": sorted(heavy), "stdout": stdout, "created": created}
+
+
+def check_imports(budgets=None, repeat=5, scale=1.0):
+    """
+    Measure every module in budgets.
+
+    Returns:
+        tuple: ({module: measurement}, [(module, problem), ...])
+    """
+    results, failures = {}, []
+    for module, budget_ms in (budgets or BUDGETS).items():
+        r = measure(module, repeat)
+        r["budget_ms"] = budget_ms * scale
+        results[module] = r
+        if r["best_ms"] > r["budget_ms"]:
+            failures.append((module, f"{r['best_ms']:.1f} ms exceeds budget of {r['budget_ms']:.0f} ms"))
+        if r["heavy"]:
+            failures.append((module, f"imports {', '.join(r['heavy'])} at import time"))
+        if r["stdout"]:
+            failures.append((module, f"prints on import: {r['stdout'].strip().splitlines()[0]!r}"))
+        if r["created"]:
+            failures.append((module, f"creates files on import: {', '.join(r['created'])}"))
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed imports per module (best is kept)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget (slow CI machines)")
+    parser.add_argument("--out", help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results, failures = check_imports(repeat=args.repeat, scale=args.budget_scale)
+    print(f"{'Module':<34} {'best ms':>9} {'budget ms':>10}")
+    print("-" * 55)
+    for module, r in results.items():
+        print(f"{module:<34} {r['best_ms']:>9.1f} {r['budget_ms']:>10.0f}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.out}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} import-time violation(s):")
+        for module, problem in failures:
+            print(f"  {module}: {problem}")
+        return 1
+    print(f"\n✅ All {len(results)} modules import within budget with no side effects.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Login flood check for app.services.login_throttle.
+
+Builds a scratch database with a few users, then runs --attackers threads
+calling user_service.login_user back to back, --pause apart (brute force
+on one account, wrong passwords for real accounts and random unknown
+usernames) while the main thread times a small dashboard read every few
+milliseconds. The read is timed idle, then under the flood with
+throttling off and on; each run reports the dashboard read p50/p99,
+login attempts per second, what was shed and the median response time
+of unknown-user vs wrong-password attempts.
+
+With throttling on, the dashboard p99 must stay within --max-slowdown
+times its idle p99, and unknown usernames must answer within
+--max-timing-gap of a real check.
+
+Usage:
+    python -m benchmarks.login_flood                  # exits 1 if a bound is missed
+    python -m benchmarks.login_flood --attackers 32 --seconds 10
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+USERS = 20
+VICTIM = "victim"
+DASHBOARD_QUERY = """
+SELECT category_id, severity_id, COUNT(*)
+FROM cyber_incidents
+GROUP BY category_id, severity_id
+"""
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+def run_flood(db_path, attackers, seconds, interval, pause):
+    """
+    Flood login_user from attackers threads for seconds while timing dashboard reads.
+
+    Returns:
+        dict: dashboard_p50_ms, dashboard_p99_ms, logins_per_sec, unknown_ms, wrong_ms (median
+              response of attempts that were not shed) and throttle (stats(), or None when off)
+    """
+    from app.services import login_throttle
+    from app.services.user_service import login_user
+
+    login_throttle._throttle = None  # fresh buckets and counters for each run
+    stop = threading.Event()
+    timings = {"unknown": [], "wrong": []}
+    attempts = [0]
+    lock = threading.Lock()
+
+    def attacker(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            pick = rng.random()
+            if pick < 0.4:
+                kind, username = "wrong", VICTIM
+            elif pick < 0.7:
+                kind, username = "wrong", f"user{rng.randrange(USERS)}"
+            else:
+                kind, username = "unknown", f"ghost{rng.randrange(10 ** 9)}"
+            start = time.perf_counter()
+            ok, message = login_user(username, "WrongPass123!")
+            elapsed = time.perf_counter() - start
+            with lock:
+                attempts[0] += 1
+                if message != login_throttle.THROTTLED_MESSAGE:
+                    timings[kind].append(elapsed * 1000)
+            time.sleep(pause)
+
+    threads = [threading.Thread(target=attacker, args=(i,), daemon=True) for i in range(attackers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    dashboard = []
+    conn = sqlite3.connect(str(db_path))
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        conn.execute(DASHBOARD_QUERY).fetchall()
+        dashboard.append((time.perf_counter() - start) * 1000)
+        time.sleep(interval)
+    conn.close()
+
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    throttle = login_throttle._throttle
+    return {
+        "dashboard_p50_ms": percentile(dashboard, 0.50),
+        "dashboard_p99_ms": percentile(dashboard, 0.99),
+        "logins_per_sec": attempts[0] / elapsed,
+        "unknown_ms": statistics.median(timings["unknown"]) if timings["unknown"] else 0.0,
+        "wrong_ms": statistics.median(timings["wrong"]) if timings["wrong"] else 0.0,
+        "throttle": throttle.stats() if throttle else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=50000, help="Incident rows behind the dashboard read")
+    parser.add_argument("--attackers", type=int, default=16, help="Threads calling login_user")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+    parser.add_argument("--pause", type=float, default=0.01, help="Pause between one attacker's attempts (round trip)")
+    parser.add_argument("--interval", type=float, default=0.005, help="Pause between dashboard reads")
+    parser.add_argument("--max-slowdown", type=float, default=4.0,
+                        help="Dashboard p99 bound with throttling on, as a multiple of the idle p99")
+    parser.add_argument("--max-timing-gap", type=float, default=0.25,
+                        help="Allowed relative gap between unknown-user and wrong-password response times")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="platform-flood-")
+    db_path = Path(workdir) / "bench.db"
+    # Must be set before app modules are imported: it fixes the default DB_PATH
+    os.environ["PLATFORM_DB_PATH"] = str(db_path)
+    os.environ.setdefault("PLATFORM_BCRYPT_ROUNDS", "10")
+
+    from app.data.auth import hash_password
+    from app.data.db import apply_pragmas
+    from app.data.schema import create_all_tables
+    from benchmarks.synthetic import populate
+
+    conn = apply_pragmas(sqlite3.connect(str(db_path)))
+    create_all_tables(conn)
+    print(f"Populating {args.scale} incidents and {USERS + 1} users in {db_path} ...")
+    populate(conn, incidents=args.scale)
+    password_hash = hash_password("RightPass123!")
+    conn.executemany("INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, 'user')",
+                     [(VICTIM, password_hash)] + [(f"user{i}", password_hash) for i in range(USERS)])
+    conn.commit()
+    conn.close()
+
+    results = {}
+    for label, attackers, enabled in (("idle", 0, "0"), ("off", args.attackers, "0"), ("on", args.attackers, "1")):
+        os.environ["PLATFORM_LOGIN_THROTTLE"] = enabled
+        results[label] = r = run_flood(db_path, attackers, args.seconds, args.interval, args.pause)
+        if not attackers:
+            print(f"\nIdle: dashboard read p50 {r['dashboard_p50_ms']:.1f} ms, p99 {r['dashboard_p99_ms']:.1f} ms")
+            continue
+        print(f"\nThrottling {label}: {r['logins_per_sec']:.1f} attempts/s | dashboard read "
+              f"p50 {r['dashboard_p50_ms']:.1f} ms, p99 {r['dashboard_p99_ms']:.1f} ms | "
+              f"unknown user {r['unknown_ms']:.1f} ms vs wrong password {r['wrong_ms']:.1f} ms")
+        stats = r["throttle"]
+        if stats:
+            print(f"   {stats['attempts']} attempts, {stats['admitted']} admitted | shed: {stats['shed_user']} per-user, "
+                  f"{stats['shed_global']} global, {stats['shed_in_flight']} in-flight | "
+                  f"{stats['cpu_seconds_shed']:.1f}s of bcrypt avoided (limit {stats['global_rate']:.1f}/s)")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    on = results["on"]
+    bound = args.max_slowdown * results["idle"]["dashboard_p99_ms"]
+    problems = []
+    if on["dashboard_p99_ms"] > bound:
+        problems.append(f"dashboard p99 {on['dashboard_p99_ms']:.1f} ms exceeds {bound:.1f} ms")
+    if on["wrong_ms"] and abs(on["unknown_ms"] - on["wrong_ms"]) > args.max_timing_gap * on["wrong_ms"]:
+        problems.append(f"unknown users answer in {on['unknown_ms']:.1f} ms vs {on['wrong_ms']:.1f} ms")
+    if not on["throttle"] or not on["throttle"]["shed_total"]:
+        problems.append("nothing was shed")
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        return 1
+    print("\n✅ Dashboard latency bounded and unknown usernames indistinguishable under a login flood.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
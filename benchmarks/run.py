@@ -0,0 +1,284 @@
+"""
+Benchmark every public data-access and service function on synthetic data.
+
+Builds a scratch database at the requested scale, times each function
+(p50/p95/p99 latency, throughput, peak memory) and writes the results as
+JSON. With --baseline, p95 latencies are compared against a stored run
+and the exit status is 1 if any function regressed beyond --tolerance.
+
+Usage:
+    python -m benchmarks.run --scale 10000 --out bench.json
+    python -m benchmarks.run --scale 100000 --baseline bench.json --tolerance 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ITERATIONS = 50
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def time_case(fn, iterations):
+    """Run fn repeatedly and summarise its latency and memory use."""
+    # Several app functions print progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # warm-up: imports, page cache, query cache
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        fn()
+        _, peak_alloc = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    ms = np.array(latencies) * 1000
+    return {
+        "iterations": iterations,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "ops_per_sec": float(iterations / (ms.sum() / 1000)) if ms.sum() else float("inf"),
+        "peak_alloc_mb": peak_alloc / (1024 * 1024),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def build_cases(conn, scale, workdir, rng):
+    """Return (name, callable, iterations) for every benchmarked function."""
+    from app.data import incidents, tickets, users
+    from app.services import session_service, user_onboarding, user_service
+    from benchmarks.synthetic import BENCH_PASSWORD, iter_incident_rows, iter_ticket_rows
+
+    max_id = conn.execute("SELECT MAX(incident_id) FROM cyber_incidents").fetchone()[0] or 1
+    user_count = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+    sample_rows = next(iter_incident_rows(1000, seed=7))
+    ticket_count = conn.execute("SELECT COUNT(*) FROM it_tickets").fetchone()[0]
+    sample_tickets = next(iter_ticket_rows(1000, seed=8))
+    inserted_ids = []
+    bench_hash = conn.execute("SELECT password_hash FROM users LIMIT 1").fetchone()[0]
+
+    def onboarding_records(n, prehashed):
+        # New usernames each call; plaintext imports pay for one bcrypt hash per user
+        batch = next(counter)
+        key = "password_hash" if prehashed else "password"
+        return [{"username": f"onboard{batch}x{i}", key: bench_hash if prehashed else BENCH_PASSWORD}
+                for i in range(n)]
+
+    def random_id():
+        return int(rng.integers(1, max_id + 1))
+
+    def random_user():
+        return f"user{int(rng.integers(0, max(user_count, 1))):08d}"
+
+    def cold(fn):
+        # Analytics are cached; the cold variants measure the underlying query
+        def run():
+            incidents.incident_cache.invalidate()
+            tickets.ticket_cache.invalidate()
+            return fn(conn)
+        return run
+
+    csv_path = Path(workdir) / "incidents_import.csv"
+    with open(csv_path, "w") as f:
+        f.write("incident_id,timestamp,severity,category,status,description\n")
+        for i, row in enumerate(sample_rows * 10):
+            f.write(f"{max_id + 1000000 + i},{row[0]},{row[1]},{row[2]},{row[3]},{row[4]}\n")
+
+    token = session_service.create_session("user00000000", "user")
+    counter = iter(range(10 ** 9))
+
+    return [
+        ("incidents.insert_incident",
+         lambda: inserted_ids.append(incidents.insert_incident(conn, *sample_rows[0])), ITERATIONS),
+        ("incidents.insert_incidents_bulk[1000]", lambda: incidents.insert_incidents_bulk(conn, sample_rows), 10),
+        ("incidents.update_incident_status",
+         lambda: incidents.update_incident_status(conn, random_id(), "Resolved"), ITERATIONS),
+        ("incidents.delete_incident",
+         lambda: incidents.delete_incident(conn, inserted_ids.pop() if inserted_ids else random_id()), 20),
+        ("incidents.get_incidents_page", lambda: incidents.get_incidents_page(conn, after_id=random_id()), ITERATIONS),
+        ("incidents.get_incidents_page[severity]",
+         lambda: incidents.get_incidents_page(conn, page_size=500, severity="Critical"), ITERATIONS),
+        ("incidents.iter_incidents[critical]",
+         lambda: sum(len(df) for df in incidents.iter_incidents(conn, ["severity"], severity="Critical")), 3),
+        ("incidents.get_all_incidents", lambda: incidents.get_all_incidents(conn), 3),
+        ("incidents.get_incidents_by_type_count", lambda: incidents.get_incidents_by_type_count(conn), ITERATIONS),
+        ("incidents.get_incidents_by_type_count[cold]", cold(incidents.get_incidents_by_type_count), 10),
+        ("incidents.get_monthly_incident_counts", lambda: incidents.get_monthly_incident_counts(conn), ITERATIONS),
+        ("incidents.get_monthly_incident_counts[cold]", cold(incidents.get_monthly_incident_counts), 10),
+        ("incidents.get_incident_timeseries[year,cold]",
+         cold(lambda c: incidents.get_incident_timeseries(c, "2024-01-01", "2025-01-01", by="severity")), 10),
+        ("incidents.get_incident_timeseries[day,cold]",
+         cold(lambda c: incidents.get_incident_timeseries(c, "2024-06-01", "2024-06-02", by="category")), 10),
+        ("incidents.get_high_severity_by_status", lambda: incidents.get_high_severity_by_status(conn), ITERATIONS),
+        ("incidents.get_high_severity_by_status[cold]", cold(incidents.get_high_severity_by_status), 10),
+        ("incidents.get_incident_types_with_many_cases",
+         lambda: incidents.get_incident_types_with_many_cases(conn), ITERATIONS),
+        ("incidents.get_incident_types_with_many_cases[cold]", cold(incidents.get_incident_types_with_many_cases), 10),
+        ("tickets.upsert_tickets[1000]", lambda: tickets.upsert_tickets(conn, sample_tickets), 10),
+        ("tickets.update_tickets_status",
+         lambda: tickets.update_tickets_status(
+             conn, [f"TCK-{int(i):08d}" for i in rng.integers(0, max(ticket_count, 1), size=100)], "In Progress"),
+         ITERATIONS),
+        ("tickets.get_tickets_page[status]",
+         lambda: tickets.get_tickets_page(conn, page_size=500, status="Open"), ITERATIONS),
+        ("tickets.get_resolution_time_percentiles[cold]", cold(tickets.get_resolution_time_percentiles), 5),
+        ("tickets.get_resolution_time_percentiles[assignee,cold]",
+         cold(lambda c: tickets.get_resolution_time_percentiles(c, by="assigned_to")), 5),
+        ("tickets.get_backlog_aging[cold]", cold(tickets.get_backlog_aging), 10),
+        ("tickets.get_weekly_throughput[cold]", cold(tickets.get_weekly_throughput), 5),
+        ("users.get_user_by_username", lambda: users.get_user_by_username(random_user()), ITERATIONS),
+        ("users.insert_user", lambda: users.insert_user(f"bench{next(counter)}", "x"), ITERATIONS),
+        ("user_service.register_user",
+         lambda: user_service.register_user(f"bench_reg{next(counter)}", BENCH_PASSWORD), 5),
+        ("user_onboarding.onboard_users[1000,prehashed]",
+         lambda: user_onboarding.onboard_users(conn, onboarding_records(1000, prehashed=True)), 5),
+        ("user_onboarding.onboard_users[50,plaintext]",
+         lambda: user_onboarding.onboard_users(conn, onboarding_records(50, prehashed=False)), 3),
+        ("user_service.login_user", lambda: user_service.login_user(random_user(), BENCH_PASSWORD), 20),
+        ("user_service.load_csv_to_table",
+         lambda: user_service.load_csv_to_table(conn, csv_path, "cyber_incidents"), 3),
+        ("session_service.create_session", lambda: session_service.create_session(random_user(), "user"), ITERATIONS),
+        ("session_service.validate_session", lambda: session_service.validate_session(token), ITERATIONS * 20),
+    ]
+
+
+def compare(results, baseline, tolerance):
+    """Return (name, baseline p95, current p95) for every regression."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before and current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append((name, before["p95_ms"], current["p95_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10000, help="Incident rows (tickets match; users scale/10)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Write JSON results here")
+    parser.add_argument("--baseline", help="Compare against this JSON results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown (0.2 = 20%%)")
+    parser.add_argument("--only", help="Regex: run only matching benchmarks")
+    parser.add_argument("--skip", help="Regex: skip matching benchmarks")
+    parser.add_argument("--keep-db", action="store_true", help="Keep the scratch database for inspection")
+    parser.add_argument("--sql-metrics", help="Record per-query SQL metrics and write them here (.prom or .json)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="platform-bench-")
+    db_path = Path(workdir) / "bench.db"
+    # Must be set before app modules are imported: it fixes the default DB_PATH
+    os.environ["PLATFORM_DB_PATH"] = str(db_path)
+    # Pin the bcrypt cost so runs are comparable across hosts and never calibrate
+    os.environ.setdefault("PLATFORM_BCRYPT_ROUNDS", "10")
+    # Cases call login back to back; login throttling has its own benchmark (benchmarks.login_flood)
+    os.environ.setdefault("PLATFORM_LOGIN_THROTTLE", "0")
+
+    from app.data import metrics
+    from app.data.db import apply_pragmas
+    from app.data.schema import create_all_tables
+    from benchmarks.synthetic import populate
+
+    conn = apply_pragmas(sqlite3.connect(str(db_path), check_same_thread=False))
+    create_all_tables(conn)
+    print(f"Populating {args.scale} incidents in {db_path} ...")
+    populate_times = populate(
+        conn,
+        incidents=args.scale,
+        tickets=args.scale,
+        users=max(args.scale // 10, 100),
+        datasets=max(args.scale // 100, 10),
+        seed=args.seed,
+    )
+
+    if args.sql_metrics:
+        # Only the benchmark cases are traced, not the populate step
+        metrics.enable_metrics()
+        conn.close()
+        conn = apply_pragmas(sqlite3.connect(str(db_path), check_same_thread=False,
+                                             factory=metrics.connection_factory()))
+
+    rng = np.random.default_rng(args.seed)
+    results = {}
+    print(f"\n{'Benchmark':<52} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'alloc MB':>9}")
+    print("-" * 102)
+    for name, fn, iterations in build_cases(conn, args.scale, workdir, rng):
+        if args.only and not re.search(args.only, name):
+            continue
+        if args.skip and re.search(args.skip, name):
+            continue
+        r = time_case(fn, iterations)
+        results[name] = r
+        print(f"{name:<52} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['ops_per_sec']:>10.1f} {r['peak_alloc_mb']:>9.2f}")
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "populate_seconds": populate_times,
+            "peak_rss_mb": _peak_rss_mb(),
+        },
+        "results": results,
+    }
+    conn.close()
+    if args.keep_db:
+        print(f"\nScratch database kept at {db_path}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.out}")
+
+    if args.sql_metrics:
+        if args.sql_metrics.endswith(".prom"):
+            metrics.export_prometheus(args.sql_metrics)
+        else:
+            metrics.export_json(args.sql_metrics)
+        print(f"SQL metrics written to {args.sql_metrics}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("meta", {}).get("scale") != args.scale:
+            print("⚠️  Baseline was recorded at a different scale; comparison may be meaningless.")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for name, before, after in regressions:
+                print(f"  {name}: p95 {before:.3f} ms -> {after:.3f} ms")
+            return 1
+        print(f"\n✅ No p95 regressions beyond {args.tolerance:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Seeded synthetic data for benchmarks.
+
+Generates users, cyber incidents, IT tickets and dataset metadata with
+skewed, realistic-looking distributions, in chunks so that 10M-row
+tables can be produced in constant memory.
+"""
+import calendar
+import time
+
+import numpy as np
+
+from app.data.incidents import insert_incidents_bulk
+from app.data.tickets import insert_tickets_bulk
+
+SEVERITIES = (["Low", "Medium", "High", "Critical"], [0.35, 0.40, 0.20, 0.05])
+CATEGORIES = (["Phishing", "Malware", "DDoS", "Unauthorized Access", "Misconfiguration"],
+              [0.45, 0.22, 0.12, 0.11, 0.10])
+INCIDENT_STATUSES = (["Open", "In Progress", "Resolved", "Closed"], [0.18, 0.27, 0.35, 0.20])
+PRIORITIES = (["Low", "Medium", "High", "Critical"], [0.30, 0.40, 0.22, 0.08])
+TICKET_STATUSES = (["Open", "In Progress", "Waiting for User", "Resolved", "Closed"],
+                   [0.12, 0.15, 0.08, 0.45, 0.20])
+TICKET_CATEGORIES = (["Hardware", "Software", "Network", "Access", "Other"], [0.2, 0.35, 0.2, 0.15, 0.1])
+ASSIGNEES = [f"IT_Support_{c}" for c in "ABCDEFGH"]
+
+# Busier during office hours: relative weight of each hour of the day
+HOUR_WEIGHTS = np.array([1, 1, 1, 1, 1, 2, 3, 5, 8, 9, 9, 8, 7, 8, 9, 9, 8, 6, 4, 3, 2, 2, 1, 1], dtype=float)
+HOUR_WEIGHTS /= HOUR_WEIGHTS.sum()
+
+START_EPOCH = calendar.timegm((2024, 1, 1, 0, 0, 0))
+SPAN_DAYS = 365
+CHUNK_SIZE = 100000
+
+# Every synthetic user shares this password, hashed once at cost 4: bulk hashing is not what populate() measures
+BENCH_PASSWORD = "BenchPass123!"
+
+
+def _choice(rng, options, n):
+    values, weights = options
+    return np.array(values, dtype=object)[rng.choice(len(values), size=n, p=weights)]
+
+
+def _timestamps(rng, n):
+    days = rng.integers(0, SPAN_DAYS, size=n)
+    hours = rng.choice(24, size=n, p=HOUR_WEIGHTS)
+    seconds = rng.integers(0, 3600, size=n)
+    return START_EPOCH + days * 86400 + hours * 3600 + seconds
+
+
+def _format(epochs):
+    return np.datetime_as_string(epochs.astype("datetime64[s]"), unit="s").astype(object)
+
+
+def iter_incident_rows(n, seed=42, chunk_size=CHUNK_SIZE):
+    """Yield lists of incident tuples (insert_incident argument order)."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        ts = [t.replace("T", " ") for t in _format(_timestamps(rng, size))]
+        sev = _choice(rng, SEVERITIES, size)
+        cat = _choice(rng, CATEGORIES, size)
+        status = _choice(rng, INCIDENT_STATUSES, size)
+        reporters = rng.integers(0, 500, size=size)
+        yield [
+            (ts[i], sev[i], cat[i], status[i], f"{cat[i]} incident {start + i} detected on host-{reporters[i] % 97}",
+             f"analyst{reporters[i]}")
+            for i in range(size)
+        ]
+
+
+def iter_ticket_rows(n, seed=43, chunk_size=CHUNK_SIZE):
+    """Yield lists of it_tickets tuples."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        created = _timestamps(rng, size)
+        # Resolution times are long-tailed: most tickets close within a day, some take weeks
+        resolution = (rng.lognormal(mean=2.5, sigma=1.1, size=size) * 3600).astype(np.int64)
+        status = _choice(rng, TICKET_STATUSES, size)
+        resolved = np.isin(status, ["Resolved", "Closed"])
+        created_s = [t.replace("T", " ") for t in _format(created)]
+        resolved_s = [t.replace("T", " ") for t in _format(created + resolution)]
+        pri = _choice(rng, PRIORITIES, size)
+        cat = _choice(rng, TICKET_CATEGORIES, size)
+        who = np.array(ASSIGNEES, dtype=object)[rng.integers(0, len(ASSIGNEES), size=size)]
+        yield [
+            (f"TCK-{start + i:08d}", pri[i], status[i], cat[i], f"{cat[i]} issue {start + i}",
+             f"Ticket {start + i} problem description", created_s[i],
+             resolved_s[i] if resolved[i] else None, who[i])
+            for i in range(size)
+        ]
+
+
+def iter_user_rows(n, password_hash, seed=44, chunk_size=CHUNK_SIZE):
+    """Yield lists of (username, password_hash, role) tuples."""
+    rng = np.random.default_rng(seed)
+    roles = (["user", "analyst", "admin"], [0.85, 0.13, 0.02])
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        role = _choice(rng, roles, size)
+        yield [(f"user{start + i:08d}", password_hash, role[i]) for i in range(size)]
+
+
+def iter_dataset_rows(n, seed=45, chunk_size=CHUNK_SIZE):
+    """Yield lists of datasets_metadata tuples."""
+    rng = np.random.default_rng(seed)
+    categories = (["Finance", "Security", "Operations", "Marketing", "HR"], [0.25, 0.3, 0.2, 0.15, 0.1])
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        cat = _choice(rng, categories, size)
+        records = rng.lognormal(mean=10, sigma=2, size=size).astype(np.int64)
+        updated = [t[:10] for t in _format(_timestamps(rng, size))]
+        yield [
+            (f"dataset_{start + i}", cat[i], f"source_{i % 40}", updated[i], int(records[i]),
+             round(float(records[i]) * 0.0002, 3))
+            for i in range(size)
+        ]
+
+
+def populate(conn, incidents=0, tickets=0, users=0, datasets=0, seed=42, password_hash=None):
+    """
+    Fill a database (schema already created) with synthetic rows.
+
+    Returns:
+        dict: Seconds spent generating and inserting each table
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    for chunk in iter_incident_rows(incidents, seed):
+        insert_incidents_bulk(conn, chunk, batch_size=len(chunk))
+    timings["incidents"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for chunk in iter_ticket_rows(tickets, seed + 1):
+        insert_tickets_bulk(conn, chunk, batch_size=len(chunk))
+    timings["tickets"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if users:
+        if password_hash is None:
+            from app.data.auth import hash_password
+            # At the target cost, so logins do not trigger a rehash
+            password_hash = hash_password(BENCH_PASSWORD)
+        for chunk in iter_user_rows(users, password_hash, seed + 2):
+            conn.executemany("INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)", chunk)
+            conn.commit()
+    timings["users"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for chunk in iter_dataset_rows(datasets, seed + 3):
+        conn.executemany(
+            "INSERT INTO datasets_metadata (dataset_name, category, source, last_updated, record_count, "
+            "file_size_mb) VALUES (?, ?, ?, ?, ?, ?)",
+            chunk
+        )
+        conn.commit()
+    timings["datasets"] = time.perf_counter() - start
+    return timings
@@ -1,8 +1,7 @@
-from app.data.db import connect_database
+from app.data.db import connect_database, get_connection
 from app.data.schema import create_all_tables
 
 from app.data.incidents import *
-import pandas as pd
 from pathlib import Path
 from app.data.users import *
 
@@ -135,6 +134,8 @@ def run_comprehensive_tests():
         print(f"  Create: ✅ Incident #{test_id} created")
 
         # Read
+        import pandas as pd
+
         df = pd.read_sql_query(
             "SELECT * FROM cyber_incidents WHERE incident_id = ?",
             conn,
@@ -171,7 +172,8 @@ if __name__ == "__main__":
     # Run the complete setup
     main()
     # Run the complete setup
-    create_all_tables(conn)
+    with get_connection() as conn:
+        create_all_tables(conn)
 
     setup_database_complete()
     # Run tests
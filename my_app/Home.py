@@ -1,8 +1,15 @@
 import streamlit as st
 from app.services.user_service import register_user, login_user
+from app.services.session_service import create_session, validate_session
+from app.data.users import get_user_by_username
+from app.data.bcrypt_cost import calibrate_at_startup
 
 st.set_page_config(page_title="Login / Register", page_icon="🔑 ", layout="centered")
 
+# Calibrate the bcrypt cost for this host in the background, once per server process
+# (no-op once a calibration is saved), so no login or register request pays for it
+calibrate_at_startup()
+
 # ---------- Initialise session state ----------
 if "users" not in st.session_state:
     # Very simple in-memory "database": {username: password}
@@ -14,6 +21,15 @@ if "logged_in" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state.username = ""
 
+if "session_token" not in st.session_state:
+    st.session_state.session_token = ""
+
+# A revoked or expired token logs the user out
+if st.session_state.logged_in and not validate_session(st.session_state.session_token):
+    st.session_state.logged_in = False
+    st.session_state.username = ""
+    st.session_state.session_token = ""
+
 st.title("🔐 Welcome")
 
 # If already logged in, go straight to dashboard (optional)
@@ -37,14 +53,17 @@ with tab_login:
     if st.button("Log in", type="primary"):
         success, msg = login_user(login_username, login_password)
         if success:
+            user = get_user_by_username(login_username)
             st.session_state.logged_in = True
             st.session_state.username = login_username
+            st.session_state.session_token = create_session(login_username, user[3])
             st.success(f"Welcome back, {login_username}! 🎉 ")
 
             # Redirect to dashboard page
             st.switch_page("pages/1_Dashboard.py")
         else:
-            st.error("Invalid username or password.")
+            # msg says whether the attempt failed or was throttled
+            st.error(msg)
 
 # ----- REGISTER TAB -----
 with tab_register:
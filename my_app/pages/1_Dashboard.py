@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from app.data.db import connect_database
+from datetime import timedelta
 from app.data.incidents import *
+from app.services.session_service import validate_session, revoke_session
+from app.data.search import search_incidents, search_tickets
+from app.data.tickets import (aging_bucket_labels, aging_reference_time, get_resolution_time_percentiles,
+                              get_backlog_aging, get_weekly_throughput)
+from app.services.dashboard_cache import dashboard_snapshot, database_writer, versioned
 
 st.set_page_config(page_title="Dashboard", page_icon="📊 ",
 layout="wide")
@@ -12,16 +17,48 @@ if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "username" not in st.session_state:
     st.session_state.username = ""
+if "session_token" not in st.session_state:
+    st.session_state.session_token = ""
 
-# Guard: if not logged in, send user back
-if not st.session_state.logged_in:
+# Guard: if not logged in (or the session was revoked), send user back
+if not st.session_state.logged_in or not validate_session(st.session_state.session_token):
+    st.session_state.logged_in = False
     st.error("You must be logged in to view the dashboard.")
     if st.button("Go to login page"):
         st.switch_page("Home.py") # back to the first page
     st.stop()
 
-# Setup database
-conn = connect_database()
+# Setup database: the schema is created once per server process; reads below are
+# memoized until the tables they depend on are written, and every write goes
+# through the single writer thread
+writer = database_writer()
+
+
+@versioned("cyber_incidents")
+def monthly_incident_pivot(conn):
+    df = get_monthly_incident_counts(conn)
+    return df.pivot(index="month", columns="category", values="count").fillna(0)
+
+
+@versioned("cyber_incidents")
+def incident_timeseries_pivot(conn, start, end, resolution, by):
+    df, resolution = get_incident_timeseries(conn, start, end, resolution=resolution, by=by)
+    return df.pivot(index="period", columns=by, values="count").fillna(0), resolution
+
+
+# as_of is part of the cache key: ages grow with the clock, not only with writes
+@versioned("it_tickets")
+def backlog_aging_pivot(conn, as_of):
+    aging = get_backlog_aging(conn, as_of=as_of)
+    return aging.pivot(index="age_bucket", columns="priority", values="count").reindex(aging_bucket_labels()).fillna(0)
+
+
+incident_time_range = versioned("cyber_incidents")(get_incident_time_range)
+incidents_page = versioned("cyber_incidents")(get_incidents_page)
+cached_search_incidents = versioned("cyber_incidents")(search_incidents)
+cached_search_tickets = versioned("it_tickets")(search_tickets)
+resolution_time_percentiles = versioned("it_tickets")(get_resolution_time_percentiles)
+weekly_throughput = versioned("it_tickets")(get_weekly_throughput)
 
 # If logged in, show dashboard content
 st.title("📊 Dashboard")
@@ -30,6 +67,37 @@ st.success(f"Hello, **{st.session_state.username}**! You are logged in.")
 # Example dashboard layout
 st.caption("Welcome to the Multi-Domain Intelligence Platform")
 
+
+def show_search(label, search_fn, key, page_size=20):
+    """Search box with BM25-ranked, paginated results."""
+    query = st.text_input(label, key=f"{key}_query")
+    if not query:
+        return
+    # A new query starts again from the first page
+    if st.session_state.get(f"{key}_last_query") != query:
+        st.session_state[f"{key}_last_query"] = query
+        st.session_state[f"{key}_page"] = 0
+    page = st.session_state.get(f"{key}_page", 0)
+
+    results, has_more = search_fn(conn, query, limit=page_size, offset=page * page_size)
+    if results.empty:
+        st.info("No matches found.")
+        return
+    st.dataframe(results.drop(columns=["score"]), hide_index=True)
+
+    nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+    with nav_prev:
+        if st.button("Previous results", key=f"{key}_prev", disabled=page == 0):
+            st.session_state[f"{key}_page"] = page - 1
+            st.rerun()
+    with nav_page:
+        st.caption(f"Results page {page + 1}")
+    with nav_next:
+        if st.button("More results", key=f"{key}_next", disabled=not has_more):
+            st.session_state[f"{key}_page"] = page + 1
+            st.rerun()
+
+
 # Allow category selections
 categories = ["NONE","Cybersecurity", "Data Science", "IT Operations"]
 selected_categories = st.selectbox("Select a domain:", categories)
@@ -43,37 +111,97 @@ if selected_categories == "NONE":
 # ---------- Cybersecurity Display ----------
 elif selected_categories == "Cybersecurity":
 
-    st.subheader("Cyber Incidents by Category (Monthly):")
-
-    col1, col2 = st.columns(2)
-    # Group incidents by month and category
-    chart_data = """
-           SELECT strftime('%Y-%m', timestamp) as month, category, COUNT(*) as count
-           FROM cyber_incidents
-           GROUP BY month, category
-           ORDER BY month
-           """
-    # Connects to database to run chart_data and to make a dataframe
-    df = pd.read_sql_query(chart_data, conn)
-
-    df_pivot = df.pivot(index="month", columns="category", values="count").fillna(0)
-
-    # Show bar chart
-    with col1:
-        st.subheader("Line chart")
-        st.line_chart(df_pivot)
-
-
-    # Show the line chart
-    with col2:
-        st.subheader("\nBar chart")
-        st.bar_chart(df_pivot)
-
-
-    # Shows cyber_incidents data
-    data = get_all_incidents(conn)
-    with st.expander("See raw data"):
-        st.dataframe(data)
+    # The charts, raw data and search of this render read one read-only snapshot, so they
+    # agree with each other; it is released before the edit forms, so a render holds a
+    # pooled connection only while it reads and never while it waits on a write
+    with dashboard_snapshot() as conn:
+        st.subheader("Cyber Incidents by Category (Monthly):")
+
+        col1, col2 = st.columns(2)
+        # Incidents by month and category, read from the trigger-maintained rollup
+        df_pivot = monthly_incident_pivot(conn)
+
+        # Show bar chart
+        with col1:
+            st.subheader("Line chart")
+            st.line_chart(df_pivot)
+
+
+        # Show the line chart
+        with col2:
+            st.subheader("\nBar chart")
+            st.bar_chart(df_pivot)
+
+        # Time-window drill-down, read from the hour/day/month rollups at any zoom
+        first_seen, last_seen = incident_time_range(conn)
+        if last_seen is not None:
+            st.subheader("Incidents over time:")
+            default_start = max(first_seen.date(), last_seen.date() - timedelta(days=30))
+            window_col, resolution_col, by_col = st.columns([2, 1, 1])
+            with window_col:
+                window = st.date_input(
+                    "Time window",
+                    value=(default_start, last_seen.date()),
+                    min_value=first_seen.date(),
+                    max_value=last_seen.date(),
+                )
+            with resolution_col:
+                resolution = st.selectbox("Resolution", ["auto", "hour", "day", "week", "month"])
+            with by_col:
+                breakdown = st.selectbox("Break down by", ["category", "severity", "status"])
+            if len(window) == 2:
+                df_series, used = incident_timeseries_pivot(conn, window[0], window[1] + timedelta(days=1),
+                                                            resolution, breakdown)
+                if df_series.empty:
+                    st.info("No incidents in this window.")
+                else:
+                    st.caption(f"Incidents per {used}")
+                    st.bar_chart(df_series)
+
+
+        # Shows cyber_incidents data one page at a time (keyset pagination on incident_id)
+        if "incident_page_cursors" not in st.session_state:
+            st.session_state.incident_page_cursors = [None]
+
+        with st.expander("See raw data"):
+            filter_col1, filter_col2, filter_col3 = st.columns(3)
+            with filter_col1:
+                severity_filter = st.multiselect("Severity", ["Low", "Medium", "High", "Critical"])
+            with filter_col2:
+                status_filter = st.multiselect("Status", ["Open", "In Progress", "Investigating", "Resolved", "Closed"])
+            with filter_col3:
+                page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=2)
+
+            # Changing the filters starts again from the first page
+            page_key = (tuple(severity_filter), tuple(status_filter), page_size)
+            if st.session_state.get("incident_page_key") != page_key:
+                st.session_state.incident_page_key = page_key
+                st.session_state.incident_page_cursors = [None]
+
+            cursors = st.session_state.incident_page_cursors
+            data, next_after_id = incidents_page(
+                conn,
+                after_id=cursors[-1],
+                page_size=page_size,
+                severity=tuple(severity_filter) or None,
+                status=tuple(status_filter) or None,
+            )
+            st.dataframe(data)
+
+            nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+            with nav_prev:
+                if st.button("Previous", disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+            with nav_page:
+                st.caption(f"Page {len(cursors)}")
+            with nav_next:
+                if st.button("Next", disabled=next_after_id is None):
+                    cursors.append(next_after_id)
+                    st.rerun()
+
+        # Full-text search over incident descriptions
+        show_search("Search incident descriptions", cached_search_incidents, "incident_search")
 
     # Allow category selections
     edit_categories = ["Add", "Remove", "Update Status"]
@@ -92,7 +220,7 @@ elif selected_categories == "Cybersecurity":
             submitted = st.form_submit_button("Insert Incident")
 
             if submitted:
-                incident_id = insert_incident(conn, timestamp, severity, category, status, description, reported_by)
+                incident_id = writer.run(insert_incident, timestamp, severity, category, status, description, reported_by)
                 st.success(f"Incident {incident_id} inserted successfully!")
 
     # Remove incident
@@ -120,7 +248,7 @@ elif selected_categories == "Cybersecurity":
             with col_a:
                 if st.button("Yes"):
                     st.success("Deleting incident...")
-                    success = delete_incident(conn, st.session_state.incident_to_remove)
+                    success = writer.run(delete_incident, st.session_state.incident_to_remove)
                     if success == 1:
                         st.success("Incident deletion successful!")
                     else:
@@ -146,14 +274,45 @@ elif selected_categories == "Cybersecurity":
             submitted = st.form_submit_button("Update Incident")
 
             if submitted:
-                update_incident_status(conn, incident_id, new_status)
+                writer.run(update_incident_status, incident_id, new_status)
                 st.success(f"Incident {incident_id} updated successfully!")
 
+# ---------- IT Operations Display ----------
+elif selected_categories == "IT Operations":
+
+    # One snapshot for this domain's reads, as above
+    with dashboard_snapshot() as conn:
+        st.subheader("Ticket Resolution Times (hours):")
+        sla_by = st.radio("Group by:", ["priority", "assigned_to"], horizontal=True,
+                          format_func=lambda v: "Priority" if v == "priority" else "Assignee")
+        st.dataframe(resolution_time_percentiles(conn, by=sla_by).round(1), hide_index=True)
+
+        col1, col2 = st.columns(2)
+        # Open tickets by age, one bar segment per priority
+        with col1:
+            st.subheader("Backlog Aging")
+            aging_pivot = backlog_aging_pivot(conn, aging_reference_time())
+            if aging_pivot.empty or not aging_pivot.to_numpy().any():
+                st.info("No open tickets.")
+            else:
+                st.bar_chart(aging_pivot)
+
+        # Opened vs resolved per week, and the running backlog
+        with col2:
+            st.subheader("Weekly Throughput")
+            throughput = weekly_throughput(conn).set_index("week")
+            st.line_chart(throughput[["opened", "resolved", "backlog"]])
+
+        st.subheader("Search IT Tickets:")
+        show_search("Search ticket subjects and descriptions", cached_search_tickets, "ticket_search")
+
 
 # Logout button
 st.divider()
 if st.button("Log out"):
+    revoke_session(st.session_state.session_token)
     st.session_state.logged_in = False
     st.session_state.username = ""
+    st.session_state.session_token = ""
     st.info("You have been logged out.")
     st.switch_page("Home.py")
\ No newline at end of file
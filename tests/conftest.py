@@ -0,0 +1,13 @@
+"""
+Shared test setup.
+
+Services that use the process-wide pools and writer (sessions, users)
+open the default database, so point PLATFORM_DB_PATH at a scratch file
+before any app module is imported; tests never touch DATA/. bcrypt runs
+at its lowest cost to keep hashing tests fast.
+"""
+import os
+import tempfile
+
+os.environ["PLATFORM_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="platform-tests-"), "test.db")
+os.environ.setdefault("PLATFORM_BCRYPT_ROUNDS", "4")
@@ -0,0 +1,157 @@
+"""
+Asyncio facade over the data layer (app/data/async_api.py): timeouts and cancellation.
+"""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from app.data.async_api import AsyncDatabase
+from app.data.incidents import insert_incident
+from app.data.schema import create_all_tables
+
+# Never finishes on its own; only Connection.interrupt stops it
+ENDLESS_SQL = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(path)
+    create_all_tables(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def database(db_path):
+    database = AsyncDatabase(db_path, readers=1)
+    yield database
+    database.close(wait=False)
+    database.writer.close()
+
+
+def _incident_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+
+
+def test_reads_see_committed_writes(database):
+    async def scenario():
+        incident_id = await database.insert_incident("2024-01-01 09:00:00", "High", "Malware", "Open", "Worm")
+        page, _ = await database.get_incidents_page()
+        return incident_id, page
+
+    incident_id, page = asyncio.run(scenario())
+    assert page["incident_id"].tolist() == [incident_id]
+    assert page["severity"].tolist() == ["High"]
+
+
+def test_queued_read_that_times_out_never_runs(database):
+    release = threading.Event()
+    ran = []
+
+    def blocker(conn):
+        release.wait(5)
+
+    def queued(conn):
+        ran.append(1)
+
+    async def scenario():
+        busy = asyncio.ensure_future(database.read(blocker))
+        await asyncio.sleep(0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await database.read(queued, timeout=0.05)
+        release.set()
+        await busy
+
+    asyncio.run(scenario())
+    database.close(wait=True)
+    assert ran == []
+
+
+def test_running_read_is_interrupted_on_timeout(database):
+    outcome = []
+    finished = threading.Event()
+
+    def endless(conn):
+        try:
+            conn.execute(ENDLESS_SQL).fetchone()
+        except sqlite3.OperationalError as exc:
+            outcome.append(str(exc))
+            raise
+        finally:
+            finished.set()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await database.read(endless, timeout=0.2)
+        # The reader thread is free again for the next call
+        return await database.read(_incident_count, timeout=5)
+
+    assert asyncio.run(scenario()) == 0
+    assert finished.wait(5)
+    assert outcome == ["interrupted"]
+
+
+def test_cancelled_read_is_interrupted(database):
+    finished = threading.Event()
+
+    def endless(conn):
+        try:
+            conn.execute(ENDLESS_SQL).fetchone()
+        finally:
+            finished.set()
+
+    async def scenario():
+        task = asyncio.ensure_future(database.read(endless))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert finished.wait(5)
+
+
+def test_started_write_finishes_after_timeout(database):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_insert(conn):
+        started.set()
+        release.wait(5)
+        insert_incident(conn, "2024-01-01 09:00:00", "Low", "Malware", "Open", "late")
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await database.write(slow_insert, timeout=0.1)
+        assert started.is_set()
+        release.set()
+        # Jobs run in order, so this one sees the timed-out write committed
+        return await database.write(_incident_count, timeout=5)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_queued_write_that_times_out_never_runs(database):
+    release = threading.Event()
+    ran = []
+
+    def blocker(conn):
+        release.wait(5)
+
+    def queued(conn):
+        ran.append(1)
+
+    async def scenario():
+        busy = asyncio.ensure_future(database.write(blocker))
+        await asyncio.sleep(0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await database.write(queued, timeout=0.05)
+        release.set()
+        await busy
+        await database.write(_incident_count, timeout=5)
+
+    asyncio.run(scenario())
+    assert ran == []
@@ -0,0 +1,98 @@
+"""
+bcrypt cost calibration and the rehash rule (app/data/bcrypt_cost.py).
+"""
+import pytest
+
+import app.data.bcrypt_cost as bcrypt_cost
+from app.data.bcrypt_cost import MIN_ROUNDS, calibrate_bcrypt_rounds, hash_rounds, needs_rehash
+
+HASH_10 = "$2b$10$" + "a" * 53
+HASH_12 = "$2b$12$" + "a" * 53
+HASH_14 = "$2b$14$" + "a" * 53
+
+
+def _saved(rounds):
+    return {"rounds": rounds, "budget_ms": bcrypt_cost.LOGIN_P99_BUDGET_MS}
+
+
+@pytest.fixture
+def fresh_target(monkeypatch):
+    # Resolve the target from scratch: no override, no saved calibration, no calibration started
+    monkeypatch.delenv("PLATFORM_BCRYPT_ROUNDS", raising=False)
+    monkeypatch.setattr(bcrypt_cost, "load_calibration", lambda: None)
+    monkeypatch.setattr(bcrypt_cost, "_target", None)
+    monkeypatch.setattr(bcrypt_cost, "_calibration_started", False)
+
+
+def test_hash_rounds_reads_the_cost():
+    assert hash_rounds(HASH_12) == 12
+    assert hash_rounds("junk") is None
+    assert hash_rounds(None) is None
+
+
+def test_needs_rehash_only_upwards():
+    assert needs_rehash(HASH_10, rounds=12)
+    assert not needs_rehash(HASH_12, rounds=12)
+    # A hash made by a host with a higher target is left alone
+    assert not needs_rehash(HASH_14, rounds=12)
+    assert needs_rehash("junk", rounds=12)
+
+
+def test_target_falls_back_to_min_rounds(fresh_target):
+    assert bcrypt_cost.get_bcrypt_rounds() == MIN_ROUNDS
+    assert not needs_rehash(HASH_10)
+    assert needs_rehash("$2b$09$" + "a" * 53)
+
+
+def test_env_override_wins(fresh_target, monkeypatch):
+    monkeypatch.setenv("PLATFORM_BCRYPT_ROUNDS", "13")
+    monkeypatch.setattr(bcrypt_cost, "load_calibration", lambda: _saved(11))
+    assert bcrypt_cost.get_bcrypt_rounds() == 13
+    assert needs_rehash(HASH_12)
+
+
+def test_saved_calibration_only_counts_for_the_current_budget(fresh_target, monkeypatch):
+    saved = _saved(12)
+    monkeypatch.setattr(bcrypt_cost, "load_calibration", lambda: saved)
+    assert bcrypt_cost.get_bcrypt_rounds() == 12
+
+    bcrypt_cost.set_bcrypt_rounds(None)
+    saved["budget_ms"] = bcrypt_cost.LOGIN_P99_BUDGET_MS + 1
+    assert bcrypt_cost.get_bcrypt_rounds() == MIN_ROUNDS
+
+
+def test_calibration_picks_highest_cost_within_budget(monkeypatch):
+    # p99 doubles per cost: 40, 80, 160, 320 ms
+    monkeypatch.setattr(bcrypt_cost, "measure_checkpw_ms", lambda rounds, samples: [40.0 * 2 ** (rounds - 10)])
+    result = calibrate_bcrypt_rounds(p99_budget_ms=250, min_rounds=10, max_rounds=16)
+    assert result["rounds"] == 12
+    assert result["measured"] == {10: 40.0, 11: 80.0, 12: 160.0}
+
+
+def test_calibration_never_goes_below_min_rounds(monkeypatch):
+    monkeypatch.setattr(bcrypt_cost, "measure_checkpw_ms", lambda rounds, samples: [500.0])
+    assert calibrate_bcrypt_rounds(p99_budget_ms=250, min_rounds=10)["rounds"] == 10
+
+
+def test_startup_calibration_skipped_when_target_is_known(fresh_target, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("calibrated")
+
+    monkeypatch.setattr(bcrypt_cost, "calibrate_bcrypt_rounds", fail)
+    monkeypatch.setenv("PLATFORM_BCRYPT_ROUNDS", "12")
+    assert bcrypt_cost.calibrate_at_startup(background=False) is None
+
+    monkeypatch.delenv("PLATFORM_BCRYPT_ROUNDS")
+    monkeypatch.setattr(bcrypt_cost, "load_calibration", lambda: _saved(12))
+    assert bcrypt_cost.calibrate_at_startup(background=False) is None
+    assert not bcrypt_cost._calibration_started
+
+
+def test_startup_calibration_runs_once_and_sets_target(fresh_target, monkeypatch):
+    calls, saved = [], []
+    monkeypatch.setattr(bcrypt_cost, "calibrate_bcrypt_rounds", lambda: calls.append(1) or {"rounds": 11})
+    monkeypatch.setattr(bcrypt_cost, "save_calibration", saved.append)
+    bcrypt_cost.calibrate_at_startup(background=False)
+    bcrypt_cost.calibrate_at_startup(background=False)
+    assert calls == [1] and saved == [{"rounds": 11}]
+    assert bcrypt_cost.get_bcrypt_rounds() == 11
@@ -0,0 +1,72 @@
+"""
+Bulk incident ingestion (insert_incidents_bulk in app/data/incidents.py).
+"""
+import json
+import sqlite3
+
+import pytest
+
+from app.data.incidents import (IncidentValidationError, insert_incidents_bulk, iter_incidents_csv,
+                                iter_incidents_jsonl)
+from app.data.schema import create_all_tables
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _row(i, severity="High"):
+    return (f"2024-01-{i % 28 + 1:02d} 10:00:00", severity, "Malware", "Open", f"incident {i}")
+
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+
+
+def test_batches_and_contiguous_id_ranges(conn):
+    result = insert_incidents_bulk(conn, (_row(i) for i in range(7)), batch_size=3)
+    assert result["inserted"] == 7 and [b["rows"] for b in result["batches"]] == [3, 3, 1]
+    ids = [i for first, last in result["id_ranges"] for i in range(first, last + 1)]
+    assert ids == [row[0] for row in conn.execute("SELECT incident_id FROM cyber_incidents ORDER BY incident_id")]
+
+
+def test_invalid_rows_are_skipped_with_their_row_numbers(conn):
+    rows = [_row(0), _row(1, severity=None), ("too", "short"), _row(3)]
+    result = insert_incidents_bulk(conn, rows)
+    assert (result["inserted"], result["skipped"]) == (2, 2)
+    assert [number for number, _ in result["errors"]] == [2, 3]
+
+
+def test_raise_keeps_earlier_batches(conn):
+    rows = [_row(0), _row(1), _row(2, severity=None)]
+    with pytest.raises(IncidentValidationError, match="Row 3"):
+        insert_incidents_bulk(conn, rows, batch_size=2, on_error="raise")
+    assert _count(conn) == 2
+
+
+def test_streaming_sources(conn, tmp_path):
+    columns = ("timestamp", "severity", "category", "status", "description")
+    csv_path = tmp_path / "incidents.csv"
+    csv_path.write_text(",".join(columns) + "\n" + "".join(",".join(_row(i)) + "\n" for i in range(3)))
+    jsonl_path = tmp_path / "incidents.jsonl"
+    jsonl_path.write_text("".join(json.dumps(dict(zip(columns, _row(i)))) + "\n\n" for i in range(2)))
+
+    assert insert_incidents_bulk(conn, iter_incidents_csv(csv_path))["inserted"] == 3
+    assert insert_incidents_bulk(conn, iter_incidents_jsonl(jsonl_path))["inserted"] == 2
+    assert _count(conn) == 5
+
+
+def test_open_transaction_is_refused_and_left_alone(conn):
+    insert_incidents_bulk(conn, [_row(0)])
+    conn.execute("DELETE FROM cyber_incidents")
+    assert conn.in_transaction
+    with pytest.raises(sqlite3.ProgrammingError):
+        insert_incidents_bulk(conn, [_row(1)])
+    # The caller's uncommitted delete is still pending, not rolled back
+    assert conn.in_transaction and _count(conn) == 0
+    conn.rollback()
+    assert _count(conn) == 1
@@ -0,0 +1,65 @@
+"""
+Bulk loads from DataFrames with nullable dtypes, where missing values are pd.NA.
+"""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from app.data.incidents import insert_incidents_bulk
+from app.data.schema import create_all_tables
+from app.data.tickets import insert_tickets_bulk
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def test_incidents_with_na_optional_field(conn):
+    df = pd.DataFrame({
+        "timestamp": ["2024-01-01 10:00:00", "2024-01-02 11:00:00"],
+        "severity": ["High", "Low"],
+        "category": ["Malware", "Phishing"],
+        "status": ["Open", "Closed"],
+        "description": ["first", "second"],
+        "reported_by": pd.array(["alice", pd.NA], dtype="string"),
+    })
+    result = insert_incidents_bulk(conn, df, on_error="raise")
+    assert result["inserted"] == 2 and result["skipped"] == 0
+    rows = conn.execute("SELECT description, reported_by FROM cyber_incidents ORDER BY incident_id").fetchall()
+    assert rows == [("first", "alice"), ("second", None)]
+
+
+def test_incidents_with_na_required_field_are_skipped(conn):
+    df = pd.DataFrame({
+        "timestamp": ["2024-01-01 10:00:00"],
+        "severity": pd.array([pd.NA], dtype="string"),
+        "category": ["Malware"],
+        "status": ["Open"],
+        "description": ["no severity"],
+    })
+    result = insert_incidents_bulk(conn, df)
+    assert result["inserted"] == 0 and result["skipped"] == 1
+    assert "severity" in result["errors"][0][1]
+
+
+def test_tickets_with_na_fields(conn):
+    df = pd.DataFrame({
+        "ticket_id": pd.array([1, 2], dtype="Int64"),
+        "priority": ["High", "Low"],
+        "status": ["Open", "Resolved"],
+        "category": ["Network", pd.NA],
+        "subject": ["VPN down", "Printer"],
+        "description": ["", "jammed"],
+        "created_date": ["2024-01-01 09:00:00", "2024-01-02 09:00:00"],
+        "resolved_date": pd.array([pd.NA, "2024-01-03 09:00:00"], dtype="string"),
+        "assigned_to": pd.array([pd.NA, pd.NA], dtype="string"),
+    })
+    result = insert_tickets_bulk(conn, df, on_error="raise")
+    assert result["written"] == 2 and result["skipped"] == 0
+    rows = conn.execute("SELECT ticket_id, resolved_date, assigned_to FROM it_tickets ORDER BY ticket_id").fetchall()
+    assert rows == [("1", None, None), ("2", "2024-01-03 09:00:00", None)]
@@ -0,0 +1,74 @@
+"""
+Dataset catalog scans (app/data/datasets.py).
+"""
+import sqlite3
+
+import pytest
+
+from app.data.datasets import count_lines, scan_directory
+from app.data.schema import create_all_tables
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _catalog(conn):
+    return conn.execute(
+        "SELECT dataset_name, source, record_count, file_path FROM datasets_metadata ORDER BY id"
+    ).fetchall()
+
+
+@pytest.mark.parametrize("content, lines", [(b"", 0), (b"a\nb\n", 2), (b"a\nb", 2), (b"\n" * 5, 5)])
+def test_count_lines(tmp_path, content, lines):
+    path = tmp_path / "f.txt"
+    path.write_bytes(content)
+    assert count_lines(path, block_size=2) == lines
+
+
+def test_same_name_in_two_directories_gets_two_rows(conn, tmp_path):
+    root = tmp_path / "data"
+    (root / "a").mkdir(parents=True)
+    (root / "b").mkdir()
+    (root / "a" / "sales.csv").write_text("x\n1\n2\n")
+    (root / "b" / "sales.csv").write_text("x\n1\n")
+
+    first = scan_directory(conn, root)
+    assert first["scanned"] == 2
+    rows = _catalog(conn)
+    assert sorted((r[1], r[2]) for r in rows) == [("a", 2), ("b", 1)]
+
+    again = scan_directory(conn, root)
+    assert (again["scanned"], again["cached"]) == (0, 2)
+    assert len(_catalog(conn)) == 2
+
+
+def test_unlinked_row_of_the_same_name_is_taken_over(conn, tmp_path):
+    conn.execute("INSERT INTO datasets_metadata (dataset_name, category) VALUES ('sales', 'Finance')")
+    conn.commit()
+    (tmp_path / "sales.csv").write_text("x\n1\n2\n3\n")
+    scan_directory(conn, tmp_path)
+    rows = conn.execute("SELECT dataset_name, category, record_count FROM datasets_metadata").fetchall()
+    assert rows == [("sales", "Finance", 3)]
+
+
+def test_deleted_files_are_pruned_from_the_scan_cache(conn, tmp_path):
+    root = tmp_path / "data"
+    root.mkdir()
+    (root / "keep.csv").write_text("x\n1\n")
+    (root / "gone.csv").write_text("x\n1\n")
+    outside = tmp_path / "other"
+    outside.mkdir()
+    (outside / "elsewhere.csv").write_text("x\n1\n")
+    scan_directory(conn, outside)
+    scan_directory(conn, root)
+
+    (root / "gone.csv").unlink()
+    result = scan_directory(conn, root)
+    assert result["removed"] == 1 and result["files"] == 1
+    paths = [row[0] for row in conn.execute("SELECT path FROM dataset_files ORDER BY path")]
+    assert sorted(p.rsplit("/", 1)[-1] for p in paths) == ["elsewhere.csv", "keep.csv"]
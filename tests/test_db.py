@@ -0,0 +1,113 @@
+"""
+Connection pool and transaction helpers (app/data/db.py).
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from app.data.db import ConnectionPool, PoolTimeout, begin_immediate, ensure_wal, read_snapshot
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (value INTEGER)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_size=2, timeout=0.2)
+    yield pool
+    pool.close_all()
+
+
+def _count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_connections_are_reused_and_tuned(pool):
+    with pool.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with pool.connection() as second:
+        assert second is first
+    stats = pool.stats()
+    assert (stats["size"], stats["misses"], stats["hits"]) == (1, 1, 1)
+
+
+def test_nested_use_on_one_thread_shares_the_connection(pool):
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+    assert pool.stats()["size"] == 1
+
+
+def test_commit_on_success_and_rollback_on_error(pool, db_path):
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO items VALUES (1)")
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO items VALUES (2)")
+            raise RuntimeError("boom")
+    assert _count(db_path) == 1
+
+
+def test_exhausted_pool_times_out(pool):
+    held, done = threading.Event(), threading.Event()
+
+    def hold():
+        with pool.connection():
+            held.set()
+            done.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+        held.wait(5)
+        held.clear()
+    try:
+        with pytest.raises(PoolTimeout):
+            pool.acquire()
+        assert pool.stats()["waits"] == 1
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+    # Released connections are handed out again
+    with pool.connection():
+        pass
+
+
+def test_readonly_pool_refuses_writes(db_path):
+    ensure_wal(db_path)
+    pool = ConnectionPool(db_path, readonly=True)
+    with pool.connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO items VALUES (1)")
+    pool.close_all()
+
+
+def test_begin_immediate_refuses_an_open_transaction(pool):
+    with pool.connection() as conn:
+        begin_immediate(conn)
+        with pytest.raises(sqlite3.ProgrammingError):
+            begin_immediate(conn)
+        conn.rollback()
+
+
+def test_read_snapshot_does_not_see_later_writes(pool, db_path):
+    ensure_wal(db_path)
+    with read_snapshot(db_path) as reader:
+        before = reader.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        with pool.connection() as writer:
+            writer.execute("INSERT INTO items VALUES (1)")
+        assert reader.execute("SELECT COUNT(*) FROM items").fetchone()[0] == before
+    assert _count(db_path) == before + 1
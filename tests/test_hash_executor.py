@@ -0,0 +1,37 @@
+"""
+Batch bcrypt work on the hashing pool (app/services/hash_executor.py).
+"""
+import threading
+
+import bcrypt
+import pytest
+
+from app.services.hash_executor import HashExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = HashExecutor(max_workers=1, max_pending=2)
+    yield executor
+    executor.shutdown()
+
+
+def _hash(password):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+
+def test_verify_many_waits_instead_of_raising_when_queue_is_shared(executor):
+    stored = _hash("Secret123!")
+    pairs = [("Secret123!", stored), ("wrong", stored)] * 3
+    # Other callers hold every slot when the batch starts, and free them shortly after
+    executor._slots.acquire()
+    executor._slots.acquire()
+    threading.Timer(0.3, lambda: (executor._slots.release(), executor._slots.release())).start()
+    assert executor.verify_many(pairs) == [True, False] * 3
+    assert executor.rejected >= 1
+
+
+def test_hash_many_keeps_order(executor):
+    passwords = [f"Password{i}!" for i in range(5)]
+    hashes = executor.hash_many(passwords, rounds=4, chunk_size=2)
+    assert [bcrypt.checkpw(p.encode(), h.encode()) for p, h in zip(passwords, hashes)] == [True] * 5
@@ -0,0 +1,14 @@
+"""
+Import-time budget (benchmarks/import_time.py) as a test.
+
+Set PLATFORM_IMPORT_BUDGET_SCALE to loosen every budget on slow machines.
+"""
+import os
+
+from benchmarks.import_time import check_imports
+
+
+def test_modules_import_within_budget():
+    scale = float(os.environ.get("PLATFORM_IMPORT_BUDGET_SCALE", "1"))
+    _, failures = check_imports(repeat=3, scale=scale)
+    assert not failures, "\n".join(f"{module}: {problem}" for module, problem in failures)
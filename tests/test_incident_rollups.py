@@ -0,0 +1,58 @@
+"""
+Trigger-maintained incident_rollups (app/data/schema.py) against a full rebuild.
+"""
+import random
+import sqlite3
+
+import pytest
+
+from app.data.incidents import (delete_incident, get_incidents_by_type_count, get_monthly_incident_counts,
+                                insert_incident, insert_incidents_bulk, update_incident_status)
+from app.data.lookups import encode_value
+from app.data.schema import create_all_tables, rebuild_incident_rollups
+
+ROLLUP_SQL = "SELECT level, bucket, category_id, severity_id, status_id, count FROM incident_rollups ORDER BY 1, 2, 3, 4, 5"
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _random_incident(rng):
+    return (f"2024-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+            rng.choice(["Low", "High"]), rng.choice(["Malware", "Phishing"]), rng.choice(["Open", "Closed"]),
+            "random")
+
+
+def test_triggers_match_a_rebuild_after_mixed_writes(conn):
+    rng = random.Random(7)
+    insert_incidents_bulk(conn, [_random_incident(rng) for _ in range(200)], batch_size=64)
+    for _ in range(20):
+        insert_incident(conn, *_random_incident(rng))
+    ids = [row[0] for row in conn.execute("SELECT incident_id FROM cyber_incidents")]
+    for incident_id in rng.sample(ids, 30):
+        update_incident_status(conn, incident_id, rng.choice(["Open", "Closed", "Investigating"]))
+    for incident_id in rng.sample(ids, 30):
+        delete_incident(conn, incident_id)
+    category = encode_value(conn, "cyber_incidents", "category", "DDoS")
+    conn.execute("UPDATE cyber_incidents SET category_id = ? WHERE incident_id % 7 = 0", (category,))
+    conn.execute("UPDATE cyber_incidents SET occurred_at = occurred_at + 40 * 86400 WHERE incident_id % 5 = 0")
+    conn.commit()
+
+    maintained = conn.execute(ROLLUP_SQL).fetchall()
+    rebuild_incident_rollups(conn)
+    assert maintained == conn.execute(ROLLUP_SQL).fetchall()
+
+
+def test_monthly_and_category_totals_count_every_incident(conn):
+    rng = random.Random(3)
+    insert_incidents_bulk(conn, [_random_incident(rng) for _ in range(50)])
+    # An incident without a usable time still counts, in the 'unknown' month
+    insert_incident(conn, "not a date", "Low", "Malware", "Open", "no time")
+    total = conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+    assert get_monthly_incident_counts(conn)["count"].sum() == total
+    assert get_incidents_by_type_count(conn)["count"].sum() == total
@@ -0,0 +1,73 @@
+"""
+Deduplicating CSV loads (app/data/loader.py): content hashes and resume.
+"""
+import sqlite3
+
+import pytest
+
+from app.data.loader import load_csv_dedup, row_hashes
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    conn.execute("CREATE TABLE metrics (name TEXT, record_count INTEGER, ratio REAL)")
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "metrics.csv"
+    path.write_text("name,record_count,ratio\nalpha,100,1.50\nbeta,,2\ngamma,7,\n")
+    return path
+
+
+def test_reload_with_other_chunk_size_inserts_nothing(conn, csv_path):
+    first = load_csv_dedup(conn, csv_path, "metrics", chunksize=1)
+    second = load_csv_dedup(conn, csv_path, "metrics", chunksize=10)
+    assert first["rows_inserted"] == 3
+    assert second["rows_read"] == 3 and second["rows_inserted"] == 0
+    assert conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0] == 3
+
+
+def test_existing_rows_are_hashed_like_csv_rows(conn, csv_path):
+    conn.executemany(
+        "INSERT INTO metrics (name, record_count, ratio) VALUES (?, ?, ?)",
+        [("alpha", 100, 1.5), ("beta", None, 2.0)],
+    )
+    conn.commit()
+    stats = load_csv_dedup(conn, csv_path, "metrics")
+    assert stats["rows_inserted"] == 1
+    assert conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0] == 3
+
+
+def test_row_hashes_ignore_number_form():
+    import pandas as pd
+
+    as_text = pd.DataFrame({"n": ["100", None], "r": ["1.50", "2"]})
+    as_numbers = pd.DataFrame({"n": [100.0, float("nan")], "r": [1.5, 2.0]})
+    assert row_hashes(as_text) == row_hashes(as_numbers)
+
+
+def test_interrupted_load_resumes_after_last_chunk(conn, csv_path, monkeypatch):
+    import app.data.loader as loader
+
+    real_encode = loader.encode_rows
+    calls = []
+
+    def failing_encode(*args):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return real_encode(*args)
+
+    monkeypatch.setattr(loader, "encode_rows", failing_encode)
+    with pytest.raises(RuntimeError):
+        load_csv_dedup(conn, csv_path, "metrics", chunksize=1)
+    monkeypatch.setattr(loader, "encode_rows", real_encode)
+
+    stats = load_csv_dedup(conn, csv_path, "metrics", chunksize=1)
+    assert stats["rows_skipped_resume"] == 1
+    assert stats["rows_read"] == 2 and stats["rows_inserted"] == 2
+    assert conn.execute("SELECT COUNT(*) FROM load_checkpoints").fetchone()[0] == 0
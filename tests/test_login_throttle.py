@@ -0,0 +1,78 @@
+"""
+Login admission control (app/services/login_throttle.py).
+"""
+import pytest
+
+import app.data.bcrypt_cost as bcrypt_cost
+from app.services.login_throttle import LoginThrottle, LoginThrottled, TokenBucket, estimate_verify_seconds
+
+
+@pytest.fixture
+def no_bcrypt(monkeypatch):
+    # Building a throttle must not time bcrypt on the request path
+    def fail(*args, **kwargs):
+        raise AssertionError("bcrypt was benchmarked")
+
+    monkeypatch.setattr(bcrypt_cost, "measure_checkpw_ms", fail)
+    monkeypatch.setattr(bcrypt_cost, "calibrate_bcrypt_rounds", fail)
+    monkeypatch.setattr(bcrypt_cost, "_target", 12)
+
+
+def test_token_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=2, burst=3, now=0)
+    bucket.tokens = 0
+    bucket.refill(1)
+    assert bucket.tokens == 2
+    bucket.refill(10)
+    assert bucket.tokens == 3
+    bucket.tokens = 0.5
+    assert bucket.wait_time() == pytest.approx(0.25)
+
+
+def test_per_user_burst_is_shed(no_bcrypt):
+    throttle = LoginThrottle(user_rate=0.001, user_burst=2, global_rate=100, verify_seconds=0.01)
+    for _ in range(2):
+        with throttle.attempt("alice"):
+            pass
+    with pytest.raises(LoginThrottled) as shed:
+        with throttle.attempt("alice"):
+            pass
+    assert shed.value.reason == "user"
+    # Another account still has its own tokens
+    with throttle.attempt("bob"):
+        pass
+    assert throttle.stats()["shed_user"] == 1
+
+
+def test_global_rate_is_shed(no_bcrypt):
+    throttle = LoginThrottle(user_burst=5, global_rate=0.001, global_burst=2, verify_seconds=0.01)
+    throttle.admit("a")
+    throttle.admit("b")
+    with pytest.raises(LoginThrottled) as shed:
+        throttle.admit("c")
+    assert shed.value.reason == "global"
+
+
+def test_in_flight_cap_sheds_instead_of_queueing(no_bcrypt):
+    throttle = LoginThrottle(global_rate=100, max_in_flight=1, verify_seconds=0.01)
+    with throttle.attempt("alice"):
+        with pytest.raises(LoginThrottled) as shed:
+            with throttle.attempt("bob"):
+                pass
+    assert shed.value.reason == "in_flight"
+    with throttle.attempt("bob"):
+        pass
+
+
+def test_verify_estimate_uses_saved_calibration(no_bcrypt, monkeypatch):
+    monkeypatch.setattr(bcrypt_cost, "load_calibration", lambda: {"measured": {"11": 120.0, "12": 250.0}})
+    assert estimate_verify_seconds() == pytest.approx(0.25)
+    throttle = LoginThrottle()
+    assert throttle.verify_seconds == pytest.approx(0.25)
+    throttle.observe_verify(0.45)
+    assert 0.25 < throttle.verify_seconds < 0.45
+
+
+def test_verify_estimate_without_calibration_is_scaled_seed(no_bcrypt, monkeypatch):
+    monkeypatch.setattr(bcrypt_cost, "load_calibration", lambda: None)
+    assert estimate_verify_seconds() == pytest.approx(0.24)
@@ -0,0 +1,85 @@
+"""
+QueryCache (app/data/cache.py) invalidation through table_versions.
+"""
+import sqlite3
+
+import pytest
+
+from app.data.cache import QueryCache, table_version
+from app.data.incidents import insert_incident
+from app.data.schema import bump_table_version, create_all_tables
+
+COUNT_SQL = "SELECT COUNT(*) AS n FROM cyber_incidents"
+
+
+def _database(path=":memory:"):
+    conn = sqlite3.connect(path)
+    create_all_tables(conn)
+    return conn
+
+
+def _add_incident(conn):
+    insert_incident(conn, "2024-01-01 10:00:00", "High", "Malware", "Open", "test")
+    conn.commit()
+
+
+@pytest.fixture
+def cache():
+    return QueryCache(max_entries=8)
+
+
+def test_hit_until_the_table_is_written(cache):
+    conn = _database()
+    assert cache.read_sql(conn, COUNT_SQL, tables=("cyber_incidents",))["n"][0] == 0
+    assert cache.read_sql(conn, COUNT_SQL, tables=("cyber_incidents",))["n"][0] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    _add_incident(conn)
+    assert cache.read_sql(conn, COUNT_SQL, tables=("cyber_incidents",))["n"][0] == 1
+    assert cache.misses == 2
+
+
+def test_writes_to_other_tables_keep_entries(cache):
+    conn = _database()
+    cache.read_sql(conn, COUNT_SQL, tables=("cyber_incidents",))
+    before = table_version(conn, "cyber_incidents")
+    bump_table_version(conn, "it_tickets")
+    assert table_version(conn, "cyber_incidents") == before
+    cache.read_sql(conn, COUNT_SQL, tables=("cyber_incidents",))
+    assert cache.hits == 1
+
+
+def test_write_from_another_connection_invalidates(cache, tmp_path):
+    path = str(tmp_path / "shared.db")
+    reader, writer = _database(path), sqlite3.connect(path)
+    cache.read_sql(reader, COUNT_SQL, tables=("cyber_incidents",))
+    _add_incident(writer)
+    assert cache.read_sql(reader, COUNT_SQL, tables=("cyber_incidents",))["n"][0] == 1
+
+
+def test_in_memory_databases_do_not_share_entries(cache):
+    empty, filled = _database(), _database()
+    _add_incident(filled)
+    # Both start from the same table version after one write each
+    bump_table_version(empty, "cyber_incidents")
+    assert table_version(empty, "cyber_incidents") == table_version(filled, "cyber_incidents")
+    assert cache.read_sql(filled, COUNT_SQL, tables=("cyber_incidents",))["n"][0] == 1
+    assert cache.read_sql(empty, COUNT_SQL, tables=("cyber_incidents",))["n"][0] == 0
+
+
+def test_untracked_tables_are_never_cached(cache):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE notes (body TEXT)")
+    cache.read_sql(conn, "SELECT * FROM notes", tables=("notes",))
+    cache.read_sql(conn, "SELECT * FROM notes", tables=("notes",))
+    assert cache.stats()["entries"] == 0 and cache.hits == 0
+
+
+def test_invalidate_and_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    conn = _database()
+    for limit in (1, 2, 3):
+        cache.read_sql(conn, f"{COUNT_SQL} LIMIT {limit}", tables=("cyber_incidents",))
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+    cache.invalidate("cyber_incidents")
+    assert cache.stats()["entries"] == 0
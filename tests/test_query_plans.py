@@ -0,0 +1,28 @@
+"""
+Query-plan regression check (app/data/query_plans.py) as a test.
+"""
+import sqlite3
+
+from app.data.query_plans import check_query_plans
+from app.data.schema import create_all_tables
+
+
+def _describe(failures):
+    return "\n".join(f"{name}: {detail}" for name, _, detail in failures)
+
+
+def test_registered_queries_use_an_index():
+    failures = check_query_plans()
+    assert not failures, _describe(failures)
+
+
+def test_dropped_index_is_reported():
+    conn = sqlite3.connect(":memory:")
+    create_all_tables(conn)
+    indexes = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'cyber_incidents' AND sql IS NOT NULL"
+    )]
+    assert indexes
+    for name in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    assert check_query_plans(conn)
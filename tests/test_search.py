@@ -0,0 +1,88 @@
+"""
+Full-text search over incidents and tickets (app/data/search.py).
+"""
+import sqlite3
+
+import pytest
+
+from app.data.incidents import delete_incident, insert_incident
+from app.data.schema import create_all_tables
+from app.data.search import search_incidents, search_tickets, to_match_query
+from app.data.tickets import delete_ticket, insert_ticket, upsert_tickets
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _ids(df, column="incident_id"):
+    return sorted(df[column].tolist())
+
+
+def test_match_query_quotes_every_word():
+    assert to_match_query('phish* "OR" NEAR(x') == '"phish"* """OR""" "NEAR(x"'
+    assert to_match_query("  ") == ""
+    assert to_match_query(None) == ""
+
+
+def test_incident_search_ands_words_and_keeps_prefixes(conn):
+    first = insert_incident(conn, "2024-01-01 09:00:00", "High", "Phishing", "Open", "Phishing email with invoice")
+    second = insert_incident(conn, "2024-01-02 09:00:00", "Low", "Phishing", "Open", "Phishing link in chat")
+    insert_incident(conn, "2024-01-03 09:00:00", "Low", "Malware", "Open", "Ransomware on laptop")
+
+    df, has_more = search_incidents(conn, "phishing invoice")
+    assert _ids(df) == [first] and not has_more
+    df, _ = search_incidents(conn, "phish*")
+    assert _ids(df) == [first, second]
+    assert "**" in df["snippet"].iloc[0]
+
+
+def test_operators_in_user_input_do_not_raise(conn):
+    insert_incident(conn, "2024-01-01 09:00:00", "High", "Phishing", "Open", "Suspicious login")
+    for text in ('"', "OR", "AND NOT", "login)", "col:login", "*"):
+        df, has_more = search_incidents(conn, text)
+        assert not has_more
+    df, _ = search_incidents(conn, "")
+    assert df.empty and "snippet" in df.columns
+
+
+def test_pagination_reports_more_pages(conn):
+    for day in range(1, 6):
+        insert_incident(conn, f"2024-01-0{day} 09:00:00", "Low", "Malware", "Open", f"worm outbreak {day}")
+    pages = []
+    offset, has_more = 0, True
+    while has_more:
+        df, has_more = search_incidents(conn, "worm", limit=2, offset=offset)
+        pages.append(len(df))
+        offset += 2
+    assert pages == [2, 2, 1]
+
+
+def test_incident_index_follows_updates_and_deletes(conn):
+    incident_id = insert_incident(conn, "2024-01-01 09:00:00", "High", "Malware", "Open", "Trojan on server")
+    conn.execute("UPDATE cyber_incidents SET description = ? WHERE incident_id = ?", ("Rootkit on server", incident_id))
+    conn.commit()
+    assert search_incidents(conn, "trojan")[0].empty
+    assert _ids(search_incidents(conn, "rootkit")[0]) == [incident_id]
+
+    delete_incident(conn, incident_id)
+    assert search_incidents(conn, "server")[0].empty
+
+
+def test_ticket_search_covers_subject_and_description(conn):
+    insert_ticket(conn, "T-1", "Printer jammed", description="Paper stuck in tray")
+    insert_ticket(conn, "T-2", "VPN down", description="Cannot reach printer share")
+
+    assert _ids(search_tickets(conn, "printer")[0], "ticket_id") == ["T-1", "T-2"]
+    assert _ids(search_tickets(conn, "tray")[0], "ticket_id") == ["T-1"]
+
+    upsert_tickets(conn, [{"ticket_id": "T-1", "subject": "Scanner offline", "description": "Driver crash"}])
+    assert _ids(search_tickets(conn, "printer")[0], "ticket_id") == ["T-2"]
+    assert _ids(search_tickets(conn, "scanner")[0], "ticket_id") == ["T-1"]
+
+    delete_ticket(conn, "T-2")
+    assert search_tickets(conn, "printer")[0].empty
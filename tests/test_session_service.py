@@ -0,0 +1,58 @@
+"""
+Signed session tokens with an LRU cache (app/services/session_service.py).
+"""
+import pytest
+
+import app.services.session_service as session_service
+from app.services.session_service import SessionStore
+
+
+@pytest.fixture
+def store():
+    return SessionStore(secret=b"test-secret" * 3)
+
+
+def test_create_then_validate_hits_cache(store):
+    token = store.create_session("alice", "admin")
+    assert store.validate(token) == ("alice", "admin")
+    assert store.validate(token) == ("alice", "admin")
+    assert store.stats()["hits"] == 2
+
+
+def test_revoke_and_revoke_user(store):
+    first = store.create_session("carol")
+    second = store.create_session("carol")
+    other = store.create_session("bob")
+    assert store.revoke(first) is True
+    assert store.validate(first) is None
+    assert store.revoke_user("carol") == 1
+    assert store.validate(second) is None
+    assert store.validate(other) == ("bob", None)
+
+
+def test_revocation_by_another_process_is_seen_after_recheck(store, monkeypatch):
+    token = store.create_session("alice")
+    assert store.validate(token) is not None
+    SessionStore(secret=store.secret).revoke(token)
+    monkeypatch.setattr(session_service, "CACHE_RECHECK", 0)
+    assert store.validate(token) is None
+
+
+def test_expired_token_is_rejected():
+    store = SessionStore(secret=b"k" * 32, ttl=-1)
+    assert store.validate(store.create_session("alice")) is None
+
+
+@pytest.mark.parametrize("token", [
+    None, "", "garbage", "a.b.c", "a.1.b.c", "tokén.99999999999.sig", "x.\ud800.sig", "x.١٢٣.sig",
+])
+def test_malformed_tokens_are_rejected(store, token):
+    assert store.validate(token) is None
+    assert store.revoke(token) is False
+
+
+def test_tampered_signature_is_rejected(store):
+    token_id, expires_at, signature = store.create_session("alice").split(".")
+    assert store.validate(f"{token_id}.{expires_at}.é{signature[1:]}") is None
+    assert store.validate(f"{token_id}.{int(expires_at) + 60}.{signature}") is None
+    assert SessionStore(secret=b"other" * 8).validate(f"{token_id}.{expires_at}.{signature}") is None
@@ -0,0 +1,55 @@
+"""
+Ticket upserts (app/data/tickets.py).
+"""
+import sqlite3
+
+import pytest
+
+from app.data.lookups import lookup_table
+from app.data.schema import create_all_tables
+from app.data.tickets import upsert_tickets
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "test.db"))
+    create_all_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _statuses(conn):
+    lookup = lookup_table("it_tickets", "status")
+    return dict(conn.execute(
+        f"SELECT t.ticket_id, s.name FROM it_tickets t LEFT JOIN {lookup} s ON s.id = t.status_id"
+    ))
+
+
+def _ticket(ticket_id, status=None, subject="VPN down"):
+    return {"ticket_id": ticket_id, "priority": "High", "status": status, "subject": subject,
+            "created_date": "2024-01-01 09:00:00"}
+
+
+def test_new_ticket_without_status_is_open(conn):
+    upsert_tickets(conn, [_ticket("T1"), _ticket("T2", "Resolved")], on_error="raise")
+    assert _statuses(conn) == {"T1": "Open", "T2": "Resolved"}
+
+
+def test_update_without_status_keeps_the_stored_one(conn):
+    upsert_tickets(conn, [_ticket("T1", "Resolved")], on_error="raise")
+    upsert_tickets(conn, [_ticket("T1", subject="VPN still down")], on_error="raise")
+    assert _statuses(conn) == {"T1": "Resolved"}
+    assert conn.execute("SELECT subject FROM it_tickets").fetchone() == ("VPN still down",)
+
+    upsert_tickets(conn, [_ticket("T1", "Open")], on_error="raise")
+    assert _statuses(conn) == {"T1": "Open"}
+
+
+def test_open_transaction_is_refused_and_left_alone(conn):
+    upsert_tickets(conn, [_ticket("T1")], on_error="raise")
+    conn.execute("DELETE FROM it_tickets")
+    with pytest.raises(sqlite3.ProgrammingError):
+        upsert_tickets(conn, [_ticket("T2")])
+    assert conn.in_transaction
+    conn.rollback()
+    assert _statuses(conn) == {"T1": "Open"}
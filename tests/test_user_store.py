@@ -0,0 +1,81 @@
+"""
+Flat-file user store (app/data/user_store.py): index refresh and locking.
+"""
+import multiprocessing
+import threading
+
+import pytest
+
+from app.data.user_store import UserStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "users.txt")
+
+
+def _add_in_process(path, username, results):
+    results.put(UserStore(path).add_user(username, "hash"))
+
+
+def test_add_and_look_up(path):
+    store = UserStore(path)
+    assert store.get_hash("alice") is None
+    assert store.add_user("alice", "h1") is True
+    assert store.add_user("alice", "h2") is False
+    assert store.get_hash("alice") == "h1" and store.exists("alice") and len(store) == 1
+
+
+def test_appends_by_another_writer_are_seen(path):
+    reader, writer = UserStore(path), UserStore(path)
+    writer.add_user("alice", "h1")
+    assert reader.get_hash("alice") == "h1"
+    writer.add_user("bob", "h2")
+    assert reader.get_hash("bob") == "h2"
+
+
+def test_partial_line_waits_for_its_newline(path):
+    store = UserStore(path)
+    with open(path, "w") as fh:
+        fh.write("alice h1\nbob h")
+    assert store.get_hash("alice") == "h1" and store.get_hash("bob") is None
+    with open(path, "a") as fh:
+        fh.write("2\n")
+    assert store.get_hash("bob") == "h2"
+
+
+def test_last_line_wins_and_compaction_is_picked_up(path):
+    with open(path, "w") as fh:
+        fh.write("alice old\nalice new\n")
+    reader, compactor = UserStore(path), UserStore(path)
+    assert reader.get_hash("alice") == "new" and reader.stale_lines() == 1
+    compactor.compact()
+    with open(path) as fh:
+        assert fh.read() == "alice new\n"
+    # The file was replaced (new inode), so the reader rebuilds rather than reading from its old offset
+    compactor.add_user("bob", "h2")
+    assert reader.get_hash("bob") == "h2" and reader.stale_lines() == 0
+
+
+def test_concurrent_registration_of_one_name_succeeds_once(path):
+    stores = [UserStore(path) for _ in range(4)]
+    results = []
+    threads = [threading.Thread(target=lambda s=s: results.append(s.add_user("alice", "h"))) for s in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [False, False, False, True]
+
+
+def test_processes_share_the_file_lock(path):
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_add_in_process, args=(path, "alice", results)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    assert sorted(results.get(timeout=5) for _ in procs) == [False, False, False, True]
+    with open(path) as fh:
+        assert fh.read().count("alice") == 1